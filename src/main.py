@@ -11,20 +11,14 @@
 # and plan information to generate progamatically an interactive program
 # diagram in the output directory.
 
-# Dependencies: bs4, parsing, webgen, tkinter, xlrd
+# Dependencies: pipeline, bundling, tkinter, xlrd
 
 import tkinter
 import traceback
 import xlrd
-from bs4 import BeautifulSoup
-import modules.parsing.categoriesparsing as categoriesparsing
-import modules.parsing.coursegroupparsing as coursegroupparsing
-import modules.parsing.courseparsing as courseparsing
-import modules.parsing.sequenceparsing as sequenceparsing
-import modules.webgen.javascriptgen as javascriptgen
-import modules.webgen.htmlgen as htmlgen
-import modules.webgen.linegen as linegen
-import modules.webgen.cssgen as cssgen
+import modules.pipeline.generation as generation
+import modules.pipeline.postprocess as postprocess
+import modules.postprocessing.bundling as bundling
 from tkinter import *
 from tkinter import messagebox
 from tkinter import ttk
@@ -77,172 +71,67 @@ def add_progbar():
     )
 
 
+# advances the progress bar by one of the fourteen generation stages
 def progress():
-    progbar['value']+= 7.7
+    progbar['value']+= 100 / 14
     window.update_idletasks()
     return progbar['value']
 
+# Generates the webpage through the headless generation pipeline, reporting the
+# progress of its stages on the GUI
+# Parameters:
+#   value_label - label that shows the current stage
+# Returns: index.html (str), dict that maps the path of each other generated file to its content
 def websiteGeneration(value_label):
     print("Beginning generation...")
-    # opening the template html file and constructing html
-    # note: here we calling parsing to extract the course data!
-    try:  
-        with open("template.html") as input:
-            # deriving parsed html and creating soup object
-            soup = BeautifulSoup(input, 'html.parser')
-            
-            # opening the JS files
-            print("Opening files...")
-            value_label['text'] = 'Opening files...'
-            controller = open("./output/js/controller.js", "w")
-            indexJS = open("./output/js/index.js", "w")
-            progress()
-
-            #opening the CSS file
-            categoryCSS = open("./output/styles/category.css", "w")
-
-            # creating line manager
-            lineManager = linegen.LineManager()
-
-            # parsing the excel files with course info, pulls dependencies (prereqs, coreqs, reqs) too
-            print("Parsing courses...")
-            value_label['text'] = 'Parsing courses...'
-            courseDict = courseparsing.parseCourses(courses_excel.get())
-            progress()
-
-            # extracting dept name for program sequence
-            deptName = department.get()
-
-            # parsing the excel file with accreditation unit info
-            print("Parsing accreditation...")
-            value_label['text'] = 'Parsing accreditation...'
-            courseparsing.parseAccred(courseDict, acc_excel.get(), deptName)
-            progress()
-            
-            # pulling the category and color info from excel
-            print("Parsing categories...")
-            value_label['text'] = 'Parsing categories...'
-            courseDict, categoryDict = categoriesparsing.parseCategories(courseCat_excel.get(), courseDict)
-            progress()
-
-            # writing colour highlighting CSS
-            print("Writing category CSS...")
-            value_label['text'] = 'Writing category CSS...'
-            mainCategoryDict, subCategoryDict = categoriesparsing.splitCategoryDict(categoryDict)
-            cssgen.writeCategoryCSS(mainCategoryDict, subCategoryDict, categoryCSS)
-            progress()
-
-            # sequencing courses
-            print("Parsing sequences...")
-            value_label['text'] = 'Parsing sequences...'
-            sequenceDict = sequenceparsing.parseSeq(seq_excel.get(), courseDict)
-            progress()
-
-            # extracting course group information
-            courseGroupDict = coursegroupparsing.extractPlanCourseGroupDict(sequenceDict)
-            courseGroupList = coursegroupparsing.findListofAllCourseGroups(courseGroupDict)
-            initialCourseGroupVals = coursegroupparsing.findInitialValuesofCourseGroups(courseGroupDict, courseGroupList)
-
-
-            # generating initial JS based on the number and names of plans
-            print("Intialzing JS files...")
-            value_label['text'] = 'Intialzing JS files...'
-            javascriptgen.initializeControllerJavaScript(sequenceDict, 
-                                                        initialCourseGroupVals,
-                                                        courseGroupDict,
-                                                        courseGroupList, 
-                                                        controller)
-            progress()
-            #locating title tag
-            topTitleTag = soup.head.find("title")
-            titleTag = soup.body.find("a", class_="site-title")
-
-            #locating main div, this is where all the html will be written
-            mainTag = soup.body.find("div", id="main")
-
-            # customizing webpage title
-            print("Writing title...")
-            value_label['text'] = 'Writing title...'
-            htmlgen.switchTitle(titleTag, topTitleTag, deptName)
-            progress()
-
-            # locating form tag
-            formTag = mainTag.find("form")
-
-            # placing main radio inputs
-            print("Placing radio inputs...")
-            value_label['text'] = 'Placing radio inputs...'
-            htmlgen.placeRadioInputs(formTag, courseGroupDict, soup)
-            progress()
-
-            # locating course group selector
-            courseGroupSelectTag = soup.body.find("div", class_="coursegroupselector")
-
-            # placing submenu radio inputs
-            htmlgen.placeCourseGroupRadioInputs(courseGroupSelectTag, soup, courseGroupDict)
-
-            # locating legend tag
-            legendTag = mainTag.find("div", class_="legend")
-
-            # places legend for color-coding
-            print("Placing legend...")
-            value_label['text'] = 'Placing legend...'
-            htmlgen.placeLegend(legendTag, categoryDict, soup)
-            progress()
-
-            # Generating display tag, this is where the course divs will be written
-            print("Generating display tag...")
-            value_label['text'] = 'Generating display tag...'
-            displayTag = htmlgen.generateDisplayDiv(soup, courseGroupList)
-            progress()
-
-            mainTag.append(displayTag)
-
-            #placing the HTML and generating JS based on the courses (drawing lines)
-            value_label['text'] = 'Placing course diagram...'
-            print("Placing course diagram...")
-            htmlgen.placePlanDivs(displayTag, 
-                                  sequenceDict, 
-                                  soup, 
-                                  indexJS, 
-                                  controller, 
-                                  lineManager)
-            progress()
-            # closing JS and CSS files
-            print("Closing files...")
-            value_label['text'] = 'Closing files...'
-            javascriptgen.closeControllerJavaScript(controller)
-            indexJS.close()
-            categoryCSS.close()
-            progress()
+    # reports each stage of the pipeline on the GUI
+    def reportProgress(message):
+        print(message)
+        value_label['text'] = message
+        progress()
+
+    options = {"lazyPlans": lazyPlans.get(),
+               "batchedLines": batchedLines.get(),
+               "delegateEvents": delegateEvents.get()}
+    try:
+        html, outputDict = generation.generateWebsite(courses_excel.get(),
+                                                      acc_excel.get(),
+                                                      courseCat_excel.get(),
+                                                      seq_excel.get(),
+                                                      department.get(),
+                                                      options,
+                                                      reportProgress,
+                                                      generation.stageCacheDirectory if cacheStages.get() else None)
     except FileNotFoundError as err:
        if (err.strerror == "No such file or directory"):
         raise FileNotFoundError("Either the template HTML file is not in the same directory as the script or" +
        " the output directory is not organized correctly or does not exist")
        else:
         raise FileNotFoundError(str(err))
-    return soup
-
-def writingHTML(soup):
-    # writing output to an output html
-    try:
-        print("Writing final HTML...")
-        with open("./output/index.html", "w", encoding="utf-8") as output:
-            output.write(str(soup))
-    except FileNotFoundError:
-        raise FileNotFoundError("The directory you are in does not have a directory named output.")
+    return html, outputDict
 
 def main():
     add_progbar()
     value_label = Label(window, bg="white")
     value_label.place(x=748, y= 585)
     try:
-        soup = websiteGeneration(value_label)
-        writingHTML(soup)
+        html, outputDict = websiteGeneration(value_label)
+        # reports each post-processing stage on the GUI
+        def reportStage(message):
+            print(message)
+            value_label['text'] = message
+
+        postOptions = {"pruneCSS": pruneCSS.get(),
+                       "singleBundle": singleBundle.get(),
+                       "minifyOutput": minifyOutput.get(),
+                       "hashAssetNames": hashAssetNames.get()}
+        outputDict = postprocess.postprocessWebsite(html, outputDict, postOptions, "./output", reportStage)
+        reportStage('Writing output files...')
+        postprocess.writeOutputFiles("./output", outputDict)
         print("Generation Completed!")
         value_label['text'] = 'Generation Completed!'
         messagebox.showinfo('Status',message="Webpage successfully generated!")
-    except (FileNotFoundError, xlrd.biffh.XLRDError, AssertionError) as e:
+    except (FileNotFoundError, xlrd.biffh.XLRDError, AssertionError, bundling.VendoredLibraryError) as e:
         print("Error occured! Handling exception")
         messagebox.showerror("Error", str(e))
         traceback.print_exc()
@@ -449,6 +338,76 @@ help_menu.add_command(
     
 )
 
+# create the Output menu, holds the output options of the generated webpage
+output_menu = Menu(
+    menubar,
+    tearoff=0
+)
+
+menubar.add_cascade(
+    label="Output",
+    menu=output_menu
+)
+
+# load each plan from its own HTML fragment and JS chunk when first selected
+# (the generated webpage must then be served by a web server)
+lazyPlans = BooleanVar(value=False)
+output_menu.add_checkbutton(
+    label='Lazy-load plans',
+    variable=lazyPlans
+)
+
+# minify the generated files and write precompressed .gz/.br siblings
+minifyOutput = BooleanVar(value=False)
+output_menu.add_checkbutton(
+    label='Minify and precompress',
+    variable=minifyOutput
+)
+
+# give the assets content hashed file names so they can be cached indefinitely
+hashAssetNames = BooleanVar(value=False)
+output_menu.add_checkbutton(
+    label='Content-hashed asset names',
+    variable=hashAssetNames
+)
+
+# draw the lines of the diagram into one SVG instead of one LeaderLine per line,
+# scales better when many lines are shown at once
+batchedLines = BooleanVar(value=False)
+output_menu.add_checkbutton(
+    label='Batched line renderer',
+    variable=batchedLines
+)
+
+# handle course clicks with one listener on the diagram instead of a listener on every course
+delegateEvents = BooleanVar(value=False)
+output_menu.add_checkbutton(
+    label='Delegated course listeners',
+    variable=delegateEvents
+)
+
+# reuse the outputs of the generation stages whose inputs did not change since the last generation
+cacheStages = BooleanVar(value=True)
+output_menu.add_checkbutton(
+    label='Reuse unchanged generation stages',
+    variable=cacheStages
+)
+
+# link the webpage to a copy of styles.css without the rules it does not use
+pruneCSS = BooleanVar(value=False)
+output_menu.add_checkbutton(
+    label='Prune unused CSS',
+    variable=pruneCSS
+)
+
+# serve the webpage as a self-contained bundle: local copies of AngularJS and LeaderLine
+# (see the vendor directory), one JS bundle and inlined CSS
+singleBundle = BooleanVar(value=False)
+output_menu.add_checkbutton(
+    label='Single self-contained bundle',
+    variable=singleBundle
+)
+
 ##Course Excel file UI##
 courseEntry_img = PhotoImage(file = f"GUI_images/img_textBox0.png")
 courseEntry_bg = canvas.create_image(
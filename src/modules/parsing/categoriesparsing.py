@@ -16,21 +16,24 @@ from . import parsinghelp
 # provided in the Excel file for each course.
 #
 # Parameters:
-#   filename (string): relative path to the file to be parsed for category info.
-#       Can only be a .xls (not .xlsx file).
+#   filename (string or bytes): relative path to the file to be parsed for category info,
+#       or the content of the file. Can only be a .xls (not .xlsx file).
 #   course_obj_dict (dict): Stores all course data:
 #       key: Course Name (string): the Subject + " " + Catalog of a course
 #       value: Course object. Stores all data about a course
+#   book (DecodedWorkbook): workbook already decoded from filename (see parsinghelp.decodeWorkbook),
+#       None to open filename
 # Returns:
 #   course_obj_dict (dict): the category and color attributes should be
 #       filled in
 #   category_dict (dict):
 #       Key: category (string): A category ("Natural Science", "Math", etc.)
 #       Value: a list with item at index 0 as category level ("main" or "sub") and color as the item at index 1
-def parseCategories(filename, course_obj_dict):
+def parseCategories(filename, course_obj_dict, book = None):
     try:
         category_dict = {}
-        book = xlrd.open_workbook(filename)
+        if book is None:
+            book = parsinghelp.openWorkbook(filename)
         sheet = book.sheet_by_index(0)
 
         for col in range(0, sheet.ncols):
@@ -17,14 +17,18 @@ from . import parsinghelp
 # in a dict
 #
 # Parameters:
-#   filename (string): path to the .xls file with course information (relative to the calling script)
+#   filename (string or bytes): path to the .xls file with course information (relative to the calling script),
+#   or the content of the file
+#   book (DecodedWorkbook): workbook already decoded from filename (see parsinghelp.decodeWorkbook),
+#   None to open filename
 # Returns:
 #   course_obj_dict (dict): Stores all course data:
 #       key: Course Name (string): the Subject + " " + Catalog of a course
 #       value: Course object. Stores all data about a course
-def parseCourses(filename):
+def parseCourses(filename, book = None):
     try:
-        book = xlrd.open_workbook(filename)
+        if book is None:
+            book = parsinghelp.openWorkbook(filename)
         sheet = book.sheet_by_index(0)  # course info must be on the first sheet
         course_obj_dict = {}
         for row in range(1, sheet.nrows):
@@ -90,40 +94,68 @@ def parseCourses(filename):
 #   accreditation info
 #   deptName (string): name of the department, should match the header
 #   on one of the sheets in the accreditation info Excel file
-def parseAccred(courseObjDict, accredFileName, deptName):
+#   book (DecodedWorkbook): workbook already decoded from accredFileName (see parsinghelp.decodeWorkbook),
+#   None to open accredFileName
+def parseAccred(courseObjDict, accredFileName, deptName, book = None):
+    applyAccred(courseObjDict, indexAccred(accredFileName, book), deptName)
+
+# Indexes the sheets of the accredFileName file by the name of their department,
+# so that the file is only searched once when generating several departments.
+# Parameters:
+#   accredFileName (string or bytes): name of the .xls file containing 
+#   accreditation info, or the content of the file
+#   book (DecodedWorkbook): workbook already decoded from accredFileName (see parsinghelp.decodeWorkbook),
+#   None to open accredFileName
+# Returns:
+#   accred_index (dict): 
+#       key: Department name (string): the header of a sheet
+#       value: the sheet with the accreditation units of the department
+def indexAccred(accredFileName, book = None):
     try:
-        book = xlrd.open_workbook(accredFileName)
+        if book is None:
+            book = parsinghelp.openWorkbook(accredFileName)
 
-        # open each sheet and check if header matches deptName
-        sheet = None
+        # check the header of each sheet, a later sheet with the same header
+        # replaces an earlier one
+        accred_index = {}
         for i in range(0, book.nsheets):
-            if book.sheet_by_index(i).cell_value(0, 1) == deptName:
-                sheet = book.sheet_by_index(i)
-        
-        # if no matching department name found, display error message and continue execution
-        if sheet is None:
-            print("Department name: " + deptName + " does not match any sheet in the accreditation file")
-            print("No accreditation unit information will be available on the generated webpage")
-            return
-
-        for row in range(4, sheet.nrows):
-            if sheet.cell_value(row, 1) in courseObjDict:  # see if the Excel entry matches a course name
-                # if there is a match, update the accredUnits field with corresponding values
-                courseName = sheet.cell_value(row, 1)
-                courseObjDict[courseName].accredUnits["Math"] = round(sheet.cell_value(row, 8), 1)
-                courseObjDict[courseName].accredUnits["Natural Sciences"] = round(sheet.cell_value(row, 9), 1)
-                courseObjDict[courseName].accredUnits["Math and Natural Sciences"] = round(sheet.cell_value(row, 10), 1)
-                courseObjDict[courseName].accredUnits["Complimentary Studies"] = round(sheet.cell_value(row, 11), 1)
-                courseObjDict[courseName].accredUnits["Engineering Science"] = round(sheet.cell_value(row, 12), 1)
-                courseObjDict[courseName].accredUnits["Engineering Design"] = round(sheet.cell_value(row, 13), 1)
-                courseObjDict[courseName].accredUnits["Engineering Science and Engineering Design"] = round(sheet.cell_value(row, 14), 1)
-                courseObjDict[courseName].accredUnits["Other"] = round(sheet.cell_value(row, 15), 1)
+            accred_index[book.sheet_by_index(i).cell_value(0, 1)] = book.sheet_by_index(i)
+        return accred_index
 
     except FileNotFoundError:
         raise FileNotFoundError("Excel accreditation information file not found, ensure it is present and the name is correct")
     except xlrd.biffh.XLRDError:
         raise xlrd.biffh.XLRDError("Error reading data from accreditation information Excel sheet. Ensure it is formatted exactly as specified")
 
+# Fills in the accreditation units of the courses in courseObjDict for a department.
+# Parameters:
+#   courseObjDict (dict): dict with course name for key and 
+#   Course object as value
+#   accredIndex (dict): sheets of the accreditation info Excel file by department (see indexAccred)
+#   deptName (string): name of the department, should match the header
+#   on one of the sheets in the accreditation info Excel file
+def applyAccred(courseObjDict, accredIndex, deptName):
+    sheet = accredIndex.get(deptName)
+
+    # if no matching department name found, display error message and continue execution
+    if sheet is None:
+        print("Department name: " + deptName + " does not match any sheet in the accreditation file")
+        print("No accreditation unit information will be available on the generated webpage")
+        return
+
+    for row in range(4, sheet.nrows):
+        if sheet.cell_value(row, 1) in courseObjDict:  # see if the Excel entry matches a course name
+            # if there is a match, update the accredUnits field with corresponding values
+            courseName = sheet.cell_value(row, 1)
+            courseObjDict[courseName].accredUnits["Math"] = round(sheet.cell_value(row, 8), 1)
+            courseObjDict[courseName].accredUnits["Natural Sciences"] = round(sheet.cell_value(row, 9), 1)
+            courseObjDict[courseName].accredUnits["Math and Natural Sciences"] = round(sheet.cell_value(row, 10), 1)
+            courseObjDict[courseName].accredUnits["Complimentary Studies"] = round(sheet.cell_value(row, 11), 1)
+            courseObjDict[courseName].accredUnits["Engineering Science"] = round(sheet.cell_value(row, 12), 1)
+            courseObjDict[courseName].accredUnits["Engineering Design"] = round(sheet.cell_value(row, 13), 1)
+            courseObjDict[courseName].accredUnits["Engineering Science and Engineering Design"] = round(sheet.cell_value(row, 14), 1)
+            courseObjDict[courseName].accredUnits["Other"] = round(sheet.cell_value(row, 15), 1)
+
 # Pulls all course dependencies (prerequisites, corequisites, and
 # requisites) for each course in course_obj_dict. Dependencies stored
 # in lists as attributes of the Course object.
@@ -6,6 +6,10 @@
 # This file contains all the helper functions and classes that assist
 # in parsing the Excel files
 
+# Dependencies: xlrd
+
+import xlrd
+
 # Class that wraps the information about a course
 class Course:
     def __init__(self, name = "", faculty = "", department = "", course_id = "", subject = "", catalog = "",
@@ -68,4 +72,55 @@ def pullDept(reqlist, indx):
             # pull the department name
             dept = reqlist[indx][0:n - 1]  
             return dept
-    return -1
\ No newline at end of file
+    return -1
+
+# Class that holds the cell values of a decoded Excel workbook. Unlike an xlrd book, it
+# can be sent between processes and cached, so a workbook can be decoded in another
+# process while the parsers only link its cells. Offers the parts of the xlrd book
+# interface used by the parsers (nsheets, sheet_by_index).
+class DecodedWorkbook:
+    def __init__(self, sheets = []):
+        self.sheets = sheets
+        self.nsheets = len(sheets)
+
+    def sheet_by_index(self, index):
+        return self.sheets[index]
+
+# Class that holds the cell values of a sheet of a decoded Excel workbook. Offers the
+# parts of the xlrd sheet interface used by the parsers (name, nrows, ncols, cell_value).
+class DecodedSheet:
+    def __init__(self, name = "", rows = []):
+        self.name = name
+        self.rows = rows
+        self.nrows = len(rows)
+        self.ncols = max([len(row) for row in rows], default=0)
+
+    def cell_value(self, row, col):
+        return self.rows[row][col]
+
+# Opens an Excel workbook from a file or from the content of a file, so that the
+# Excel files can be parsed without being written to disk.
+#
+# Parameters:
+#   filename (string or bytes): path to the .xls file, or the content of the file
+# Returns:
+#   book (xlrd Book): the opened workbook
+def openWorkbook(filename):
+    if isinstance(filename, bytes):
+        return xlrd.open_workbook(file_contents=filename)
+    return xlrd.open_workbook(filename)
+
+# Decodes an Excel workbook into the cell values of its sheets.
+#
+# Parameters:
+#   filename (string or bytes): path to the .xls file, or the content of the file
+# Returns:
+#   book (DecodedWorkbook): the decoded workbook, None if the file is missing or
+#   cannot be read (the parser then opens the file itself and reports the error)
+def decodeWorkbook(filename):
+    try:
+        book = openWorkbook(filename)
+    except (FileNotFoundError, xlrd.biffh.XLRDError):
+        return None
+    return DecodedWorkbook([DecodedSheet(sheet.name, [sheet.row_values(row) for row in range(sheet.nrows)])
+                            for sheet in book.sheets()])
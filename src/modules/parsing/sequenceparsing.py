@@ -6,10 +6,11 @@
 # This file contains the functions needed to parse the Excel file
 # containing the sequencing information
 
-# Dependencies: copy, xlrd
+# Dependencies: copy, xlrd, parsinghelp
 
 from copy import deepcopy
 import xlrd
+from . import parsinghelp
 
 # Parses an Excel file with program sequencing information (when courses are taken)
 # and returns a dictionary storing the program plan name as key (Traditional, Co-op plan 1, etc.)
@@ -19,14 +20,17 @@ import xlrd
 # Parameters:
 #   course_obj_dict (dict): dict with course name for key and 
 #   Course object as value. The Course class described in parsinghelp.py
-#   filename (string): Name of the Excel file to be parsed for sequencing
-#   info. Can only be a .xls file (NOT .xlsx)
+#   filename (string or bytes): Name of the Excel file to be parsed for sequencing
+#   info, or the content of the file. Can only be a .xls file (NOT .xlsx)
+#   book (DecodedWorkbook): workbook already decoded from filename (see parsinghelp.decodeWorkbook),
+#   None to open filename
 # Returns:
 #   course_seq (dict): Key is plan name, value is another dict with 
 #   term name as the key and a list of the Course objects taken in that term as value.
-def parseSeq(filename, course_obj_dict):
+def parseSeq(filename, course_obj_dict, book = None):
     try:
-        book = xlrd.open_workbook(filename)
+        if book is None:
+            book = parsinghelp.openWorkbook(filename)
         numsheets = book.nsheets
         course_seq = {}
 
@@ -0,0 +1,110 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the functions and classes needed to generate the webpage for a host
+# that embeds the generator (eg: a web app or a script). Every file of the webpage is
+# rendered into memory and returned as a dict that maps its path to its content, the
+# Excel files can be given as their content instead of their path, and nothing is
+# written to disk unless a stage cache directory is given. Generations therefore do not
+# share any files and can run concurrently. The files are then handed to a sink:
+#   DirectorySink - writes them to a directory
+#   ZipSink - packs them into a zip archive
+#   CallbackSink - calls a function with every file
+# eg:
+#   artifactDict = artifacts.renderArtifacts(coursesContent, accreditationContent, categoriesContent,
+#                                            sequencesContent, "Mechanical Engineering", {"minifyOutput": True})
+#   artifacts.ZipSink("website.zip").write(artifactDict)
+
+# Dependencies: os, generation, postprocess
+
+import os
+from . import generation
+from . import postprocess
+
+# Function that generates and post-processes the webpage in memory
+# Parameters:
+#   coursesFile - path of the Excel file with the course information, or the content of the file (bytes)
+#   accreditationFile - path of the Excel file with the accreditation units, or the content of the file (bytes)
+#   categoriesFile - path of the Excel file with the course categories, or the content of the file (bytes)
+#   sequencesFile - path of the Excel file with the plan sequences, or the content of the file (bytes)
+#   deptName - name of the department
+#   options - dict that maps output options (of the generation and the post-processing) to their
+#   values, missing options are off
+#   reportProgress - function called with a message (str) before each stage
+#   cacheDirectory - path of the directory the stage outputs are cached in, None to run every stage
+#   (and write nothing to disk)
+#   staticDirectory - path of the directory the static assets are read from
+#   templateFile - path of the template HTML file
+#   workers - number of worker processes the workbooks are decoded and the plans are rendered in,
+#   None to decode and render them one after another
+# Returns: dict that maps the path of every file of the webpage (index.html, the generated
+# files and the static assets it references) to its content (bytes)
+def renderArtifacts(coursesFile, accreditationFile, categoriesFile, sequencesFile, deptName, options,
+                    reportProgress=print, cacheDirectory=None, staticDirectory="./output",
+                    templateFile="template.html", workers=None):
+    generationOptions = {option: options[option] for option in options if option in generation.defaultOptions}
+    postOptions = {option: options[option] for option in options if option in postprocess.defaultOptions}
+    html, outputDict = generation.generateWebsite(coursesFile, accreditationFile, categoriesFile, sequencesFile,
+                                                  deptName, generationOptions, reportProgress, cacheDirectory,
+                                                  templateFile, workers)
+    artifactDict = postprocess.postprocessWebsite(html, outputDict, postOptions, staticDirectory, reportProgress)
+    postprocess.addStaticAssets(artifactDict, staticDirectory)
+    return artifactDict
+
+# Class that defines a sink that writes the files of a webpage to a directory. The directory
+# is created if needed and files whose content did not change are left untouched.
+class DirectorySink:
+    # Parameters:
+    #   outputDirectory: path of the directory the files are written to
+    def __init__(self, outputDirectory = "./output") -> None:
+        self.outputDirectory = outputDirectory
+
+    # Writes the files of a webpage
+    # Parameters:
+    #   artifactDict: dict that maps the path of each file to its content (bytes)
+    def write(self, artifactDict = {}):
+        os.makedirs(self.outputDirectory, exist_ok=True)
+        postprocess.writeOutputFiles(self.outputDirectory, artifactDict)
+
+# Class that defines a sink that packs the files of a webpage into a zip archive
+# (see postprocess.createZipArchive)
+class ZipSink:
+    # Parameters:
+    #   zipFile: path of the zip archive, or a binary file object the archive is written to,
+    #   None to only keep the archive in memory (see getArchive)
+    def __init__(self, zipFile = None) -> None:
+        self.zipFile = zipFile
+        self.archive = b""
+
+    # Packs the files of a webpage
+    # Parameters:
+    #   artifactDict: dict that maps the path of each file to its content (bytes)
+    def write(self, artifactDict = {}):
+        self.archive = postprocess.createZipArchive(artifactDict)
+        if isinstance(self.zipFile, str):
+            with open(self.zipFile, "wb") as outputFile:
+                outputFile.write(self.archive)
+        elif self.zipFile is not None:
+            self.zipFile.write(self.archive)
+
+    # Returns the content of the last archive written (bytes)
+    def getArchive(self) -> bytes:
+        return self.archive
+
+# Class that defines a sink that hands the files of a webpage to a function, eg: to upload
+# them or to store them in a database
+class CallbackSink:
+    # Parameters:
+    #   callback: function called with the path (str) and the content (bytes) of every file,
+    #   in path order
+    def __init__(self, callback = None) -> None:
+        self.callback = callback
+
+    # Hands the files of a webpage to the callback
+    # Parameters:
+    #   artifactDict: dict that maps the path of each file to its content (bytes)
+    def write(self, artifactDict = {}):
+        for path in sorted(artifactDict):
+            self.callback(path, artifactDict[path])
@@ -0,0 +1,130 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the functions needed to generate the webpages of several departments
+# in one run, from a manifest (JSON file) such as:
+#   {
+#     "courses": "Courses.xls",
+#     "accreditation": "AccreditationUnits.xls",
+#     "categories": "CourseCategories.xls",
+#     "output": "faculty",
+#     "options": {"minifyOutput": true},
+#     "departments": [
+#       {"name": "Mechanical Engineering", "sequences": "MechanicalSequencing.xls"},
+#       {"name": "Civil Engineering", "sequences": "CivilSequencing.xls", "output": "civil"}
+#     ]
+#   }
+# Paths are relative to the manifest. Every department is written to its own output
+# directory, by default the cleaned department name inside the "output" directory. The
+# options are the output options of the generation and of the post-processing.
+# The course, category and accreditation files are parsed once for every department.
+# Run from the directory of main.py (the template and static assets are read from it):
+#   python -m modules.pipeline.batch manifest.json
+
+# Dependencies: argparse, json, os, cleaner, artifacts, generation, postprocess
+
+import argparse
+import json
+import os
+from .. import cleaner
+from . import artifacts
+from . import generation
+from . import postprocess
+
+# Function that generates, post-processes and writes the webpage of every department of a manifest
+# Parameters:
+#   manifestFile - path of the manifest (str)
+#   reportProgress - function called with a message (str) before each stage
+#   cacheDirectory - path of the directory the stage outputs are cached in, None to run every stage
+#   workers - number of worker processes the departments are generated in, None to generate them
+#   one after another
+#   staticDirectory - path of the directory the static assets are read from
+#   templateFile - path of the template HTML file
+# Returns: list of the output directories of the departments, in the order of the manifest
+def buildWebsites(manifestFile, reportProgress=print, cacheDirectory=None, workers=None,
+                  staticDirectory="./output", templateFile="template.html"):
+    manifest = readManifest(manifestFile)
+    generationOptions = {option: manifest["options"][option] for option in manifest["options"]
+                         if option in generation.defaultOptions}
+    postOptions = {option: manifest["options"][option] for option in manifest["options"]
+                   if option in postprocess.defaultOptions}
+
+    websiteList = generation.generateWebsites(manifest["courses"],
+                                              manifest["accreditation"],
+                                              manifest["categories"],
+                                              [[department["name"], department["sequences"]]
+                                               for department in manifest["departments"]],
+                                              generationOptions,
+                                              reportProgress,
+                                              cacheDirectory,
+                                              templateFile,
+                                              workers)
+
+    for department, (html, outputDict) in zip(manifest["departments"], websiteList):
+        # reports the post-processing stages of the department
+        def reportStage(message):
+            reportProgress(department["name"] + ": " + message)
+
+        outputDict = postprocess.postprocessWebsite(html, outputDict, postOptions, staticDirectory, reportStage)
+        postprocess.addStaticAssets(outputDict, staticDirectory)
+        reportStage("Writing output files to " + department["output"] + "...")
+        artifacts.DirectorySink(department["output"]).write(outputDict)
+    return [department["output"] for department in manifest["departments"]]
+
+# Function that reads and checks a manifest, and resolves its paths
+# Parameters:
+#   manifestFile - path of the manifest (str)
+# Returns: dict that holds the manifest, with every path resolved and the output directory
+# of every department filled in
+def readManifest(manifestFile):
+    if not os.path.isfile(manifestFile):
+        raise FileNotFoundError("Manifest " + manifestFile + " not found, ensure it is present and the name is correct")
+    with open(manifestFile, encoding="utf-8") as inputFile:
+        try:
+            manifest = json.load(inputFile)
+        except json.JSONDecodeError as err:
+            raise ValueError("Manifest " + manifestFile + " is not valid JSON: " + str(err))
+
+    manifestDirectory = os.path.dirname(os.path.abspath(manifestFile))
+    for key in ["courses", "accreditation", "categories", "departments"]:
+        if key not in manifest:
+            raise ValueError("Manifest " + manifestFile + " has no \"" + key + "\" entry")
+    for key in ["courses", "accreditation", "categories"]:
+        manifest[key] = os.path.join(manifestDirectory, manifest[key])
+    outputDirectory = os.path.join(manifestDirectory, manifest.get("output", "output"))
+
+    manifest["options"] = manifest.get("options", {})
+    for option in manifest["options"]:
+        if option not in generation.defaultOptions and option not in postprocess.defaultOptions:
+            raise ValueError("Manifest " + manifestFile + " has an unknown option: " + option)
+
+    if manifest["departments"] == []:
+        raise ValueError("Manifest " + manifestFile + " lists no departments")
+    deptNames = []
+    for department in manifest["departments"]:
+        if "name" not in department or "sequences" not in department:
+            raise ValueError("Every department of manifest " + manifestFile + " needs a \"name\" and a \"sequences\" entry")
+        # the stages of a department are named after it
+        if department["name"] in deptNames:
+            raise ValueError("Manifest " + manifestFile + " lists " + department["name"] + " more than once")
+        deptNames.append(department["name"])
+        department["sequences"] = os.path.join(manifestDirectory, department["sequences"])
+        department["output"] = os.path.join(outputDirectory,
+                                            department.get("output", cleaner.cleanString(department["name"])))
+    return manifest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generates the webpage of every department of a manifest")
+    parser.add_argument("manifest", help="path of the manifest")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes the departments are generated in (default: one per CPU)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="run every stage instead of reusing the unchanged stages of the last run")
+    arguments = parser.parse_args()
+    buildWebsites(arguments.manifest,
+                  print,
+                  None if arguments.no_cache else generation.stageCacheDirectory,
+                  arguments.workers if arguments.workers > 1 else None)
+    print("Batch generation completed!")
@@ -0,0 +1,376 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the functions needed to generate the webpage without the GUI.
+# The generation is declared as a graph of stages (see stagegraph):
+#   the workbooks are decoded independently (concurrently with worker processes)
+#   courses -> categories, accreditation index        (shared by every department)
+#   courses -> sequences -> course groups                         (for each department)
+#   categories + accreditation index -> accreditation
+#   sequences + accreditation -> plans -> category index
+#   categories + category index -> category CSS
+#   everything -> webpage (HTML and JS), whose plans are rendered concurrently with worker processes
+# With a cache directory, only the stages whose inputs (Excel files, template,
+# department name, options or code) changed are run again. The sequences are parsed from
+# the courses alone, so editing the categories or accreditation does not parse them again. Several departments can be
+# generated together, the shared stages are then only run once.
+
+# Dependencies: bs4, copy, functools, io, sys, parsing, stagegraph, webgen
+
+import copy
+import functools
+import io
+import sys
+from bs4 import BeautifulSoup
+from ..parsing import categoriesparsing
+from ..parsing import coursegroupparsing
+from ..parsing import courseparsing
+from ..parsing import parsinghelp
+from ..parsing import sequenceparsing
+from ..webgen import categoryindex
+from ..webgen import cssgen
+from ..webgen import htmlgen
+from ..webgen import javascriptgen
+from ..webgen import layout
+from ..webgen import linegen
+from .. import cleaner
+from . import stagegraph
+
+# output options of the webpage and their default values
+defaultOptions = {"lazyPlans": False, "batchedLines": False, "delegateEvents": False}
+
+# names of the elective courses, which the categories add to the courses
+electiveNames = ["Program/Technical Elective", "Complementary Elective", "ITS Elective"]
+
+# directory (relative to the generator) the outputs of the generation stages are cached in
+stageCacheDirectory = "./.stagecache"
+
+# Function that generates the webpage
+# Parameters:
+#   coursesFile - path of the Excel file with the course information, or the content of the file (bytes)
+#   accreditationFile - path of the Excel file with the accreditation units, or the content of the file (bytes)
+#   categoriesFile - path of the Excel file with the course categories, or the content of the file (bytes)
+#   sequencesFile - path of the Excel file with the plan sequences, or the content of the file (bytes)
+#   deptName - name of the department
+#   options - dict that maps output options (see defaultOptions) to their values, missing options are off
+#   reportProgress - function called with a message (str) before each stage
+#   cacheDirectory - path of the directory the stage outputs are cached in, None to run every stage
+#   templateFile - path of the template HTML file
+#   workers - number of worker processes the workbooks are decoded and the plans are rendered in,
+#   None to decode and render them one after another
+# Returns: index.html (str), dict that maps the path of each other generated file to its content (bytes)
+def generateWebsite(coursesFile, accreditationFile, categoriesFile, sequencesFile, deptName, options,
+                    reportProgress=print, cacheDirectory=None, templateFile="template.html", workers=None):
+    graph = stagegraph.StageGraph(cacheDirectory, reportProgress, workers)
+    addSharedStages(graph, coursesFile, accreditationFile, categoriesFile, templateFile)
+    addDepartmentStages(graph, "", sequencesFile, deptName, options, workers, False)
+    website = collectWebsite(graph, "")
+    print("Stages run: " + (", ".join(graph.getRerunStages()) or "none"))
+    return website
+
+# Function that generates the webpages of several departments that share their course,
+# category and accreditation information. The shared Excel files are parsed once and every
+# department is generated in a worker process, if workers is given.
+# Parameters:
+#   coursesFile - path of the Excel file with the course information, or the content of the file (bytes)
+#   accreditationFile - path of the Excel file with the accreditation units, or the content of the file (bytes)
+#   categoriesFile - path of the Excel file with the course categories, or the content of the file (bytes)
+#   departmentList - list of [name of the department, path (or content) of the Excel file with its plan sequences]
+#   options - dict that maps output options (see defaultOptions) to their values, missing options are off
+#   reportProgress - function called with a message (str) before each stage
+#   cacheDirectory - path of the directory the stage outputs are cached in, None to run every stage
+#   templateFile - path of the template HTML file
+#   workers - number of worker processes, None to generate the departments one after another
+# Returns: list of [index.html (str), dict that maps the path of each other generated file to its
+# content (bytes)] for every department, in the order of departmentList
+def generateWebsites(coursesFile, accreditationFile, categoriesFile, departmentList, options,
+                     reportProgress=print, cacheDirectory=None, templateFile="template.html", workers=None):
+    graph = stagegraph.StageGraph(cacheDirectory, reportProgress, workers)
+    addSharedStages(graph, coursesFile, accreditationFile, categoriesFile, templateFile)
+    for deptName, sequencesFile in departmentList:
+        # the plans of a department are rendered in the worker process the department runs in
+        addDepartmentStages(graph, deptName + ": ", sequencesFile, deptName, options, None, True)
+    # resolving every department together lets them run concurrently
+    graph.resolveStages([deptName + ": webpage" for deptName, sequencesFile in departmentList])
+    websiteList = [collectWebsite(graph, deptName + ": ") for deptName, sequencesFile in departmentList]
+    print("Stages run: " + (", ".join(graph.getRerunStages()) or "none"))
+    return websiteList
+
+# Function that adds the inputs and stages shared by every department to the graph: the course,
+# category and accreditation information
+# Parameters:
+#   graph - stage graph
+#   coursesFile - path of the Excel file with the course information, or the content of the file (bytes)
+#   accreditationFile - path of the Excel file with the accreditation units, or the content of the file (bytes)
+#   categoriesFile - path of the Excel file with the course categories, or the content of the file (bytes)
+#   templateFile - path of the template HTML file
+def addSharedStages(graph, coursesFile, accreditationFile, categoriesFile, templateFile):
+    graph.addFileInput("coursesFile", coursesFile)
+    graph.addFileInput("accreditationFile", accreditationFile)
+    graph.addFileInput("categoriesFile", categoriesFile)
+    graph.addFileInput("templateFile", templateFile)
+
+    parsingModules = [sys.modules[__name__], parsinghelp, cleaner]
+    # decoding the workbooks does not need the courses, only linking their cells does
+    for workbook in ["courses", "accreditation", "categories"]:
+        graph.addStage(workbook + "Workbook", parsinghelp.decodeWorkbook, [workbook + "File"],
+                       [parsinghelp], "Decoding " + workbook + " workbook...", True)
+    graph.addStage("courses", courseparsing.parseCourses, ["coursesFile", "coursesWorkbook"],
+                   parsingModules + [courseparsing], "Parsing courses...")
+    graph.addStage("categories", categoriesparsing.parseCategories,
+                   ["categoriesFile", "courses", "categoriesWorkbook"],
+                   parsingModules + [categoriesparsing], "Parsing categories...")
+    graph.addStage("accreditationIndex", courseparsing.indexAccred, ["accreditationFile", "accreditationWorkbook"],
+                   parsingModules + [courseparsing], "Indexing accreditation...")
+
+# Function that adds the inputs and stages of a department to the graph
+# Parameters:
+#   graph - stage graph holding the shared stages (see addSharedStages)
+#   prefix - prefix of the names of the inputs and stages of the department, also used in
+#   their descriptions
+#   sequencesFile - path of the Excel file with the plan sequences, or the content of the file (bytes)
+#   deptName - name of the department
+#   options - dict that maps output options (see defaultOptions) to their values, missing options are off
+#   workers - number of worker processes the plans are rendered in, None to render them one after another
+#   parallel - whether the stages of the department run in a worker process of the graph
+def addDepartmentStages(graph, prefix, sequencesFile, deptName, options, workers, parallel):
+    graph.addFileInput(prefix + "sequencesFile", sequencesFile)
+    graph.addValueInput(prefix + "deptName", deptName)
+    graph.addValueInput(prefix + "options", {**defaultOptions, **options})
+
+    thisModule = sys.modules[__name__]
+    parsingModules = [thisModule, parsinghelp, cleaner]
+    webgenModules = [thisModule, categoryindex, cssgen, htmlgen, javascriptgen, layout, linegen, cleaner]
+    graph.addStage(prefix + "sequencesWorkbook", parsinghelp.decodeWorkbook, [prefix + "sequencesFile"],
+                   [parsinghelp], prefix + "Decoding sequences workbook...", True)
+    graph.addStage(prefix + "accreditation", applyAccreditation,
+                   ["categories", "accreditationIndex", prefix + "deptName"],
+                   parsingModules + [courseparsing], prefix + "Parsing accreditation...", parallel)
+    graph.addStage(prefix + "sequences", parseSequences,
+                   [prefix + "sequencesFile", "courses", prefix + "sequencesWorkbook"],
+                   parsingModules + [sequenceparsing], prefix + "Parsing sequences...", parallel)
+    graph.addStage(prefix + "plans", joinSequences, [prefix + "sequences", prefix + "accreditation"],
+                   parsingModules, prefix + "Adding categories and accreditation to plans...", parallel)
+    graph.addStage(prefix + "courseGroups", extractCourseGroups, [prefix + "sequences"],
+                   parsingModules + [coursegroupparsing], prefix + "Extracting course groups...", parallel)
+    graph.addStage(prefix + "categoryIndex", categoryindex.CategoryIndex, [prefix + "plans"],
+                   webgenModules, prefix + "Indexing categories...", parallel)
+    graph.addStage(prefix + "categoryCSS", renderCategoryCSS, ["categories", prefix + "categoryIndex"],
+                   webgenModules, prefix + "Writing category CSS...", parallel)
+    # the number of workers does not change the webpage, so it is not an input of the stage
+    graph.addStage(prefix + "webpage", functools.partial(renderWebpage, workers=workers),
+                   ["templateFile", prefix + "deptName", prefix + "plans", "categories",
+                    prefix + "courseGroups", prefix + "categoryIndex", prefix + "options"],
+                   webgenModules, prefix + "Placing course diagram...", parallel)
+
+# Function that collects the generated files of a department from the graph
+# Parameters:
+#   graph - stage graph
+#   prefix - prefix of the names of the stages of the department (see addDepartmentStages)
+# Returns: index.html (str), dict that maps the path of each other generated file to its content (bytes)
+def collectWebsite(graph, prefix):
+    html, renderedDict = graph.getOutput(prefix + "webpage")
+    outputDict = {"js/controller.js": renderedDict.pop("js/controller.js"),
+                  "js/index.js": renderedDict.pop("js/index.js"),
+                  "styles/category.css": graph.getOutput(prefix + "categoryCSS").encode("utf-8"),
+                  **renderedDict}
+    return html, outputDict
+
+# Stage that adds the accreditation units of a department to the courses
+# Parameters:
+#   categories - output of the categories stage: courseDict (with categories), categoryDict
+#   accreditationIndex - sheets of the accreditation Excel file by department (see courseparsing.indexAccred)
+#   deptName - name of the department
+# Returns: courseDict with the accreditation units filled in, categoryDict
+def applyAccreditation(categories, accreditationIndex, deptName):
+    courseDict, categoryDict = categories
+    courseparsing.applyAccred(courseDict, accreditationIndex, deptName)
+    return courseDict, categoryDict
+
+# Stage that parses the plan sequences from the courses alone, so that it does not depend on
+# the categories or the accreditation (see joinSequences). The electives are only added to
+# the courses by the categories, so they are stood in for by empty courses.
+# Parameters:
+#   sequencesFile - path of the Excel file
+#   courseDict - output of the courses stage
+#   book - decoded sequencing workbook
+# Returns: dict that maps plan names to a dict that represents the plan sequence
+def parseSequences(sequencesFile, courseDict, book):
+    for elective in electiveNames:
+        if elective not in courseDict:
+            courseDict[elective] = parsinghelp.Course(name = elective)
+    return sequenceparsing.parseSeq(sequencesFile, courseDict, book)
+
+# Stage that replaces every course of the plans by its copy with the categories and the
+# accreditation units filled in, keeping what the sequences set for the placement
+# Parameters:
+#   sequenceDict - output of the sequences stage
+#   accreditation - output of the accreditation stage: courseDict (with categories and
+#   accreditation units), categoryDict
+# Returns: dict that maps plan names to a dict that represents the plan sequence
+def joinSequences(sequenceDict, accreditation):
+    courseDict, categoryDict = accreditation
+    for plan in sequenceDict:
+        for term in sequenceDict[plan]:
+            placedCourses = []
+            for course in sequenceDict[plan][term]:
+                if course.name not in courseDict:
+                    # an elective the categories Excel file does not list keeps the stand-in
+                    # placed by the sequences parser (see parseSequences), without categories
+                    assert course.name in electiveNames, ("The course " + course.name + " in plan " + plan +
+                                                          " is not present in the Excel file with the course information.")
+                    placedCourses.append(course)
+                    continue
+                # copied for every placement, as the sequences parser does
+                placedCourse = copy.deepcopy(courseDict[course.name])
+                placedCourse.course_group = course.course_group
+                placedCourse.elective_group = course.elective_group
+                placedCourse.calendar_print = course.calendar_print
+                placedCourses.append(placedCourse)
+            sequenceDict[plan][term] = placedCourses
+    return sequenceDict
+
+# Stage that extracts the course group information of the plans
+# Parameters:
+#   sequenceDict - dict that maps plan names to a dict that represents the plan sequence
+# Returns: courseGroupDict, courseGroupList, initialCourseGroupVals (see coursegroupparsing)
+def extractCourseGroups(sequenceDict):
+    courseGroupDict = coursegroupparsing.extractPlanCourseGroupDict(sequenceDict)
+    courseGroupList = coursegroupparsing.findListofAllCourseGroups(courseGroupDict)
+    initialCourseGroupVals = coursegroupparsing.findInitialValuesofCourseGroups(courseGroupDict, courseGroupList)
+    return courseGroupDict, courseGroupList, initialCourseGroupVals
+
+# Stage that writes the colour highlighting CSS of the categories
+# Parameters:
+#   categories - output of the categories stage: courseDict, categoryDict
+#   categoryIndex - category index object
+# Returns: content of category.css (str)
+def renderCategoryCSS(categories, categoryIndex):
+    courseDict, categoryDict = categories
+    categoryCSS = io.StringIO()
+    mainCategoryDict, subCategoryDict = categoriesparsing.splitCategoryDict(categoryDict)
+    cssgen.writeCategoryCSS(mainCategoryDict, subCategoryDict, categoryIndex, categoryCSS)
+    return categoryCSS.getvalue()
+
+# Stage that places the HTML of the webpage and generates its JS
+# Parameters:
+#   templateFile - path of the template HTML file
+#   deptName - name of the department
+#   sequenceDict - dict that maps plan names to a dict that represents the plan sequence
+#   categories - output of the categories stage: courseDict, categoryDict
+#   courseGroups - output of the course groups stage: courseGroupDict, courseGroupList, initialCourseGroupVals
+#   categoryIndex - category index object
+#   options - dict that maps output options to their values
+#   workers - number of worker processes the plans are rendered in, None to render them one after another
+# Returns: index.html (str), dict that maps the path of each generated JS file and plan fragment to its content (bytes)
+def renderWebpage(templateFile, deptName, sequenceDict, categories, courseGroups, categoryIndex, options, workers=None):
+    courseDict, categoryDict = categories
+    courseGroupDict, courseGroupList, initialCourseGroupVals = courseGroups
+    with open(templateFile) as input:
+        # deriving parsed html and creating soup object
+        soup = BeautifulSoup(input, 'html.parser')
+
+    # the JS files are rendered into memory
+    controller = io.StringIO()
+    indexJS = io.StringIO()
+
+    # dict that maps the path of each generated file (relative to the
+    # output directory) to its content
+    outputDict = {}
+
+    # generating initial JS based on the number and names of plans
+    javascriptgen.initializeControllerJavaScript(sequenceDict,
+                                                initialCourseGroupVals,
+                                                courseGroupDict,
+                                                courseGroupList,
+                                                categoryIndex,
+                                                controller,
+                                                options["lazyPlans"],
+                                                options["delegateEvents"])
+    #locating title tag
+    topTitleTag = soup.head.find("title")
+    titleTag = soup.body.find("a", class_="site-title")
+
+    #locating main div, this is where all the html will be written
+    mainTag = soup.body.find("div", id="main")
+
+    # customizing webpage title
+    htmlgen.switchTitle(titleTag, topTitleTag, deptName)
+
+    # locating form tag
+    formTag = mainTag.find("form")
+
+    # placing main radio inputs
+    htmlgen.placeRadioInputs(formTag, courseGroupDict, soup)
+
+    # locating course group selector
+    courseGroupSelectTag = soup.body.find("div", class_="coursegroupselector")
+
+    # placing submenu radio inputs
+    htmlgen.placeCourseGroupRadioInputs(courseGroupSelectTag, soup, courseGroupDict)
+
+    # locating legend tag
+    legendTag = mainTag.find("div", class_="legend")
+
+    # places legend for color-coding
+    htmlgen.placeLegend(legendTag, categoryDict, soup)
+
+    # Generating display tag, this is where the course divs will be written
+    displayTag = htmlgen.generateDisplayDiv(soup, courseGroupList)
+
+    mainTag.append(displayTag)
+
+    # drawing the lines into one overlay SVG instead of one LeaderLine per line
+    if options["batchedLines"]:
+        linegen.writeBatchedLineRenderer(indexJS)
+
+    # rendering the HTML and lines of every plan independently, the batched line renderer
+    # draws lines from their precomputed geometry
+    planFragmentList = htmlgen.renderPlans(sequenceDict,
+                                           categoryIndex,
+                                           options["batchedLines"],
+                                           options["delegateEvents"],
+                                           workers)
+
+    #placing the HTML and generating JS based on the courses (drawing lines), in sheet order
+    if options["lazyPlans"]:
+        # each plan gets its own HTML fragment and JS chunk, loaded when first selected
+        planFragmentDict = htmlgen.placeLazyPlanDivs(displayTag, planFragmentList, soup)
+        outputDict.update(renderPlanFragments(planFragmentDict, indexJS))
+    else:
+        htmlgen.placePlanDivs(displayTag, planFragmentList, soup, indexJS, controller)
+
+    # placing the course description store read by the tooltips
+    htmlgen.placeCourseDescriptions(soup, sequenceDict)
+
+    # closing JS files
+    javascriptgen.closeControllerJavaScript(controller)
+    outputDict = {"js/controller.js": controller.getvalue().encode("utf-8"),
+                  "js/index.js": indexJS.getvalue().encode("utf-8"),
+                  **outputDict}
+    controller.close()
+    indexJS.close()
+    return str(soup), outputDict
+
+# Renders the HTML fragments and JS chunks of lazily loaded plans. The fragment of the
+# first plan is already inlined in index.html and its chunk goes into index.js, so that
+# the first plan needs no extra requests.
+# Parameters:
+#   planFragmentDict - dict that maps each plan key to a list of [HTML fragment, JS chunk body]
+#   indexJS - file handle for index.js
+# Returns: dict that maps the path of each rendered file to its content
+def renderPlanFragments(planFragmentDict, indexJS):
+    renderedDict = {}
+    firstPlan = True
+    for planKey in planFragmentDict:
+        fragment, chunkBody = planFragmentDict[planKey]
+        chunk = javascriptgen.generatePlanChunk(planKey, chunkBody)
+        if firstPlan:
+            indexJS.write(chunk)
+            firstPlan = False
+            continue
+        renderedDict[htmlgen.getPlanFragmentPath(planKey)[2:]] = fragment.encode("utf-8")
+        renderedDict[javascriptgen.getPlanChunkPath(planKey)[2:]] = chunk.encode("utf-8")
+    return renderedDict
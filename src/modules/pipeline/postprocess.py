@@ -0,0 +1,192 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the functions needed to post-process the generated webpage
+# without the GUI: pruning the unused CSS, bundling, minifying, hashing the asset
+# names and precompressing, in that order, and writing the result to an output
+# directory. Static assets (line.js, styles.css and the images) are read from the
+# static directory, which is the output directory when generating a single webpage.
+
+# Dependencies: bs4, io, os, zipfile, postprocessing
+
+import io
+import os
+import zipfile
+from bs4 import BeautifulSoup
+from ..postprocessing import bundling
+from ..postprocessing import compression
+from ..postprocessing import csspruning
+from ..postprocessing import hashing
+from ..postprocessing import minifier
+from ..postprocessing import outputwriter
+
+# post-processing options and their default values
+defaultOptions = {"pruneCSS": False, "singleBundle": False, "minifyOutput": False, "hashAssetNames": False}
+
+# static assets (relative to the static directory) that index.html may reference
+staticAssets = ["js/line.js",
+                "styles/styles.css",
+                "images/favicon.ico",
+                "images/uofalogo.png",
+                "images/requisite_legend.png"]
+
+# Function that post-processes the generated webpage
+# Parameters:
+#   html - index.html (str)
+#   outputDict - dict that maps the path of each other generated file to its content (bytes), updated in place
+#   options - dict that maps post-processing options (see defaultOptions) to their values, missing options are off
+#   staticDirectory - path of the directory the static assets are read from
+#   reportStage - function called with a message (str) before each post-processing stage
+# Returns: outputDict, with index.html added
+def postprocessWebsite(html, outputDict, options, staticDirectory="./output", reportStage=print):
+    options = {**defaultOptions, **options}
+    if options["pruneCSS"] or options["singleBundle"]:
+        # these stages edit the tags of index.html
+        soup = BeautifulSoup(html, 'html.parser')
+        if options["pruneCSS"]:
+            reportStage("Pruning unused CSS...")
+            pruneStylesheet(soup, outputDict, staticDirectory)
+        if options["singleBundle"]:
+            reportStage("Bundling output...")
+            bundleOutputFiles(soup, outputDict, staticDirectory)
+        html = str(soup)
+    print("Writing final HTML...")
+    outputDict["index.html"] = html.encode("utf-8")
+    # assets are hashed after minifying and before compressing, so that the hashes
+    # and the compressed siblings match the files that are served
+    if options["minifyOutput"]:
+        reportStage("Minifying output...")
+        minifyOutputFiles(outputDict)
+    if options["hashAssetNames"]:
+        reportStage("Hashing asset names...")
+        hashOutputAssets(outputDict, staticDirectory)
+    if options["minifyOutput"]:
+        reportStage("Compressing output...")
+        compressOutputFiles(outputDict)
+    return outputDict
+
+# Post-processing stage, writes a copy of styles.css without the rules that cannot match
+# anything in the generated HTML and JS (see csspruning) and links index.html to it.
+# The static styles.css is left in place for the next generation. Reports the bytes saved.
+# Parameters:
+#   soup - soup object of index.html, updated in place
+#   outputDict - dict that maps the path of each generated file to its content, updated in place
+#   staticDirectory - path of the directory the static assets are read from
+def pruneStylesheet(soup, outputDict, staticDirectory):
+    contentList = [str(soup), hashing.readAsset(os.path.join(staticDirectory, "js/line.js")).decode("utf-8")]
+    for path in outputDict:
+        if path.endswith((".html", ".js")):
+            contentList.append(outputDict[path].decode("utf-8"))
+    stylesheet = hashing.readAsset(os.path.join(staticDirectory, "styles/styles.css")).decode("utf-8")
+    prunedStylesheet = csspruning.pruneCSS(stylesheet, csspruning.UsedNames(contentList))
+    outputDict["styles/styles.pruned.css"] = prunedStylesheet.encode("utf-8")
+    soup.head.find("link", href="./styles/styles.css")["href"] = "./styles/styles.pruned.css"
+    before = len(stylesheet.encode("utf-8"))
+    after = len(outputDict["styles/styles.pruned.css"])
+    print("  styles/styles.css: " + str(before) + " -> " + str(after) + " bytes, " +
+          str(before - after) + " bytes saved")
+
+# Post-processing stage, bundles the webpage into a self-contained page: the vendored
+# runtime libraries and the JS files are concatenated into two bundles and the CSS is
+# inlined into index.html. Reports the bundle sizes.
+# Parameters:
+#   soup - soup object of index.html, updated in place
+#   outputDict - dict that maps the path of each generated file to its content, updated in place
+#   staticDirectory - path of the directory the static assets are read from
+def bundleOutputFiles(soup, outputDict, staticDirectory):
+    bundling.bundleAssets(staticDirectory, soup, outputDict)
+    for bundle in [bundling.vendorBundle, bundling.scriptBundle]:
+        print("  " + bundle + ": " + str(len(outputDict[bundle])) + " bytes")
+
+# Post-processing stage, minifies the generated files. Reports the sizes before and after.
+# Parameters:
+#   outputDict - dict that maps the path of each generated file to its content, updated in place
+def minifyOutputFiles(outputDict):
+    totalBefore = 0
+    totalAfter = 0
+    for path in outputDict:
+        before = len(outputDict[path])
+        outputDict[path] = minifier.minifyContent(path, outputDict[path])
+        after = len(outputDict[path])
+        totalBefore += before
+        totalAfter += after
+        print("  " + path + ": " + str(before) + " -> " + str(after) + " bytes")
+    print("  total: " + str(totalBefore) + " -> " + str(totalAfter) + " bytes")
+
+# Post-processing stage, renames the static and generated assets with a content hash
+# and rewrites the references to them in index.html. Adds manifest.json.
+# Parameters:
+#   outputDict - dict that maps the path of each generated file to its content, updated in place
+#   staticDirectory - path of the directory the static assets are read from
+def hashOutputAssets(outputDict, staticDirectory):
+    # static assets that were bundled or replaced (eg: by the pruned stylesheet) are no
+    # longer referenced by index.html
+    referencedAssets = [asset for asset in staticAssets
+                        if b"./" + asset.encode("utf-8") in outputDict["index.html"]]
+    # plan chunks are referenced from controller.js (or the bundle holding it), so it has to be hashed last
+    generatedAssets = sorted([path for path in outputDict if path != "index.html"],
+                             key=lambda asset: asset in ["js/controller.js", bundling.scriptBundle])
+    manifest = hashing.hashAssets(staticDirectory, outputDict, referencedAssets, generatedAssets, ["index.html"])
+    for asset in manifest:
+        print("  " + asset + " -> " + manifest[asset])
+
+# Post-processing stage, adds the precompressed (.gz, and .br if brotli is installed)
+# siblings of the generated text files. Images are already compressed and are skipped.
+# Reports the compressed sizes.
+# Parameters:
+#   outputDict - dict that maps the path of each generated file to its content, updated in place
+def compressOutputFiles(outputDict):
+    for path in [path for path in outputDict if path.endswith(hashing.textAssetExtensions)]:
+        compressedDict = compression.compressContent(outputDict[path])
+        report = "  " + path + ":"
+        for extension in compressedDict:
+            outputDict[path + extension] = compressedDict[extension]
+            report += " " + extension + " " + str(len(compressedDict[extension])) + " bytes"
+        print(report)
+
+# Function that adds the static assets referenced by index.html that are not generated
+# (eg: line.js when the asset names are not hashed), so that the webpage can be written
+# to a directory other than the static directory. A referenced asset that is missing
+# from the static directory is an error, as the webpage would be written without it.
+# Parameters:
+#   outputDict - dict that maps the path of each generated file to its content, updated in place
+#   staticDirectory - path of the directory the static assets are read from
+def addStaticAssets(outputDict, staticDirectory):
+    for asset in staticAssets:
+        if asset in outputDict or b"./" + asset.encode("utf-8") not in outputDict["index.html"]:
+            continue
+        if not os.path.isfile(os.path.join(staticDirectory, asset)):
+            raise FileNotFoundError("The static asset " + asset + " referenced by index.html is missing from " +
+                                    staticDirectory + ", ensure the output directory is organized correctly")
+        outputDict[asset] = hashing.readAsset(os.path.join(staticDirectory, asset))
+
+# Writes the generated files to the output directory. Files whose content did not
+# change are left untouched.
+# Parameters:
+#   outputDirectory - path of the output directory
+#   outputDict - dict that maps the path of each generated file to its content
+def writeOutputFiles(outputDirectory, outputDict):
+    writtenFiles = outputwriter.writeOutputFiles(outputDirectory, outputDict)
+    for path in writtenFiles:
+        print("  wrote " + path)
+    print("  " + str(len(writtenFiles)) + " written, " +
+          str(len(outputDict) - len(writtenFiles)) + " unchanged")
+
+# Function that packs the generated files into a zip archive. The entries are sorted and
+# carry a fixed timestamp, so the same files always give the same archive.
+# Parameters:
+#   outputDict - dict that maps the path of each generated file to its content
+# Returns: content of the zip archive (bytes)
+def createZipArchive(outputDict):
+    zipBuffer = io.BytesIO()
+    with zipfile.ZipFile(zipBuffer, "w") as zipArchive:
+        for path in sorted(outputDict):
+            entry = zipfile.ZipInfo(path, date_time=(1980, 1, 1, 0, 0, 0))
+            entry.external_attr = 0o644 << 16
+            # precompressed siblings and images would not get any smaller
+            compressed = not path.endswith((".gz", ".br", ".png", ".ico"))
+            entry.compress_type = zipfile.ZIP_DEFLATED if compressed else zipfile.ZIP_STORED
+            zipArchive.writestr(entry, outputDict[path])
+    return zipBuffer.getvalue()
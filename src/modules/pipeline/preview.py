@@ -0,0 +1,307 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the functions and classes needed to preview the webpage while
+# editing its Excel files. The Excel files, the template and the static assets are
+# polled for changes, and every change regenerates the webpage in memory (only the
+# stages whose inputs changed are run again, see stagegraph). The webpage is served
+# from memory on localhost, with gzip and ETags, and reloads itself in the browser
+# when it was regenerated: index.html is served with a script that long-polls the
+# server for a new version. Nothing is written to the output directory.
+# Run from the directory of main.py (the template and static assets are read from it):
+#   python -m modules.pipeline.preview Courses.xls AccreditationUnits.xls CourseCategories.xls
+#       Sequencing.xls "Mechanical Engineering" --option lazyPlans
+
+# Dependencies: argparse, hashlib, http.server, mimetypes, os, socketserver, threading,
+# time, traceback, urllib, bundling, compression, hashing, artifacts, generation, postprocess
+
+import argparse
+import hashlib
+import http.server
+import mimetypes
+import os
+import socketserver
+import threading
+import time
+import traceback
+import urllib.parse
+from ..postprocessing import bundling
+from ..postprocessing import compression
+from ..postprocessing import hashing
+from . import artifacts
+from . import generation
+from . import postprocess
+
+# path the live reload script polls for a new version of the webpage
+liveReloadPath = "/__livereload"
+
+# seconds a live reload request is held open while the webpage does not change
+liveReloadTimeout = 25
+
+# script added to the served index.html, reloads the page when the server has a newer
+# version. {version} is replaced by the version of the page
+liveReloadScript = """<script>
+(function () {
+  var version = "{version}";
+  function poll() {
+    fetch("/__livereload?version=" + encodeURIComponent(version)).then(function (response) {
+      return response.text();
+    }).then(function (latestVersion) {
+      if (latestVersion !== version) {
+        location.reload();
+      } else {
+        poll();
+      }
+    }, function () {
+      // the server is restarting or busy, try again later
+      setTimeout(poll, 1000);
+    });
+  }
+  poll();
+})();
+</script>
+"""
+
+# Class that holds the files of the latest version of the webpage, shared by the thread
+# that regenerates the webpage and the threads that serve requests
+class PreviewSite:
+    def __init__(self) -> None:
+        # notified whenever a new version is published
+        self.condition = threading.Condition()
+
+        # version of the webpage, unique across restarts of the server so that the pages
+        # loaded from an earlier server reload too
+        self.startTime = str(int(time.time()))
+        self.version = self.startTime + "-0"
+
+        # Dict that maps the path of each file (relative to the output directory) to [content, ETag]
+        self.fileDict = {}
+
+        # Dict that maps the ETags of the files to their gzipped content, filled in when first requested
+        self.gzipDict = {}
+
+    # Publishes a new version of the webpage and wakes up the pages waiting for it
+    # Parameters:
+    #   outputDict: dict that maps the path of each file to its content (bytes), must hold index.html
+    def publish(self, outputDict = {}):
+        with self.condition:
+            version = self.startTime + "-" + str(int(self.version.split("-")[1]) + 1)
+            outputDict = dict(outputDict)
+            outputDict["index.html"] = addLiveReloadScript(outputDict["index.html"], version)
+            self.fileDict = {path: [outputDict[path], getETag(outputDict[path])] for path in outputDict}
+            self.gzipDict = {}
+            self.version = version
+            self.condition.notify_all()
+
+    # Returns the version of the webpage once it differs from version, or the current version
+    # if it did not change within timeout seconds
+    # Parameters:
+    #   version: version of the webpage that is loaded (str)
+    #   timeout: seconds to wait for a new version (float)
+    def waitForVersion(self, version = "", timeout = 0) -> str:
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    # Returns the content of a file as it should be sent
+    # Parameters:
+    #   path: path of the file (str)
+    #   acceptsGzip: whether the client accepts gzip encoding (bool)
+    # Returns: [content (bytes), ETag (str), content encoding (str) or None], None if there is no such file
+    def getFile(self, path = "", acceptsGzip = False):
+        fileDict = self.fileDict
+        if path not in fileDict:
+            return None
+        content, etag = fileDict[path]
+        if not acceptsGzip or not path.endswith(hashing.textAssetExtensions):
+            return [content, etag, None]
+        if path + ".gz" in fileDict:
+            # the minified output already holds a precompressed sibling
+            return [fileDict[path + ".gz"][0], etag[:-1] + "-gzip\"", "gzip"]
+        if etag not in self.gzipDict:
+            # a fast compression level, the preview is served on localhost
+            self.gzipDict[etag] = compression.gzipContent(content, 6)
+        return [self.gzipDict[etag], etag[:-1] + "-gzip\"", "gzip"]
+
+# Class that defines the preview HTTP server, which serves every request in its own thread
+class PreviewServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+    # Parameters:
+    #   address: [host, port] the server listens on
+    #   site: PreviewSite the files are served from
+    def __init__(self, address = ("127.0.0.1", 8000), site = None) -> None:
+        super().__init__(address, PreviewRequestHandler)
+        self.site = site
+
+# Class that defines the handler of the requests of the preview server
+class PreviewRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.sendResponse(True)
+
+    def do_HEAD(self):
+        self.sendResponse(False)
+
+    # Sends the response to a request: a file of the webpage, or the latest version of
+    # the webpage for the live reload script
+    # Parameters:
+    #   sendBody: whether to send the content (False for HEAD requests) (bool)
+    def sendResponse(self, sendBody = True):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == liveReloadPath:
+            version = urllib.parse.parse_qs(url.query).get("version", [""])[0]
+            content = self.server.site.waitForVersion(version, liveReloadTimeout).encode("utf-8")
+            self.sendHeaders(200, "text/plain; charset=utf-8", len(content), {"Cache-Control": "no-store"})
+            if sendBody:
+                self.wfile.write(content)
+            return
+
+        path = urllib.parse.unquote(url.path).lstrip("/") or "index.html"
+        if path.endswith("/"):
+            path += "index.html"
+        servedFile = self.server.site.getFile(path, "gzip" in self.headers.get("Accept-Encoding", ""))
+        if servedFile is None:
+            content = b"Not found"
+            self.sendHeaders(404, "text/plain; charset=utf-8", len(content), {})
+            if sendBody:
+                self.wfile.write(content)
+            return
+
+        content, etag, encoding = servedFile
+        # the browser revalidates every request, unchanged files are answered with a 304
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.sendHeaders(304, None, None, headers)
+            return
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        contentType = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if contentType.startswith("text/") or contentType == "application/javascript":
+            contentType += "; charset=utf-8"
+        self.sendHeaders(200, contentType, len(content), headers)
+        if sendBody:
+            self.wfile.write(content)
+
+    # Sends the status line and headers of a response
+    # Parameters:
+    #   status: HTTP status code (int)
+    #   contentType: value of the Content-Type header, None to leave it out (str)
+    #   contentLength: value of the Content-Length header, None to leave it out (int)
+    #   headers: dict that maps the names of other headers to their values
+    def sendHeaders(self, status = 200, contentType = None, contentLength = None, headers = {}):
+        self.send_response(status)
+        if contentType is not None:
+            self.send_header("Content-Type", contentType)
+        if contentLength is not None:
+            self.send_header("Content-Length", str(contentLength))
+        for header in headers:
+            self.send_header(header, headers[header])
+        self.end_headers()
+
+    # the requests are not logged, the live reload requests would flood the console
+    def log_message(self, format, *args):
+        return
+
+# Function that previews the webpage: serves it on localhost and regenerates it whenever
+# one of its input files changes, until interrupted (Ctrl+C)
+# Parameters:
+#   coursesFile - path of the Excel file with the course information
+#   accreditationFile - path of the Excel file with the accreditation units
+#   categoriesFile - path of the Excel file with the course categories
+#   sequencesFile - path of the Excel file with the plan sequences
+#   deptName - name of the department
+#   options - dict that maps output options (of the generation and the post-processing) to their values
+#   port - port the preview is served on (int)
+#   interval - seconds between two checks of the input files (float)
+#   cacheDirectory - path of the directory the stage outputs are cached in, None to run every stage
+#   staticDirectory - path of the directory the static assets are read from
+#   templateFile - path of the template HTML file
+def previewWebsite(coursesFile, accreditationFile, categoriesFile, sequencesFile, deptName, options,
+                   port=8000, interval=0.5, cacheDirectory=generation.stageCacheDirectory,
+                   staticDirectory="./output", templateFile="template.html"):
+    watchedFiles = [coursesFile, accreditationFile, categoriesFile, sequencesFile, templateFile]
+    watchedFiles += [os.path.join(staticDirectory, asset) for asset in postprocess.staticAssets]
+    if options.get("singleBundle", False):
+        watchedFiles += [os.path.join(bundling.vendorDirectory, library) for library in bundling.vendoredLibraries]
+
+    site = PreviewSite()
+    server = PreviewServer(("127.0.0.1", port), site)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print("Previewing on http://127.0.0.1:" + str(port) + "/, press Ctrl+C to stop")
+
+    fileStates = None
+    try:
+        while True:
+            latestFileStates = [getFileState(path) for path in watchedFiles]
+            if latestFileStates != fileStates:
+                fileStates = latestFileStates
+                startTime = time.time()
+                try:
+                    site.publish(artifacts.renderArtifacts(coursesFile, accreditationFile, categoriesFile,
+                                                           sequencesFile, deptName, options, print,
+                                                           cacheDirectory, staticDirectory, templateFile))
+                    print("Preview updated in " + str(round(time.time() - startTime, 2)) + " s")
+                except Exception:
+                    # a file may be saved while it is read, or hold an error: the last
+                    # version stays up until the next change
+                    traceback.print_exc()
+                    print("Preview not updated, it will be regenerated when a file changes again")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Preview stopped")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+# Function that adds the live reload script to index.html
+# Parameters:
+#   content - content of index.html (bytes)
+#   version - version of the webpage (str)
+# Returns: content of index.html with the script at the end of its body (bytes)
+def addLiveReloadScript(content, version):
+    script = liveReloadScript.replace("{version}", version).encode("utf-8")
+    if b"</body>" not in content:
+        return content + script
+    return content.replace(b"</body>", script + b"</body>", 1)
+
+# Function that returns the ETag of the content of a file
+# Parameters:
+#   content - content of the file (bytes)
+def getETag(content):
+    return "\"" + hashlib.sha256(content).hexdigest()[:20] + "\""
+
+# Function that returns the state of a file, which changes whenever the file is modified
+# Parameters:
+#   path - path of the file
+# Returns: [modification time (ns), size], None if the file does not exist
+def getFileState(path):
+    try:
+        fileStat = os.stat(path)
+    except OSError:
+        return None
+    return [fileStat.st_mtime_ns, fileStat.st_size]
+
+if __name__ == "__main__":
+    optionNames = list(generation.defaultOptions) + list(postprocess.defaultOptions)
+    parser = argparse.ArgumentParser(description="Previews the webpage on localhost and regenerates it when its files change")
+    parser.add_argument("courses", help="path of the Excel file with the course information")
+    parser.add_argument("accreditation", help="path of the Excel file with the accreditation units")
+    parser.add_argument("categories", help="path of the Excel file with the course categories")
+    parser.add_argument("sequences", help="path of the Excel file with the plan sequences")
+    parser.add_argument("department", help="name of the department")
+    parser.add_argument("--option", action="append", default=[], choices=optionNames,
+                        help="output option to turn on, may be repeated")
+    parser.add_argument("--port", type=int, default=8000, help="port the preview is served on (default: 8000)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="run every stage instead of reusing the unchanged stages")
+    arguments = parser.parse_args()
+    previewWebsite(arguments.courses,
+                   arguments.accreditation,
+                   arguments.categories,
+                   arguments.sequences,
+                   arguments.department,
+                   {option: True for option in arguments.option},
+                   arguments.port,
+                   cacheDirectory=None if arguments.no_cache else generation.stageCacheDirectory)
@@ -0,0 +1,306 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the functions and classes needed to run the generation as a local
+# HTTP service. A POST request to /generate carries the four Excel files and the name of
+# the department as multipart/form-data (fields "courses", "accreditation", "categories",
+# "sequences", "department" and any number of "option" fields naming output options),
+# and is answered with the generated webpage as a zip archive. The generations run in a
+# bounded pool of worker processes. The archives are cached by a hash of every input
+# (the Excel files, department, options, template and static assets), so an identical
+# request is answered from the cache, and identical requests that arrive while the
+# webpage is being generated share the generation. The service only listens on localhost.
+# Run from the directory of main.py (the template and static assets are read from it):
+#   python -m modules.pipeline.service --port 8080 --workers 4
+# and request a webpage with eg:
+#   curl -F courses=@Courses.xls -F accreditation=@AccreditationUnits.xls -F categories=@CourseCategories.xls
+#       -F sequences=@Sequencing.xls -F department="Mechanical Engineering" -F option=lazyPlans
+#       -o website.zip http://127.0.0.1:8080/generate
+
+# Dependencies: argparse, collections, concurrent.futures, email, hashlib, http.server, json,
+# os, socketserver, threading, traceback, urllib, xlrd, cleaner, bundling,
+# artifacts, generation, postprocess
+
+import argparse
+import collections
+import concurrent.futures
+import email.parser
+import email.policy
+import hashlib
+import http.server
+import json
+import os
+import socketserver
+import threading
+import traceback
+import urllib.parse
+import xlrd
+from .. import cleaner
+from ..postprocessing import bundling
+from . import artifacts
+from . import generation
+from . import postprocess
+
+# names of the form fields holding the Excel files, in the order generateWebsite takes them
+workbookFields = ["courses", "accreditation", "categories", "sequences"]
+
+# errors the parsers raise on purpose for Excel files that are malformed or posted in the wrong
+# field: xlrd's errors and the failed checks (assertions) of the parsers. Any other error is
+# an error of the generator, the Excel files are posted as bytes so none can be missing
+workbookErrors = (xlrd.biffh.XLRDError, AssertionError)
+
+# largest request body accepted (bytes)
+maxRequestSize = 64 * 1024 * 1024
+
+# Class that defines an object that runs the generations in a pool of worker processes and
+# caches their results
+class GenerationService:
+    # Parameters:
+    #   workers - number of worker processes (int)
+    #   queueLimit - number of generations that may be running or waiting for a worker, further
+    #   requests are turned away until one finishes (int)
+    #   cacheLimit - number of archives kept in the result cache (int)
+    #   cacheDirectory - path of the directory the stage outputs are cached in, shared by the
+    #   workers, None to run every stage
+    #   staticDirectory - path of the directory the static assets are read from
+    #   templateFile - path of the template HTML file
+    def __init__(self, workers = 2, queueLimit = 8, cacheLimit = 32, cacheDirectory = None,
+                 staticDirectory = "./output", templateFile = "template.html") -> None:
+        self.executor = concurrent.futures.ProcessPoolExecutor(workers)
+        self.queueLimit = queueLimit
+        self.cacheLimit = cacheLimit
+        self.cacheDirectory = cacheDirectory
+        self.staticDirectory = staticDirectory
+        self.templateFile = templateFile
+
+        # guards resultCache and runningJobs, which are shared by the request threads
+        self.lock = threading.Lock()
+
+        # OrderedDict that maps input hashes to archives, least recently used first
+        self.resultCache = collections.OrderedDict()
+
+        # Dict that maps the input hashes of the generations that are running or waiting to their futures
+        self.runningJobs = {}
+
+    # Returns the archive of a webpage, from the cache or generated by a worker process
+    # Parameters:
+    #   workbookDict: dict that maps each name of workbookFields to the content of the Excel file (bytes)
+    #   deptName: name of the department (str)
+    #   options: dict that maps output options to their values
+    # Returns: [archive (bytes), True if it came from the cache], None if the queue is full.
+    # Errors of the generation are raised
+    def generate(self, workbookDict = {}, deptName = "", options = {}):
+        inputHash = self.getInputHash(workbookDict, deptName, options)
+        submitted = False
+        with self.lock:
+            if inputHash in self.resultCache:
+                self.resultCache.move_to_end(inputHash)
+                return [self.resultCache[inputHash], True]
+            if inputHash in self.runningJobs:
+                # an identical request is being generated, share its result
+                future = self.runningJobs[inputHash]
+            elif len(self.runningJobs) >= self.queueLimit:
+                return None
+            else:
+                future = self.executor.submit(generateArchive, workbookDict, deptName, options,
+                                              self.cacheDirectory, self.staticDirectory, self.templateFile)
+                self.runningJobs[inputHash] = future
+                submitted = True
+        if submitted:
+            # registered outside the lock, as the callback takes the lock and is run right away
+            # if the generation has already finished
+            future.add_done_callback(lambda future: self.storeResult(inputHash, future))
+        return [future.result(), False]
+
+    # Stores the archive of a finished generation in the cache, failed generations are not cached
+    # Parameters:
+    #   inputHash: input hash of the generation (str)
+    #   future: future of the generation
+    def storeResult(self, inputHash = "", future = None):
+        with self.lock:
+            del self.runningJobs[inputHash]
+            if future.cancelled() or future.exception() is not None:
+                return
+            self.resultCache[inputHash] = future.result()
+            while len(self.resultCache) > self.cacheLimit:
+                self.resultCache.popitem(last=False)
+
+    # Returns a hash of every input of a generation: the Excel files, department name and
+    # options of the request, and the template and static assets of the service (which
+    # may be edited while it runs)
+    # Parameters:
+    #   workbookDict: dict that maps each name of workbookFields to the content of the Excel file (bytes)
+    #   deptName: name of the department (str)
+    #   options: dict that maps output options to their values
+    def getInputHash(self, workbookDict = {}, deptName = "", options = {}) -> str:
+        inputHash = hashlib.sha256()
+        for field in workbookFields:
+            inputHash.update(hashlib.sha256(workbookDict[field]).digest())
+        inputHash.update(json.dumps([deptName, options], sort_keys=True).encode("utf-8"))
+        siteFiles = [self.templateFile] + [os.path.join(self.staticDirectory, asset) for asset in postprocess.staticAssets]
+        if options.get("singleBundle", False):
+            siteFiles += [os.path.join(bundling.vendorDirectory, library) for library in bundling.vendoredLibraries]
+        for path in siteFiles:
+            if os.path.isfile(path):
+                with open(path, "rb") as siteFile:
+                    inputHash.update(hashlib.sha256(siteFile.read()).digest())
+            else:
+                inputHash.update(b"missing")
+        return inputHash.hexdigest()
+
+    # Stops the worker processes once the running generations are finished
+    def shutdown(self):
+        self.executor.shutdown()
+
+# Function that generates a webpage into a zip archive, run in a worker process. The Excel
+# files are parsed from memory, so concurrent generations do not share any files.
+# Parameters:
+#   workbookDict - dict that maps each name of workbookFields to the content of the Excel file (bytes)
+#   deptName - name of the department
+#   options - dict that maps output options (of the generation and the post-processing) to their values
+#   cacheDirectory - path of the directory the stage outputs are cached in, None to run every stage
+#   staticDirectory - path of the directory the static assets are read from
+#   templateFile - path of the template HTML file
+# Returns: content of the zip archive (bytes)
+def generateArchive(workbookDict, deptName, options, cacheDirectory, staticDirectory, templateFile):
+    # reports the stages of the generation, prefixed with the department
+    def reportProgress(message):
+        print(deptName + ": " + message)
+
+    artifactDict = artifacts.renderArtifacts(*[workbookDict[field] for field in workbookFields], deptName, options,
+                                             reportProgress, cacheDirectory, staticDirectory, templateFile)
+    return postprocess.createZipArchive(artifactDict)
+
+# Class that defines the HTTP server of the service, which serves every request in its own thread
+class ServiceServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+    # Parameters:
+    #   port: port the server listens on, on localhost (int)
+    #   service: GenerationService the requests are handed to
+    def __init__(self, port = 8080, service = None) -> None:
+        super().__init__(("127.0.0.1", port), ServiceRequestHandler)
+        self.service = service
+
+# Class that defines the handler of the requests of the service
+class ServiceRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if urllib.parse.urlsplit(self.path).path != "/":
+            self.sendText(404, "Not found")
+            return
+        self.sendText(200, "POST the Excel files (courses, accreditation, categories, sequences), the " +
+                           "department and any options (option) as multipart/form-data to /generate")
+
+    def do_POST(self):
+        if urllib.parse.urlsplit(self.path).path != "/generate":
+            self.sendText(404, "Not found")
+            return
+        contentLength = int(self.headers.get("Content-Length", 0))
+        if contentLength <= 0 or contentLength > maxRequestSize:
+            self.sendText(413, "The request must carry the Excel files and be at most " +
+                               str(maxRequestSize) + " bytes")
+            return
+        try:
+            workbookDict, deptName, options = parseGenerationRequest(self.headers.get("Content-Type", ""),
+                                                                     self.rfile.read(contentLength))
+        except ValueError as err:
+            self.sendText(400, str(err))
+            return
+
+        try:
+            result = self.server.service.generate(workbookDict, deptName, options)
+        except workbookErrors as err:
+            # errors in the Excel files (eg: a file posted in the wrong field), their messages are meant for the user
+            self.sendText(400, str(err))
+            return
+        except Exception:
+            traceback.print_exc()
+            self.sendText(500, "An unhandled error has occured, see the console of the service")
+            return
+        if result is None:
+            self.sendText(503, "Too many generations are waiting, try again later", {"Retry-After": "5"})
+            return
+
+        archive, cached = result
+        self.send_response(200)
+        self.send_header("Content-Type", "application/zip")
+        self.send_header("Content-Length", str(len(archive)))
+        self.send_header("Content-Disposition", "attachment; filename=\"" + cleaner.cleanString(deptName) + ".zip\"")
+        self.send_header("X-Cache", "hit" if cached else "miss")
+        self.end_headers()
+        self.wfile.write(archive)
+
+    # Sends a plain text response
+    # Parameters:
+    #   status: HTTP status code (int)
+    #   text: content of the response (str)
+    #   headers: dict that maps the names of other headers to their values
+    def sendText(self, status = 200, text = "", headers = {}):
+        content = (text + "\n").encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        for header in headers:
+            self.send_header(header, headers[header])
+        self.end_headers()
+        self.wfile.write(content)
+
+# Function that reads the fields of a generation request
+# Parameters:
+#   contentType - Content-Type header of the request (str)
+#   body - body of the request (bytes)
+# Returns: workbookDict (dict that maps each name of workbookFields to the content of the
+# Excel file), name of the department, dict that maps the options that were given to True.
+# Raises ValueError if a field is missing or an option is unknown
+def parseGenerationRequest(contentType, body):
+    if not contentType.startswith("multipart/form-data"):
+        raise ValueError("The request must be sent as multipart/form-data")
+    # the body is parsed as a MIME message, with the Content-Type of the request as its header
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        b"Content-Type: " + contentType.encode("latin-1") + b"\r\n\r\n" + body)
+    fieldDict = {}  # maps the name of each field to the list of its values (bytes)
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        fieldDict.setdefault(name, []).append(part.get_payload(decode=True))
+
+    workbookDict = {}
+    for field in workbookFields + ["department"]:
+        if field not in fieldDict or fieldDict[field][0] == b"":
+            raise ValueError("The request has no " + field + " field")
+        workbookDict[field] = fieldDict[field][0]
+    deptName = workbookDict.pop("department").decode("utf-8").strip()
+
+    options = {}
+    for option in fieldDict.get("option", []):
+        option = option.decode("utf-8").strip()
+        if option not in generation.defaultOptions and option not in postprocess.defaultOptions:
+            raise ValueError("Unknown option: " + option)
+        options[option] = True
+    return workbookDict, deptName, options
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the generation as an HTTP service on localhost")
+    parser.add_argument("--port", type=int, default=8080, help="port the service listens on (default: 8080)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--queue", type=int, default=None,
+                        help="number of generations that may be running or waiting (default: four per worker)")
+    parser.add_argument("--cache-size", type=int, default=32, help="number of archives kept in the cache (default: 32)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="run every stage instead of reusing the stages of earlier generations")
+    arguments = parser.parse_args()
+    service = GenerationService(arguments.workers,
+                                arguments.queue or 4 * arguments.workers,
+                                arguments.cache_size,
+                                None if arguments.no_cache else generation.stageCacheDirectory)
+    server = ServiceServer(arguments.port, service)
+    print("Serving on http://127.0.0.1:" + str(arguments.port) + "/, press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Service stopped")
+    finally:
+        server.server_close()
+        service.shutdown()
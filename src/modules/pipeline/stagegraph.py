@@ -0,0 +1,307 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the class used to run the stages of the generation as a graph
+# whose outputs are cached on disk. Every stage is identified by a content hash (key)
+# of its name, the source code of the modules it runs and the hashes of its inputs,
+# and every output is identified by the hash of its content. A stage whose key is
+# already in the cache is not run, and since a stage's key only depends on the content
+# of its inputs, a stage whose inputs were recomputed with an unchanged result is not
+# run either. Outputs are handed to the stages as fresh copies, so that a stage may
+# modify its inputs.
+# Stages are scheduled as soon as their inputs are ready. Stages declared parallel
+# (eg: decoding a workbook) run concurrently in a pool of worker processes, while the
+# other stages run in this process in the meantime.
+# The cache keeps the most recently used entries of every stage (see cacheLimit), older
+# entries are pruned whenever the stage writes a new one, so the cache does not grow with
+# every edit of the Excel files.
+
+# Dependencies: concurrent.futures, hashlib, os, pickle, tempfile, time, urllib
+
+import concurrent.futures
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+import urllib.parse
+
+# Class that defines an object used to declare and run the stages of the generation
+class StageGraph:
+    # Parameters:
+    #   cacheDirectory - path of the directory the stage outputs are cached in,
+    #   None to run every stage without caching (str)
+    #   reportProgress - function called with a message (str) before each stage is run or reused
+    #   workers - number of worker processes the parallel stages run in, None to run every
+    #   stage in this process (int). The stage functions must then be importable by the workers
+    #   cacheLimit - number of cache entries kept for every stage, the least recently used
+    #   entries beyond it are deleted (int)
+    def __init__(self, cacheDirectory = None, reportProgress = print, workers = None, cacheLimit = 16) -> None:
+        self.cacheDirectory = cacheDirectory
+        self.reportProgress = reportProgress
+        self.workers = workers
+        self.cacheLimit = cacheLimit
+
+        # Dict that maps the inputs of the graph (files and values) to [content hash, value]
+        self.inputDict = {}
+
+        # Dict that maps stage names to [function, list of input names, code version, description, parallel]
+        self.stageDict = {}
+
+        # Dict that maps the names of the resolved stages to [output hash, pickled output or
+        # None if it was not loaded from the cache yet, key]
+        self.resultDict = {}
+
+        # names of the stages that were run (not reused from the cache), in order
+        self.rerunStages = []
+
+    # Adds a file input, identified by the hash of its content. The value handed to the
+    # stages is the path of the file, or its content if the content was given instead of
+    # a path. A missing file gets a hash of its path, so that the stage reading it runs
+    # and reports the file as missing.
+    # Parameters:
+    #   name: name of the input (str)
+    #   path: path of the file (str), or the content of the file (bytes)
+    def addFileInput(self, name = "", path = ""):
+        if isinstance(path, bytes):
+            contentHash = hashlib.sha256(path).hexdigest()
+        elif os.path.isfile(path):
+            with open(path, "rb") as inputFile:
+                contentHash = hashlib.sha256(inputFile.read()).hexdigest()
+        else:
+            contentHash = hashlib.sha256(("missing:" + path).encode("utf-8")).hexdigest()
+        self.inputDict[name] = [contentHash, path]
+
+    # Adds a value input (eg: department name, output options), identified by the hash
+    # of its pickled value
+    # Parameters:
+    #   name: name of the input (str)
+    #   value: value of the input, must be picklable
+    def addValueInput(self, name = "", value = None):
+        self.inputDict[name] = [hashlib.sha256(pickle.dumps(value)).hexdigest(), value]
+
+    # Adds a stage to the graph
+    # Parameters:
+    #   name: name of the stage (str)
+    #   function: function that computes the output of the stage, called with the values of the inputs
+    #   inputNames: names of the inputs and stages whose outputs the function is called with (list of str)
+    #   codeModules: modules whose source code the output depends on (list of modules)
+    #   description: message reported when the stage is run (str)
+    #   parallel: whether the stage may run in a worker process (bool), its function, inputs and
+    #   output must then be picklable
+    def addStage(self, name = "", function = None, inputNames = [], codeModules = [], description = "",
+                 parallel = False):
+        codeHash = hashlib.sha256()
+        for module in codeModules:
+            with open(module.__file__, "rb") as moduleFile:
+                codeHash.update(moduleFile.read())
+        self.stageDict[name] = [function, inputNames, codeHash.hexdigest(), description, parallel]
+
+    # Returns the content hash of an input or of the output of a stage, the stage (and the
+    # stages it depends on) is resolved first: reused from the cache or run
+    # Parameters:
+    #   name: name of the input or stage (str)
+    def getHash(self, name = "") -> str:
+        if name in self.inputDict:
+            return self.inputDict[name][0]
+        if name not in self.resultDict:
+            self.resolveStages([name])
+        return self.resultDict[name][0]
+
+    # Returns the value of an input or a fresh copy of the output of a stage
+    # Parameters:
+    #   name: name of the input or stage (str)
+    def getOutput(self, name = ""):
+        if name in self.inputDict:
+            return self.inputDict[name][1]
+        self.getHash(name)
+        result = self.resultDict[name]
+        if result[1] is None:
+            cacheEntry = self.readCacheEntry(name, result[2])
+            if cacheEntry is None:
+                # the entry was pruned since it was found (by another process sharing the cache),
+                # the stage is run again
+                function, inputNames, codeVersion, description, parallel = self.stageDict[name]
+                result[1] = runStageFunction(function, [self.getOutput(inputName) for inputName in inputNames])
+            else:
+                result[1] = cacheEntry[1]
+        return pickle.loads(result[1])
+
+    # Returns the names of the stages that were run (not reused from the cache), in order
+    def getRerunStages(self) -> list:
+        return self.rerunStages
+
+    # Resolves stages and the stages they depend on: every stage is reused from the cache
+    # or run as soon as its inputs are resolved. Parallel stages are sent to the worker
+    # processes, other stages run in this process while the workers are busy.
+    # Parameters:
+    #   names: names of the stages (list of str)
+    def resolveStages(self, names = []):
+        pendingStages = self.collectStages(names)
+        runningStages = {}  # maps futures of the stages running in workers to [name, key]
+        executor = None
+        if self.workers is not None and any([self.stageDict[name][4] for name in pendingStages]):
+            executor = concurrent.futures.ProcessPoolExecutor(self.workers)
+        try:
+            while pendingStages or runningStages:
+                readyStages = [name for name in pendingStages
+                               if all([inputName in self.inputDict or inputName in self.resultDict
+                                       for inputName in self.stageDict[name][1]])]
+                # parallel stages are started first, so that they run while this process is busy
+                readyStages.sort(key=lambda name: not (executor is not None and self.stageDict[name][4]))
+                for name in readyStages:
+                    pendingStages.remove(name)
+                    function, inputNames, codeVersion, description, parallel = self.stageDict[name]
+                    key = self.getStageKey(name)
+                    cacheEntry = self.readCacheEntry(name, key, False)
+                    if cacheEntry is not None:
+                        self.reportProgress(description + " (cached)")
+                        self.resultDict[name] = [cacheEntry[0], None, key]
+                        break  # stages that depend on this one may be ready now
+                    self.reportProgress(description)
+                    inputValues = [self.getOutput(inputName) for inputName in inputNames]
+                    if executor is not None and parallel:
+                        runningStages[executor.submit(runStageFunction, function, inputValues)] = [name, key]
+                        continue
+                    self.storeOutput(name, key, runStageFunction(function, inputValues))
+                    break
+                else:
+                    # nothing could be resolved in this process, wait for a worker
+                    if runningStages:
+                        doneStages, notDoneStages = concurrent.futures.wait(runningStages,
+                                                                            return_when=concurrent.futures.FIRST_COMPLETED)
+                        for future in doneStages:
+                            name, key = runningStages.pop(future)
+                            self.storeOutput(name, key, future.result())
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    # Returns the names of the unresolved stages among stages and the stages they depend on
+    # Parameters:
+    #   names: names of the stages (list of str)
+    def collectStages(self, names = []) -> list:
+        collectedStages = []
+        for name in names:
+            if name in self.inputDict or name in self.resultDict or name in collectedStages:
+                continue
+            for stage in self.collectStages(self.stageDict[name][1]):
+                if stage not in collectedStages:
+                    collectedStages.append(stage)
+            collectedStages.append(name)
+        return collectedStages
+
+    # Returns the key of a stage whose inputs are resolved: a hash of its name, code version
+    # and the hashes of its inputs
+    # Parameters:
+    #   name: name of the stage (str)
+    def getStageKey(self, name = "") -> str:
+        function, inputNames, codeVersion, description, parallel = self.stageDict[name]
+        return hashlib.sha256("\n".join([name, codeVersion] +
+                                         [self.getHash(inputName) for inputName in inputNames]).encode("utf-8")).hexdigest()
+
+    # Stores the output of a stage that was run and caches it
+    # Parameters:
+    #   name: name of the stage (str)
+    #   key: key of the stage (str)
+    #   output: pickled output of the stage (bytes)
+    def storeOutput(self, name = "", key = "", output = b""):
+        outputHash = hashlib.sha256(output).hexdigest()
+        self.writeCacheEntry(name, key, outputHash, output)
+        self.resultDict[name] = [outputHash, output, key]
+        self.rerunStages.append(name)
+
+    # Returns the path of the directory that holds the cache entries of a stage
+    # Parameters:
+    #   name: name of the stage (str)
+    def getStageCacheDirectory(self, name = "") -> str:
+        return os.path.join(self.cacheDirectory, urllib.parse.quote(name, safe=""))
+
+    # Returns the path of the cache entry of a stage key
+    # Parameters:
+    #   name: name of the stage (str)
+    #   key: key of the stage (str)
+    def getCachePath(self, name = "", key = "") -> str:
+        return os.path.join(self.getStageCacheDirectory(name), key + ".pickle")
+
+    # Reads a cache entry, made of the output hash on the first line followed by the pickled
+    # output, and marks it as used
+    # Parameters:
+    #   name: name of the stage (str)
+    #   key: key of the stage (str)
+    #   readOutput: whether to read the pickled output or only the output hash (bool)
+    # Returns: [output hash, pickled output or None], None if the entry does not exist
+    def readCacheEntry(self, name = "", key = "", readOutput = True):
+        if self.cacheDirectory is None:
+            return None
+        try:
+            with open(self.getCachePath(name, key), "rb") as entryFile:
+                outputHash = entryFile.readline().strip().decode("utf-8")
+                cacheEntry = [outputHash, entryFile.read() if readOutput else None]
+        except FileNotFoundError:
+            # missing, or pruned by another process sharing the cache
+            return None
+        try:
+            markUsed(self.getCachePath(name, key))
+        except FileNotFoundError:
+            pass  # pruned by another process after it was read
+        return cacheEntry
+
+    # Writes a cache entry atomically, so that an interrupted run never leaves a partial entry,
+    # and prunes the entries of the stage
+    # Parameters:
+    #   name: name of the stage (str)
+    #   key: key of the stage (str)
+    #   outputHash: content hash of the output (str)
+    #   output: pickled output (bytes)
+    def writeCacheEntry(self, name = "", key = "", outputHash = "", output = b""):
+        if self.cacheDirectory is None:
+            return
+        directory = self.getStageCacheDirectory(name)
+        os.makedirs(directory, exist_ok=True)
+        fileDescriptor, tempPath = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fileDescriptor, "wb") as tempFile:
+                tempFile.write(outputHash.encode("utf-8") + b"\n" + output)
+            markUsed(tempPath)
+            os.replace(tempPath, self.getCachePath(name, key))
+        except BaseException:
+            os.remove(tempPath)
+            raise
+        self.pruneCacheEntries(name)
+
+    # Deletes the least recently used cache entries of a stage beyond cacheLimit
+    # Parameters:
+    #   name: name of the stage (str)
+    def pruneCacheEntries(self, name = ""):
+        directory = self.getStageCacheDirectory(name)
+        usedTimeDict = {}  # maps the paths of the entries to the time they were last used
+        for entry in os.listdir(directory):
+            if not entry.endswith(".pickle"):
+                continue
+            try:
+                usedTimeDict[os.path.join(directory, entry)] = os.stat(os.path.join(directory, entry)).st_mtime_ns
+            except FileNotFoundError:
+                continue
+        for path in sorted(usedTimeDict, key=lambda path: usedTimeDict[path], reverse=True)[self.cacheLimit:]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # pruned by another process
+
+# Function that marks a cache entry as used now, the time is kept as its modification time
+# Parameters:
+#   path - path of the cache entry (str)
+def markUsed(path):
+    now = int(time.time() * 1000000000)
+    os.utime(path, ns=(now, now))
+
+# Function that runs the function of a stage, in this process or in a worker process
+# Parameters:
+#   function - function of the stage
+#   inputValues - values of the inputs of the stage (list)
+# Returns: pickled output of the stage (bytes)
+def runStageFunction(function, inputValues):
+    return pickle.dumps(function(*inputValues))
@@ -0,0 +1,210 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the functions needed to bundle the webpage into a self-contained
+# page that loads with as few requests as possible and without any external origins.
+# AngularJS and LeaderLine are served from local (vendored) copies instead of their
+# CDNs, the JS of the webpage is concatenated into a single bundle and the CSS is
+# inlined into index.html. The libraries are downloaded from their pinned release URLs
+# the first time they are needed, or ahead of time with:
+#   python -m modules.postprocessing.bundling
+# Every copy, downloaded or placed by hand, must match the SHA-256 pinned for it in
+# vendor/SHA256SUMS, which is committed with the code. The hashes are recorded once, on a
+# machine with network access, with:
+#   python -m modules.postprocessing.bundling --pin
+
+# Dependencies: argparse, hashlib, os, tempfile, urllib
+
+import argparse
+import hashlib
+import os
+import tempfile
+import urllib.request
+
+# directory that holds the vendored runtime libraries and their pinned hashes. Like the
+# output directory and the template (see main.py), it is found in the directory the
+# generator is run from, so a packaged executable finds it next to itself
+vendorDirectory = "./vendor"
+
+# file of vendorDirectory that pins the SHA-256 of every vendored library, one
+# "<hash>  <file name>" line per library (the format of sha256sum), "#" starts a comment
+checksumFile = "SHA256SUMS"
+
+# vendored runtime libraries, in load order, mapped to the URL of the copy the template
+# loads them from. The URLs are pinned to a release, the copies carry their licence banners
+vendoredLibraries = {"angular.min.js": "https://ajax.googleapis.com/ajax/libs/angularjs/1.6.9/angular.min.js",
+                     "leader-line.min.js": "https://cdn.jsdelivr.net/npm/leader-line@1.0.7/leader-line.min.js"}
+
+# path of the concatenated vendored libraries, already minified so the minifier skips it
+vendorBundle = "js/vendor.min.js"
+
+# path of the bundle of the webpage JS
+scriptBundle = "js/bundle.js"
+
+# JS files of the webpage, in load order. Static files are read from the output directory
+bundledScripts = ["js/line.js", "js/index.js", "js/controller.js"]
+
+# Function that bundles the webpage. The script and stylesheet tags of index.html are
+# replaced by an inline style tag holding the linked stylesheets and by the script tags
+# of the two bundles, which are preloaded from the head so that they download while the
+# body is parsed.
+# Parameters:
+#   outputDirectory - path of the output directory, static assets are read from it
+#   soup - soup object of index.html, updated in place
+#   outputDict - dict that maps the path (relative to outputDirectory) of each rendered
+#   file to its content (bytes), updated in place. The bundled files are replaced by the bundles
+def bundleAssets(outputDirectory, soup, outputDict):
+    stylesheets = [linkTag["href"][2:] for linkTag in soup.find_all("link", rel="stylesheet")]  # drop the "./"
+    for tag in soup.find_all("script", src=True) + soup.find_all("link", rel="stylesheet"):
+        tag.decompose()
+
+    styleTag = soup.new_tag("style")
+    styleTag.string = "\n".join([popAsset(outputDirectory, outputDict, stylesheet).decode("utf-8")
+                                 for stylesheet in stylesheets])
+    soup.head.find("title").insert_after(styleTag)
+
+    outputDict[vendorBundle] = b"\n".join([readVendoredLibrary(library) for library in vendoredLibraries])
+    # each file is ended with a newline and a semicolon so that no statement runs into the next file
+    outputDict[scriptBundle] = b"\n;".join([popAsset(outputDirectory, outputDict, script)
+                                            for script in bundledScripts])
+
+    for bundle in [vendorBundle, scriptBundle]:
+        preloadTag = soup.new_tag("link", rel="preload", href="./" + bundle)
+        preloadTag["as"] = "script"
+        styleTag.insert_before(preloadTag)
+        soup.body.append(soup.new_tag("script", src="./" + bundle))
+
+# Function that takes an asset out of the rendered files, or reads it from the output
+# directory if it is a static asset
+# Parameters:
+#   outputDirectory - path of the output directory
+#   outputDict - dict that maps the path of each rendered file to its content, updated in place
+#   asset - path of the asset (relative to outputDirectory)
+# Returns: content of the asset (bytes)
+def popAsset(outputDirectory, outputDict, asset):
+    if asset in outputDict:
+        return outputDict.pop(asset)
+    with open(os.path.join(outputDirectory, asset), "rb") as assetFile:
+        return assetFile.read()
+
+# Class that defines the error raised when a vendored library is missing and cannot be
+# downloaded, or does not match its pinned hash
+class VendoredLibraryError(Exception):
+    pass
+
+# Function that reads a vendored runtime library, downloading it first if it is missing.
+# The library is checked against its pinned hash every time it is read.
+# Parameters:
+#   library - file name of the library (key of vendoredLibraries)
+# Returns: content of the library (bytes)
+def readVendoredLibrary(library):
+    path = os.path.join(vendorDirectory, library)
+    if not os.path.isfile(path):
+        fetchVendoredLibraries([library])
+    with open(path, "rb") as libraryFile:
+        content = libraryFile.read()
+    checkPinnedHash(library, content)
+    return content
+
+# Function that downloads the vendored runtime libraries that are missing from vendorDirectory.
+# A library is checked against its pinned hash and written to a temporary file that is then
+# moved into place, so a tampered or interrupted download never leaves a copy behind.
+# Parameters:
+#   libraries - file names of the libraries (keys of vendoredLibraries)
+#   checkHashes - flag indicating if the downloads are checked against their pinned hashes,
+#   only turned off to pin the hashes (see pinVendoredLibraries)
+def fetchVendoredLibraries(libraries = vendoredLibraries, checkHashes = True):
+    os.makedirs(vendorDirectory, exist_ok=True)
+    for library in libraries:
+        path = os.path.join(vendorDirectory, library)
+        if os.path.isfile(path):
+            continue
+        if checkHashes:
+            getPinnedHash(library)  # fail before downloading anything that cannot be checked
+        print("Downloading " + vendoredLibraries[library] + "...")
+        try:
+            with urllib.request.urlopen(vendoredLibraries[library], timeout=30) as response:
+                content = response.read()
+        except OSError as err:
+            raise VendoredLibraryError("The vendored library " + library + " is missing from " + vendorDirectory +
+                                       " and could not be downloaded from " + vendoredLibraries[library] + " (" +
+                                       str(err) + "). To generate a single bundle without network access, place " +
+                                       "a copy of the pinned release in " + vendorDirectory + " by hand")
+        if checkHashes:
+            checkPinnedHash(library, content)
+        fileDescriptor, tempPath = tempfile.mkstemp(dir=vendorDirectory, prefix=".tmp-")
+        try:
+            with os.fdopen(fileDescriptor, "wb") as tempFile:
+                tempFile.write(content)
+            os.replace(tempPath, path)
+        except BaseException:
+            os.remove(tempPath)
+            raise
+
+# Function that reads the pinned hashes of the vendored libraries
+# Returns: dict that maps the file name of each pinned library to its SHA-256 (hex str)
+def readPinnedHashes():
+    pinnedHashDict = {}
+    path = os.path.join(vendorDirectory, checksumFile)
+    if not os.path.isfile(path):
+        return pinnedHashDict
+    with open(path, "r", encoding="utf-8") as pinFile:
+        for line in pinFile:
+            line = line.split("#")[0].strip()
+            if line == "":
+                continue
+            libraryHash, library = line.split(None, 1)
+            pinnedHashDict[library.lstrip("*")] = libraryHash.lower()
+    return pinnedHashDict
+
+# Function that finds the pinned hash of a vendored library
+# Parameters:
+#   library - file name of the library (key of vendoredLibraries)
+# Returns: SHA-256 of the library (hex str)
+def getPinnedHash(library):
+    pinnedHashDict = readPinnedHashes()
+    if library not in pinnedHashDict:
+        raise VendoredLibraryError("No SHA-256 is pinned for the vendored library " + library + " in " +
+                                   os.path.join(vendorDirectory, checksumFile) + ". Pin it with " +
+                                   "\"python -m modules.postprocessing.bundling --pin\" on a machine with " +
+                                   "network access, compare the hashes against the release and commit the file")
+    return pinnedHashDict[library]
+
+# Function that checks the content of a vendored library against its pinned hash
+# Parameters:
+#   library - file name of the library (key of vendoredLibraries)
+#   content - content of the library (bytes)
+def checkPinnedHash(library, content):
+    pinnedHash = getPinnedHash(library)
+    libraryHash = hashlib.sha256(content).hexdigest()
+    if libraryHash != pinnedHash:
+        raise VendoredLibraryError("The vendored library " + library + " has the SHA-256 " + libraryHash +
+                                   ", but " + pinnedHash + " is pinned for " + vendoredLibraries[library] +
+                                   ". Replace it with a copy of the pinned release")
+
+# Function that pins the hashes of the vendored libraries, downloading the libraries that are
+# missing. The hashes are trusted as they are, so they should be compared against the releases
+# before the checksum file is committed.
+def pinVendoredLibraries():
+    fetchVendoredLibraries(vendoredLibraries, checkHashes=False)
+    with open(os.path.join(vendorDirectory, checksumFile), "w", encoding="utf-8") as pinFile:
+        pinFile.write("# SHA-256 of the vendored runtime libraries, checked every time they are bundled\n")
+        for library in vendoredLibraries:
+            with open(os.path.join(vendorDirectory, library), "rb") as libraryFile:
+                libraryHash = hashlib.sha256(libraryFile.read()).hexdigest()
+            pinFile.write(libraryHash + "  " + library + "\n")
+            print(libraryHash + "  " + library + " (" + vendoredLibraries[library] + ")")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Downloads and checks the vendored runtime libraries of the single bundle")
+    parser.add_argument("--pin", action="store_true",
+                        help="record the SHA-256 of the libraries in " + checksumFile + " instead of checking them")
+    arguments = parser.parse_args()
+    if arguments.pin:
+        pinVendoredLibraries()
+    else:
+        for library in vendoredLibraries:
+            readVendoredLibrary(library)
+    print("Vendored libraries are in " + os.path.abspath(vendorDirectory))
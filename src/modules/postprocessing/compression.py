@@ -0,0 +1,40 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the functions needed to build precompressed siblings
+# (.gz and, if the brotli module is installed, .br) of the generated files
+# so that a static web server can serve them without compressing on the fly.
+
+# Dependencies: gzip, io, brotli (optional)
+
+import gzip
+import io
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Function that compresses the content of a file at maximum compression. The gzip
+# header has no timestamp, so the same content always gives the same compressed bytes.
+# Parameters:
+#   content - content of the file to compress (bytes)
+# Returns: dict that maps the extension of each precompressed sibling (".gz", ".br") to its content (bytes)
+def compressContent(content):
+    compressedDict = {".gz": gzipContent(content)}
+    if brotli is not None:
+        compressedDict[".br"] = brotli.compress(content, quality=11)
+    return compressedDict
+
+# Function that gzips the content of a file, without a timestamp in the header
+# Parameters:
+#   content - content of the file to compress (bytes)
+#   compresslevel - gzip compression level, lower levels are faster (int)
+# Returns: gzipped content (bytes)
+def gzipContent(content, compresslevel=9):
+    gzipBuffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=gzipBuffer, mode="wb", compresslevel=compresslevel, mtime=0) as gzipFile:
+        gzipFile.write(content)
+    return gzipBuffer.getvalue()
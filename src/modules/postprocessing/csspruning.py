@@ -0,0 +1,142 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the functions needed to prune the rules of a stylesheet that
+# cannot match anything on the generated webpage. Every word of the generated HTML
+# and JS is taken as a class or id name that may appear on the page. Class names
+# built at runtime (eg: category + "-highlighted") are covered by the JS string
+# literals that start or end with a "-", which are taken as suffixes and prefixes
+# of the words. A selector is kept if all of its class and id names may appear,
+# element names and pseudo-classes are never used to prune.
+
+# Dependencies: re
+
+import re
+
+# words that can be class or id names
+namePattern = re.compile(r"-?[A-Za-z_][\w-]*")
+
+# JS string literals that are suffixes ("-highlighted") or prefixes ("highlight-") of class names
+suffixPattern = re.compile(r"[\"'](-[\w-]+)[\"']")
+prefixPattern = re.compile(r"[\"']([A-Za-z_][\w-]*-)[\"']")
+
+# class and id names of a selector, attribute selectors are removed first
+selectorNamePattern = re.compile(r"[.#](-?[A-Za-z_][\w-]*)")
+
+# Class that defines an object holding the class and id names that may appear on the webpage
+class UsedNames:
+    # Collects the names from the content of the generated files
+    # Parameters:
+    #   contentList - list of the contents of the generated HTML and JS files (str)
+    def __init__(self, contentList) -> None:
+        self.names = set()
+        self.suffixes = set()
+        self.prefixes = set()
+        for content in contentList:
+            self.names.update(namePattern.findall(content))
+            self.suffixes.update(suffixPattern.findall(content))
+            self.prefixes.update(prefixPattern.findall(content))
+
+    # Returns True if the class or id name may appear on the webpage
+    # Parameters:
+    #   name: class or id name (str)
+    def isUsed(self, name = "") -> bool:
+        if name in self.names:
+            return True
+        for suffix in self.suffixes:
+            if name.endswith(suffix) and name[:-len(suffix)] in self.names:
+                return True
+        for prefix in self.prefixes:
+            if name.startswith(prefix) and name[len(prefix):] in self.names:
+                return True
+        return False
+
+# Function that removes the rules of a stylesheet that cannot match, and the selectors
+# of a selector list that cannot match. Comments are removed.
+# Parameters:
+#   source - CSS source code (str)
+#   usedNames - UsedNames object of the webpage
+# Returns: pruned CSS source code (str)
+def pruneCSS(source, usedNames):
+    source = re.sub(r"/\*.*?\*/", "", source, flags=re.S)
+    output = []
+    position = 0
+    blockStart = source.find("{", position)
+    while blockStart != -1:
+        prelude = source[position:blockStart].strip()
+        blockEnd = findBlockEnd(source, blockStart)
+        body = source[blockStart + 1:blockEnd]
+        if prelude.startswith("@"):
+            if "{" in body and not prelude.startswith("@keyframes"):
+                # conditional group rule (@media, @supports), its rules are pruned in turn
+                prunedBody = pruneCSS(body, usedNames)
+                if prunedBody != "":
+                    output.append(prelude + " {\n" + prunedBody + "}\n")
+            else:
+                output.append(prelude + " {" + body + "}\n")
+        else:
+            selectors = [selector for selector in splitSelectorList(prelude)
+                         if selectorCanMatch(selector, usedNames)]
+            if selectors:
+                output.append(", ".join(selectors) + " {" + body + "}\n")
+        position = blockEnd + 1
+        blockStart = source.find("{", position)
+    return "".join(output)
+
+# Function that finds the end of a CSS block, skipping nested blocks and strings
+# Parameters:
+#   source - CSS source code (str)
+#   start - index of the opening "{"
+# Returns: index of the matching "}"
+def findBlockEnd(source, start):
+    depth = 0
+    i = start
+    while i < len(source):
+        char = source[i]
+        if char in "\"'":
+            i = source.find(char, i + 1)
+            if i == -1:
+                return len(source)
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(source)
+
+# Function that splits a selector list at the commas outside of brackets and parentheses
+# Parameters:
+#   selectorList - selector list (str)
+# Returns: list of selectors (str)
+def splitSelectorList(selectorList):
+    selectors = []
+    depth = 0
+    current = ""
+    for char in selectorList:
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            selectors.append(current.strip())
+            current = ""
+            continue
+        current += char
+    selectors.append(current.strip())
+    return [selector for selector in selectors if selector != ""]
+
+# Function that checks if a selector can match an element of the webpage
+# Parameters:
+#   selector - single selector (str)
+#   usedNames - UsedNames object of the webpage
+# Returns: False if one of the class or id names of the selector never appears, True otherwise
+def selectorCanMatch(selector, usedNames):
+    selector = re.sub(r"\[[^\]]*\]", "", selector)
+    for name in selectorNamePattern.findall(selector):
+        if not usedNames.isUsed(name):
+            return False
+    return True
@@ -0,0 +1,89 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the functions needed to give the assets of the webpage
+# content hashed file names (eg: js/controller.js -> js/controller.1a2b3c4d5e.js).
+# A file name then changes whenever its content changes, so the assets can be
+# cached by browsers indefinitely without ever going stale.
+
+# Dependencies: hashlib, json, os, re
+
+import hashlib
+import json
+import os
+import re
+
+# number of hex digits of the content hash kept in the file name
+hashLength = 10
+
+# extensions of the assets which can hold references to other assets
+textAssetExtensions = (".html", ".js", ".css")
+
+# Function that renames the assets of the webpage with a content hash, rewrites the
+# references to them and adds a manifest mapping the original to the hashed names.
+# Assets are processed in order, references to already hashed assets are rewritten
+# before an asset is hashed itself, so an asset must come after the assets it references.
+# Parameters:
+#   outputDirectory - path of the output directory, static assets are read from it
+#   outputDict - dict that maps the path (relative to outputDirectory) of each rendered
+#   file to its content (bytes), updated in place
+#   staticAssets - list of paths (relative to outputDirectory) of static assets, the hashed
+#   copies are added to outputDict and the originals stay in place. Missing assets are skipped
+#   generatedAssets - list of paths of rendered assets in outputDict, these are renamed
+#   to their hashed name
+#   entryPages - list of paths of rendered pages in outputDict whose references are
+#   rewritten but which keep their name (eg: index.html)
+# Returns: manifest dict that maps the original path of each asset to its hashed path
+def hashAssets(outputDirectory, outputDict, staticAssets, generatedAssets, entryPages):
+    manifest = {}
+    for asset in staticAssets + generatedAssets:
+        if asset in generatedAssets:
+            content = outputDict.pop(asset)
+        elif os.path.exists(os.path.join(outputDirectory, asset)):
+            content = readAsset(os.path.join(outputDirectory, asset))
+        else:
+            continue
+        if asset.endswith(textAssetExtensions):
+            content = rewriteReferences(content, manifest)
+        hashedAsset = getHashedPath(asset, content)
+        outputDict[hashedAsset] = content
+        manifest[asset] = hashedAsset
+
+    for page in entryPages:
+        outputDict[page] = rewriteReferences(outputDict[page], manifest)
+
+    outputDict["manifest.json"] = json.dumps(manifest, indent=2).encode("utf-8")
+    return manifest
+
+# Function that reads the raw content of an asset
+# Parameters:
+#   path - path of the asset
+# Returns: content of the asset (bytes)
+def readAsset(path):
+    with open(path, "rb") as assetFile:
+        return assetFile.read()
+
+# Function that inserts the content hash into the file name of an asset
+# Parameters:
+#   asset - path of the asset (str)
+#   content - content of the asset (bytes)
+# Returns: hashed path of the asset (str)
+def getHashedPath(asset, content):
+    contentHash = hashlib.sha256(content).hexdigest()[:hashLength]
+    root, extension = os.path.splitext(asset)
+    return root + "." + contentHash + extension
+
+# Function that rewrites the references ("./js/index.js", './plans/X.html', ...) to hashed
+# assets within the content of a file. Only references enclosed in quotes or brackets are
+# rewritten so that a path is never mistaken for part of a longer path.
+# Parameters:
+#   content - content of the file (bytes)
+#   manifest - dict that maps the original path of each hashed asset to its hashed path
+# Returns: rewritten content (bytes)
+def rewriteReferences(content, manifest):
+    for asset in manifest:
+        reference = re.compile(rb"(?<=[\"'(])\./" + re.escape(asset.encode("utf-8")) + rb"(?=[\"')])")
+        content = reference.sub(b"./" + manifest[asset].encode("utf-8"), content)
+    return content
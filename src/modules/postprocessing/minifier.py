@@ -0,0 +1,291 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the functions needed to minify the generated HTML,
+# JS and CSS files of the webpage. Only safe transforms are used (comments and
+# redundant whitespace are removed, nothing is renamed or reordered) so that the
+# minified files behave exactly like the originals.
+
+# Dependencies: re
+
+import re
+
+# characters that can be part of an identifier, keyword or number in JS
+jsWordPattern = re.compile(r"[A-Za-z0-9_$\\\u0080-\uffff]")
+
+# characters after which a "/" starts a regular expression literal rather than a division
+jsRegexPrecedingChars = "(,=:[!&|?{};+-*%<>~^"
+
+# keywords after which a "/" starts a regular expression literal rather than a division
+jsRegexPrecedingKeywords = ["return", "typeof", "case", "in", "of", "delete", "void",
+                            "throw", "new", "else", "instanceof", "do", "yield", "await"]
+
+# characters around which a newline can be dropped without changing where JS
+# inserts semicolons automatically
+jsNewlineDroppingPrevChars = "{[(,;:"
+jsNewlineDroppingNextChars = "}]),;:."
+
+# tags whose surrounding whitespace is never rendered
+htmlNonRenderedSpaceTags = ["html", "head", "body", "meta", "link", "title", "script",
+                            "style", "table", "thead", "tbody", "tr", "td", "th", "ul",
+                            "ol", "li", "br", "header", "footer", "!doctype"]
+
+# Function that minifies the content of a file, picking the minifier by extension.
+# Files that are already minified (.min.js, eg: vendored libraries) are left untouched.
+# Parameters:
+#   path - path of the file (str)
+#   content - content of the file (bytes)
+# Returns: minified content of the file (bytes)
+def minifyContent(path, content):
+    if path.endswith(".min.js"):
+        return content
+    source = content.decode("utf-8")
+    if path.endswith(".js"):
+        minified = minifyJS(source)
+    elif path.endswith(".css"):
+        minified = minifyCSS(source)
+    elif path.endswith(".html"):
+        minified = minifyHTML(source)
+    else:
+        minified = source
+    return minified.encode("utf-8")
+
+# Function that minifies JS source by removing comments and any whitespace that
+# does not separate two tokens. Newlines are kept where automatic semicolon
+# insertion could depend on them.
+# Parameters:
+#   source - JS source code (str)
+# Returns: minified JS source code (str)
+def minifyJS(source):
+    output = []
+    prevTokens = ["", ""]  # last two tokens emitted, latest last
+    pendingSpace = ""  # whitespace seen since the last emitted token ("", " " or "\n")
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char.isspace():
+            if char == "\n":
+                pendingSpace = "\n"
+            elif pendingSpace == "":
+                pendingSpace = " "
+            i += 1
+            continue
+        if source.startswith("//", i):
+            # line comment, the newline ending it is kept as whitespace
+            end = source.find("\n", i)
+            i = len(source) if end == -1 else end
+            continue
+        if source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = len(source) if end == -1 else end + 2
+            if pendingSpace == "":
+                pendingSpace = " "
+            continue
+
+        prevChar = output[-1][-1] if output else ""
+        if char in "\"'`":
+            end = findJSStringEnd(source, i)
+        elif char == "/" and startsJSRegex(prevTokens[1], prevTokens[0]):
+            end = findJSRegexEnd(source, i)
+        elif jsWordPattern.match(char):
+            # identifiers, keywords and numbers are kept whole so keywords can be recognised
+            end = i + 1
+            while end < len(source) and jsWordPattern.match(source[end]):
+                end += 1
+        elif source.startswith("++", i) or source.startswith("--", i):
+            # kept whole so that a postfix increment or decrement can be recognised
+            end = i + 2
+        else:
+            end = i + 1
+        token = source[i:end]
+
+        if pendingSpace != "" and prevChar != "":
+            output.append(pickJSSeparator(prevChar, token[0], pendingSpace))
+        pendingSpace = ""
+        output.append(token)
+        prevTokens = [prevTokens[1], token]
+        i = end
+    return "".join(output)
+
+# Function that decides if a "/" starts a regular expression literal or is a division,
+# from the tokens before it
+# Parameters:
+#   prevToken - token just before the "/", "" at the start of the source
+#   beforePrevToken - token before prevToken, used to tell keywords from property names (eg: x.in)
+# Returns: True if the "/" starts a regular expression literal
+def startsJSRegex(prevToken, beforePrevToken):
+    if prevToken == "":
+        return True
+    if prevToken in ["++", "--"]:
+        # a "/" never follows a prefix increment or decrement, so this is a postfix one (eg: i++ / 2)
+        return False
+    if prevToken in jsRegexPrecedingKeywords:
+        return beforePrevToken != "."
+    return prevToken[-1] in jsRegexPrecedingChars
+
+# Function that picks the separator to keep between two JS tokens that had whitespace between them
+# Parameters:
+#   prevChar - last character of the previous token
+#   nextChar - first character of the next token
+#   space - whitespace originally between the tokens (" " or "\n")
+# Returns: "", " " or "\n"
+def pickJSSeparator(prevChar, nextChar, space):
+    if jsWordPattern.match(prevChar) and jsWordPattern.match(nextChar):
+        separator = " "
+    elif prevChar + nextChar in ["++", "--", "//", "/*", "<!"]:
+        # these would merge into a different operator or a comment
+        separator = " "
+    elif prevChar.isdigit() and nextChar == ".":
+        separator = " "
+    else:
+        separator = ""
+    if space == "\n" and prevChar not in jsNewlineDroppingPrevChars and nextChar not in jsNewlineDroppingNextChars:
+        separator = "\n"
+    return separator
+
+# Function that finds the end of a JS string or template literal
+# Parameters:
+#   source - JS source code (str)
+#   start - index of the opening quote
+# Returns: index just past the closing quote
+def findJSStringEnd(source, start):
+    quote = source[start]
+    i = start + 1
+    while i < len(source) and source[i] != quote:
+        if source[i] == "\\":
+            i += 1
+        elif quote == "`" and source.startswith("${", i):
+            # the substitution may hold strings and template literals of its own
+            i = findJSSubstitutionEnd(source, i + 2)
+            continue
+        i += 1
+    return i + 1
+
+# Function that finds the end of a ${...} substitution of a JS template literal
+# Parameters:
+#   source - JS source code (str)
+#   start - index just past the opening "${"
+# Returns: index just past the closing "}"
+def findJSSubstitutionEnd(source, start):
+    depth = 0
+    i = start
+    while i < len(source):
+        if source[i] in "\"'`":
+            i = findJSStringEnd(source, i)
+            continue
+        if source[i] == "{":
+            depth += 1
+        elif source[i] == "}":
+            if depth == 0:
+                return i + 1
+            depth -= 1
+        i += 1
+    return i
+
+# Function that finds the end of a JS regular expression literal (including its flags)
+# Parameters:
+#   source - JS source code (str)
+#   start - index of the opening "/"
+# Returns: index just past the regular expression literal
+def findJSRegexEnd(source, start):
+    i = start + 1
+    inClass = False
+    while i < len(source) and source[i] != "\n":
+        if source[i] == "\\":
+            i += 1
+        elif source[i] == "[":
+            inClass = True
+        elif source[i] == "]":
+            inClass = False
+        elif source[i] == "/" and not inClass:
+            break
+        i += 1
+    i += 1
+    while i < len(source) and jsWordPattern.match(source[i]):
+        i += 1
+    return i
+
+# Function that minifies CSS source by removing comments, collapsing whitespace and
+# removing whitespace around punctuation
+# Parameters:
+#   source - CSS source code (str)
+# Returns: minified CSS source code (str)
+def minifyCSS(source):
+    # split into quoted strings (odd indices) and everything else (even indices)
+    parts = re.split(r"(\"(?:[^\"\\]|\\.)*\"|'(?:[^'\\]|\\.)*')", source)
+    for i in range(0, len(parts), 2):
+        part = re.sub(r"/\*.*?\*/", " ", parts[i], flags=re.S)
+        part = re.sub(r"\s+", " ", part)
+        # whitespace before ":" is kept, it separates a descendant pseudo-class selector
+        part = re.sub(r"\s*([{};,>])\s*", r"\1", part)
+        part = re.sub(r":\s+", ":", part)
+        part = part.replace(";}", "}")
+        parts[i] = part
+    return "".join(parts).strip()
+
+# Function that minifies HTML source by removing comments and collapsing whitespace in
+# text. Inline scripts and styles are minified with their own minifier, and preformatted
+# content is left untouched.
+# Parameters:
+#   source - HTML source code (str)
+# Returns: minified HTML source code (str)
+def minifyHTML(source):
+    output = []
+    tokenPattern = re.compile(r"<!--.*?-->|<(script|style|pre|textarea)\b[^>]*>.*?</\1\s*>|<[^>]*>", re.S | re.I)
+    position = 0
+    prevTag = ""
+    for match in tokenPattern.finditer(source):
+        output.append(minifyHTMLText(source[position:match.start()], prevTag, getHTMLTagName(match.group(0))))
+        position = match.end()
+        token = match.group(0)
+        if token.startswith("<!--"):
+            if token.startswith("<!--[if"):
+                output.append(token)  # conditional comments have to stay
+            continue
+        if match.group(1):
+            token = minifyHTMLRawElement(token, match.group(1).lower())
+        output.append(token)
+        prevTag = getHTMLTagName(token)
+    output.append(minifyHTMLText(source[position:], prevTag, ""))
+    return "".join(output).strip()
+
+# Function that collapses the whitespace in a run of HTML text
+# Parameters:
+#   text - text between two tags (str)
+#   prevTag - name of the tag before the text
+#   nextTag - name of the tag after the text
+# Returns: minified text (str)
+def minifyHTMLText(text, prevTag, nextTag):
+    if text.strip() == "" and (prevTag in htmlNonRenderedSpaceTags or nextTag in htmlNonRenderedSpaceTags):
+        return ""
+    return re.sub(r"\s+", " ", text)
+
+# Function that minifies the content of a script, style, pre or textarea element
+# Parameters:
+#   element - full HTML of the element (str)
+#   tagName - lowercase name of the element
+# Returns: minified HTML of the element (str)
+def minifyHTMLRawElement(element, tagName):
+    openEnd = element.find(">") + 1
+    closeStart = element.rfind("</")
+    openTag, content, closeTag = element[:openEnd], element[openEnd:closeStart], element[closeStart:]
+    if tagName == "style":
+        content = minifyCSS(content)
+    elif tagName == "script":
+        typeMatch = re.search(r"type\s*=\s*[\"']([^\"']*)[\"']", openTag, re.I)
+        scriptType = typeMatch.group(1).lower() if typeMatch else "text/javascript"
+        if scriptType in ["text/javascript", "application/javascript", "module"]:
+            content = minifyJS(content)
+        elif scriptType == "text/ng-template":
+            content = minifyHTML(content)
+    return openTag + content + closeTag
+
+# Function that extracts the lowercase tag name of a tag ("div" for both <div> and </div>)
+# Parameters:
+#   tag - HTML tag (str)
+# Returns: tag name (str)
+def getHTMLTagName(tag):
+    match = re.match(r"</?\s*([A-Za-z!][A-Za-z0-9-]*)", tag)
+    return match.group(1).lower() if match else ""
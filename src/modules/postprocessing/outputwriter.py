@@ -0,0 +1,73 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the functions needed to write the rendered output files
+# to disk. A file is only replaced if its content actually changed, and it is
+# replaced atomically, so re-running the generator with unchanged inputs leaves
+# every output file (and its modification time) untouched.
+
+# Dependencies: os, stat, tempfile
+
+import os
+import stat
+import tempfile
+
+# permissions open() gives a new file. The umask can only be read by setting it, which
+# changes it for every thread of the process, so it is read once on import before any
+# threads are writing files.
+processUmask = os.umask(0)
+os.umask(processUmask)
+newFileMode = 0o666 & ~processUmask
+
+# Function that writes every rendered output file that differs from the file on disk
+# Parameters:
+#   outputDirectory - path of the output directory
+#   outputDict - dict that maps the path of each file (relative to outputDirectory) to its content (bytes)
+# Returns: list of the paths (relative to outputDirectory) of the files that were written
+def writeOutputFiles(outputDirectory, outputDict):
+    if not os.path.isdir(outputDirectory):
+        raise FileNotFoundError("The directory you are in does not have a directory named output.")
+    writtenFiles = []
+    for path in outputDict:
+        if writeFileIfChanged(os.path.join(outputDirectory, path), outputDict[path]):
+            writtenFiles.append(path)
+    return writtenFiles
+
+# Function that atomically replaces a file with new content unless it already holds
+# that content. The content is written to a temporary file in the same directory
+# which is then moved over the file, so a reader never sees a partially written file.
+# Parameters:
+#   path - path of the file (str)
+#   content - new content of the file (bytes)
+# Returns: True if the file was written, False if it was unchanged
+def writeFileIfChanged(path, content):
+    if os.path.isfile(path) and os.path.getsize(path) == len(content):
+        with open(path, "rb") as existingFile:
+            if existingFile.read() == content:
+                return False
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fileDescriptor, tempPath = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fileDescriptor, "wb") as tempFile:
+            tempFile.write(content)
+        os.chmod(tempPath, getFileMode(path))
+        os.replace(tempPath, path)
+    except BaseException:
+        os.remove(tempPath)
+        raise
+    return True
+
+# Function that finds the permissions a written file should have. Temporary files are
+# created private, so the permissions of the file being replaced are kept, and a new
+# file gets the permissions open() would have given it.
+# Parameters:
+#   path - path of the file (str)
+# Returns: permission bits (int)
+def getFileMode(path):
+    if os.path.isfile(path):
+        return stat.S_IMODE(os.stat(path).st_mode)
+    return newFileMode
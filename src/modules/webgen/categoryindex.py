@@ -0,0 +1,80 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# File that contains the class used to index which course placements belong
+# to which category. The index is built once per generation and shared by the
+# HTML (category classes of the course boxes), CSS (category highlighting rules)
+# and JS (legend buttons) generation.
+
+# Dependencies: cleaner
+
+from .. import cleaner
+
+# names of the electives, mapped to the short name used as their category key
+electiveKeyDict = {"Complementary Elective": "COMP",
+                   "Program/Technical Elective": "PROG",
+                   "ITS Elective": "ITS"}
+
+# Class that defines an object used to look up the categories of course placements
+class CategoryIndex:
+    # Builds the index from the plan sequences
+    # Parameters:
+    #   sequenceDict - dict that maps plan name to a dict that represents the plan sequence
+    def __init__(self, sequenceDict) -> None:
+        # List of the keys (cleaned category name, short name for electives) of the
+        # categories that have course placements, in the order first placed
+        self.categoryList = []
+
+        # Dict that maps course placements to their categories
+        # Key: element ID of course placement
+        # Value: list of category keys, main category first
+        self.placementCategoryDict = {}
+
+        for plan in sequenceDict:
+            electiveCountDict = {"COMP": 0, "PROG": 0, "ITS": 0}  # number of electives placed in plan
+            for term in sequenceDict[plan]:
+                for course in sequenceDict[plan][term]:
+                    placementID = cleaner.cleanString(course.name) + cleaner.cleanString(plan)
+                    if course.name in electiveKeyDict:
+                        # id must include which number elective it is (electiveName0, electiveName1, ...)
+                        electiveKey = electiveKeyDict[course.name]
+                        placementID += str(electiveCountDict[electiveKey])
+                        electiveCountDict[electiveKey] += 1
+                    self.addPlacement(placementID, getCourseCategoryKeys(course))
+
+    # Adds a course placement to the categories it belongs to
+    # Parameters:
+    #   placementID: element ID of course placement (str)
+    #   categoryKeys: list of category keys of the course (list of str)
+    def addPlacement(self, placementID = "", categoryKeys = []):
+        self.placementCategoryDict[placementID] = categoryKeys
+        for category in categoryKeys:
+            if category not in self.categoryList:
+                self.categoryList.append(category)
+
+    # Returns the keys of all categories that have course placements, in the order first placed
+    def getCategories(self) -> list:
+        return list(self.categoryList)
+
+    # Returns the category keys of a course placement, main category first
+    # Parameters:
+    #   placementID: element ID of course placement (str)
+    def getPlacementCategories(self, placementID = "") -> list:
+        return self.placementCategoryDict.get(placementID, [])
+
+# Function that finds the category keys of a course, empty categories are left out
+# Parameters:
+#   course - course object
+# Returns: list of category keys, main category first
+def getCourseCategoryKeys(course):
+    categoryKeys = []
+    if course.name in electiveKeyDict:
+        categoryKeys.append(electiveKeyDict[course.name])
+    elif cleaner.cleanString(course.main_category) != "":
+        categoryKeys.append(cleaner.cleanString(course.main_category))
+    for subCategory in course.sub_categories:
+        if cleaner.cleanString(subCategory) != "" and cleaner.cleanString(subCategory) not in categoryKeys:
+            categoryKeys.append(cleaner.cleanString(subCategory))
+    return categoryKeys
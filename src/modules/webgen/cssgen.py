@@ -11,55 +11,60 @@
 from .. import cleaner
 
 # Function that writes the CSS associated with the highlighting
-# of courses based on category
+# of courses based on category. The colours of the categories are written once as a
+# map of CSS custom properties (--colour-<category>), the category rules only point the
+# shared colour properties of styles.css at them:
+#   --category-colour - colour of a course on hover
+#   --fill-colour - background colour of a clicked or highlighted course
+# Sub categories are written first, so that the main category of a course wins, except on
+# the hover of a course highlighted through a sub category, which is in the sub category's colour.
 # Parameters:
 #   mainCategoryDict - a dict that maps main categories to colours
 #   subCategoryDict - a dict that maps sub categories to colours
+#   categoryIndex - category index object, holds the categories that have courses placed in them
 #   categoryCSS - file handle to CSS file
-def writeCategoryCSS(mainCategoryDict, subCategoryDict, categoryCSS):
-    writeSubCategoryCSS(subCategoryDict, categoryCSS)
-    writeMainCategoryCSS(mainCategoryDict, categoryCSS)
+def writeCategoryCSS(mainCategoryDict, subCategoryDict, categoryIndex, categoryCSS):
+    writeCategoryColourVariables({**subCategoryDict, **mainCategoryDict}, categoryCSS)
+    writeCategoryColourCSS(subCategoryDict, categoryCSS)
+    writeCategoryColourCSS(mainCategoryDict, categoryCSS)
+    writeCategoryHighlightCSS(subCategoryDict, categoryIndex, categoryCSS, " !important")
+    writeCategoryHighlightCSS(mainCategoryDict, categoryIndex, categoryCSS)
 
-# Function that writes the CSS class styling for each main category.
-# Writes styling for :hover, -highlighted, and -highlighted:hover
+# Function that writes the colour of every category as a CSS custom property of the page
 # Parameters:
-#   mainCategoryDict - a dict that maps main categories to colours
+#   categoryDict - a dict that maps categories to colours
 #   categoryCSS - file handle to CSS file
-def writeMainCategoryCSS(mainCategoryDict, categoryCSS):
-    for category in mainCategoryDict:
-        backgroundColour = mainCategoryDict[category]  # colour parsed from Excel file associated with this category
-        categoryFormattedString = """.{categoryName}:hover {{
-            background-color: #{backColour};
-            border-color: #{backColour};
-        }}
-        .{categoryName}-highlighted {{
-            background-color: #{backColour};
-        }}
-        .{categoryName}-highlighted:hover {{
-            background-color: #{backColour};
-            border-color: #{backColour};
-        }}\n"""
-        categoryCSS.write(categoryFormattedString.format(categoryName=cleaner.cleanString(category),
-                                                         backColour=backgroundColour))
+def writeCategoryColourVariables(categoryDict, categoryCSS):
+    categoryCSS.write(":root {\n")
+    for category in categoryDict:
+        categoryCSS.write("    --colour-{categoryName}: #{backColour};\n".format(categoryName=cleaner.cleanString(category),
+                                                                                backColour=categoryDict[category]))
+    categoryCSS.write("}\n")
 
-# Function that writes the CSS class styling for each sub category.
-# Writes styling for :hover, -highlighted, and -highlighted:hover
+# Function that writes the CSS class styling for each category, courses of the
+# category are coloured on hover and once clicked (-highlighted)
 # Parameters:
-#   subCategoryDict - a dict that maps sub categories to colours
+#   categoryDict - a dict that maps categories to colours
+#   categoryCSS - file handle to CSS file
+def writeCategoryColourCSS(categoryDict, categoryCSS):
+    for category in categoryDict:
+        categoryFormattedString = """.{categoryName} {{ --category-colour: var(--colour-{categoryName}); }}
+.{categoryName}-highlighted {{ --category-colour: var(--colour-{categoryName}); --fill-colour: var(--colour-{categoryName}); }}\n"""
+        categoryCSS.write(categoryFormattedString.format(categoryName=cleaner.cleanString(category)))
+
+# Function that writes the CSS which highlights every course of a category while the
+# category's legend button is pressed. Pressing a button only toggles the class
+# highlight-<category> on the display div, these rules colour the courses inside it.
+# Only categories with courses placed in them get rules.
+# Parameters:
+#   categoryDict - a dict that maps categories to colours
+#   categoryIndex - category index object, holds the categories that have courses placed in them
 #   categoryCSS - file handle to CSS file
-def writeSubCategoryCSS(subCategoryDict, categoryCSS):
-  for category in subCategoryDict:
-        backgroundColour = subCategoryDict[category]  # colour parsed from Excel file associated with this category
-        categoryFormattedString = """.{categoryName}:hover {{
-            background-color: #{backColour};
-            border-color: #{backColour};
-        }}
-        .{categoryName}-highlighted {{
-            background-color: #{backColour};
-        }}
-        .{categoryName}-highlighted:hover {{
-            background-color: #{backColour}!important;
-            border-color: #{backColour}!important;
-        }}\n"""
-        categoryCSS.write(categoryFormattedString.format(categoryName=cleaner.cleanString(category),
-                                                         backColour=backgroundColour))
+#   hoverPriority - priority of the hover colour, " !important" for it to win over the other categories
+def writeCategoryHighlightCSS(categoryDict, categoryIndex, categoryCSS, hoverPriority=""):
+    placedCategories = categoryIndex.getCategories()
+    for category in categoryDict:
+        if cleaner.cleanString(category) not in placedCategories:
+            continue
+        categoryFormattedString = """.highlight-{categoryName} .{categoryName} {{ --category-colour: var(--colour-{categoryName}){priority}; --fill-colour: var(--colour-{categoryName}); }}\n"""
+        categoryCSS.write(categoryFormattedString.format(categoryName=cleaner.cleanString(category), priority=hoverPriority))
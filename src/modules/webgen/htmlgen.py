@@ -5,11 +5,16 @@
 # This file contains all the functions needed to generate the required
 # HTML elements to produce the Program Visualizer webpage
 
-# Dependencies: cleaner, linegen, html
+# Dependencies: bs4, cleaner, layout, linegen, concurrent.futures, io, itertools, json
 
+from bs4 import BeautifulSoup
 from .. import cleaner
+from . import layout
 from . import linegen
-import html
+import concurrent.futures
+import io
+import itertools
+import json
 
 # Function that generates the display div which holds the plan diagram
 # Parameters:
@@ -74,28 +79,178 @@ def placeCourseGroupRadioInputs(courseGroupSelectTag, soup, courseGroupDict):
         placeCourseGroupRadioInputsForPlan(planCourseGroupsTag, soup, courseGroupDict[plan])
         courseGroupSelectTag.append(planCourseGroupsTag)
 
+# Class that holds one plan rendered independently of the other plans: the HTML of its
+# terms, its lines and the click data of its course placements. The line numbers are
+# local to the plan (starting at 0) and are offset by the lines of the plans before it
+# when the plan is written, so plans can be rendered in any order (or in other processes)
+# and merged in sheet order.
+class PlanFragment:
+    # Parameters:
+    #   plan - name of plan
+    #   termsTag - detached HTML tag holding the term divs of the plan
+    #   lineList - list of [start, end, coreq] for every line of the plan (see linegen.collectLines)
+    #   packedAnchors - precomputed anchors of the lines (see linegen.computeLineAnchors), None if
+    #   the geometry of the lines is not precomputed
+    #   placementList - click data of the course placements (see linegen.collectClickData)
+    def __init__(self, plan = "", termsTag = None, lineList = [], packedAnchors = None, placementList = []) -> None:
+        self.plan = plan
+        self.termsTag = termsTag
+        self.termsHTML = None  # HTML of termsTag, only rendered when needed
+        self.lineList = lineList
+        self.packedAnchors = packedAnchors
+        self.placementList = placementList
+
+    # The terms are sent between processes as HTML, and parsed again when they are placed
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        state["termsHTML"] = self.getTermsHTML()
+        state["termsTag"] = None
+        return state
+
+    # Returns the HTML of the term divs of the plan
+    def getTermsHTML(self) -> str:
+        if self.termsHTML is None:
+            self.termsHTML = "".join(str(termTag) for termTag in self.termsTag.contents)
+        return self.termsHTML
+
+    # Returns the term divs of the plan, to be moved into the plan div
+    def getTermTags(self) -> list:
+        if self.termsTag is None:
+            self.termsTag = BeautifulSoup(self.termsHTML, "html.parser")
+        return list(self.termsTag.contents)
+
+    # Returns the number of lines of the plan
+    def getLineCount(self) -> int:
+        return len(self.lineList)
+
+    # Writes the lines and click data of the plan, numbering its lines from firstLine
+    # Parameters:
+    #   firstLine: number ID of the first line of the plan (int)
+    #   indexJS: file handle the lines are written to
+    #   controller: file handle the click data is written to
+    def writeJS(self, firstLine = 0, indexJS = None, controller = None):
+        linegen.writeLineTable(self.lineList, firstLine, indexJS)
+        if self.packedAnchors is not None:
+            linegen.writeLineAnchors(self.packedAnchors, firstLine, self.plan, indexJS)
+        linegen.writeClickData(self.placementList, firstLine, self.plan, controller)
+
+# Function that renders every plan, in a pool of worker processes if workers is given.
+# The plans share no state, so a department renders in about the time of its largest plan.
+# Parameters:
+#   sequenceDict - dict that maps plan name to a dict that represents the plan sequence
+#   categoryIndex - category index object, used to look up the categories of each course
+#   precomputeGeometry - flag indicating if the anchors of every line are computed from the
+#   layout of its plan, so that the webpage can draw it without measuring the page
+#   delegateEvents - flag indicating if the course clicks are handled by listeners on the display
+#   div instead of listeners on every course div
+#   workers - number of worker processes, None to render the plans one after another
+# Returns: list of the PlanFragment of every plan, in sheet order
+def renderPlans(sequenceDict, categoryIndex, precomputeGeometry=False, delegateEvents=False, workers=None):
+    planList = list(sequenceDict)
+    if workers is None or len(planList) < 2:
+        return [renderPlan(plan, sequenceDict[plan], categoryIndex, precomputeGeometry, delegateEvents)
+                for plan in planList]
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        # map returns the fragments in the order of the plans, whichever finishes first
+        return list(executor.map(renderPlan,
+                                 planList,
+                                 [sequenceDict[plan] for plan in planList],
+                                 itertools.repeat(categoryIndex),
+                                 itertools.repeat(precomputeGeometry),
+                                 itertools.repeat(delegateEvents)))
+
+# Function that renders a plan into a fragment, with its own soup and line manager
+# Parameters:
+#   plan - name of plan
+#   planDict - dict that maps a term to a list of courses taken in that term
+#   categoryIndex - category index object, used to look up the categories of each course
+#   precomputeGeometry - flag indicating if the anchors of every line are computed from the layout of the plan
+#   delegateEvents - flag indicating if the course clicks are handled by listeners on the display
+#   div instead of listeners on every course div
+# Returns: PlanFragment of the plan
+def renderPlan(plan, planDict, categoryIndex, precomputeGeometry=False, delegateEvents=False):
+    soup = BeautifulSoup("", "html.parser")
+    termsTag = soup.new_tag("div")
+    placeTermsDivs(termsTag, planDict, soup, plan, categoryIndex, delegateEvents)
+
+    # generating a list of all courses taken in this plan
+    courseList = []
+    for courses in planDict.values():
+        courseList += courses
+    # collecting the lines and click data of this plan, the layout of the plan is only
+    # needed if the geometry of the lines is precomputed
+    lineManager = linegen.LineManager()
+    lineList = linegen.collectLines(courseList, lineManager, plan)
+    packedAnchors = None
+    if precomputeGeometry:
+        packedAnchors = linegen.computeLineAnchors(lineList, layout.computePlanLayout(termsTag))
+    placementList = linegen.collectClickData(courseList, lineManager, plan, categoryIndex)
+    return PlanFragment(plan, termsTag, lineList, packedAnchors, placementList)
+
 # Function that places the divs for each plan
 # Parameters:
 #   displayTag - HTML tag for outer display div where the different plan sequences are placed
-#   sequenceDict - dict that maps plan name to a dict that represents the plan sequence
+#   planFragmentList - list of the rendered plans, in sheet order (see renderPlans)
 #   soup - soup object, used to create HTML tags
 #   indexJS - file handle for index.js, used to write to index.js
 #   controller - file handle for controller.js, used to write to controller.js
-#   lineManager - line manager object, used to handle line placement and generation
-def placePlanDivs(displayTag, sequenceDict, soup, indexJS, controller, lineManager):
-    for plan in sequenceDict:
+def placePlanDivs(displayTag, planFragmentList, soup, indexJS, controller):
+    firstLine = 0
+    for planFragment in planFragmentList:
+        plan = planFragment.plan
         switchInput = soup.new_tag("div", attrs={"id":cleaner.cleanString(plan),
                                                  "ng-switch-when":cleaner.cleanString(plan),
-                                                 "style":"height:fit-content; display:flex; flex-direction:row; flex-wrap:column;"})
-        placeTermsDivs(switchInput, 
-                       sequenceDict[plan], 
-                       soup, 
-                       indexJS, 
-                       controller, 
-                       plan, 
-                       lineManager)
+                                                 "style":"height:fit-content; display:flex; flex-direction:row; flex-wrap:column; position:relative;"})
+        for termTag in planFragment.getTermTags():
+            switchInput.append(termTag)
+        planFragment.writeJS(firstLine, indexJS, controller)
+        firstLine += planFragment.getLineCount()
         displayTag.append(switchInput)
 
+# Function that places the divs for each plan as lazily loaded fragments. Each plan div
+# includes its terms from a separate HTML fragment the first time the plan is selected,
+# except for the first plan whose fragment is inlined as a template. The lines and click data
+# of each plan are written separately to their own JS chunk.
+# Parameters:
+#   displayTag - HTML tag for outer display div where the different plan sequences are placed
+#   planFragmentList - list of the rendered plans, in sheet order (see renderPlans)
+#   soup - soup object, used to create HTML tags
+# Returns: dict that maps each plan key to a list of [HTML fragment, JS chunk body]
+def placeLazyPlanDivs(displayTag, planFragmentList, soup):
+    planFragmentDict = {}
+    firstLine = 0
+    for planFragment in planFragmentList:
+        planKey = cleaner.cleanString(planFragment.plan)
+        fragmentPath = getPlanFragmentPath(planKey)
+
+        # ng-include cannot share an element with ng-switch-when, both transclude the element
+        switchInput = soup.new_tag("div", attrs={"ng-switch-when":planKey})
+        includeTag = soup.new_tag("div", attrs={"id":planKey,
+                                                "ng-include":"'" + fragmentPath + "'",
+                                                "style":"height:fit-content; display:flex; flex-direction:row; flex-wrap:column; position:relative;"})
+        switchInput.append(includeTag)
+
+        # the plan JS goes to its own buffer
+        planJS = io.StringIO()
+        planFragment.writeJS(firstLine, planJS, planJS)
+        firstLine += planFragment.getLineCount()
+
+        if planFragmentDict == {}:
+            # first plan is shown on load, inline its fragment into the template cache
+            templateTag = soup.new_tag("script", attrs={"type":"text/ng-template",
+                                                        "id":fragmentPath})
+            templateTag.string = planFragment.getTermsHTML()
+            displayTag.append(templateTag)
+        displayTag.append(switchInput)
+        planFragmentDict[planKey] = [planFragment.getTermsHTML(), planJS.getvalue()]
+    return planFragmentDict
+
+# Function that returns the path (relative to index.html) of the HTML fragment of a plan
+# Parameters:
+#   planKey - cleaned name of plan
+def getPlanFragmentPath(planKey):
+    return "./plans/" + planKey + ".html"
+
 # Function that places the description text above the category button menu
 # Parameters:
 #   soup - soup object, used to create HTML tags
@@ -126,7 +281,7 @@ def placeLegendButtons(soup, legendTag, categoryDict):
 #   colour - colour of button
 # Returns: HTML tag for category button
 def placeLegendButton(soup, category, colour):
-    return soup.new_tag("div", attrs={"ng-click":category+ "clickListener()", 
+    return soup.new_tag("div", attrs={"ng-click":"legendClickListener('" + category + "')", 
                                         "class":"legendbutton",
                                         "id": cleaner.cleanString(category),
                                         "style":"background-color:#" + colour})
@@ -173,11 +328,11 @@ def placeCourseGroupRadioInputsForSubPlan(subPlanTag, soup, subPlanOptionList, s
 #   planTag - HTML tag for a given plan
 #   planDict - dict that maps a term to a list of courses taken in that term
 #   soup - soup object, used to create HTML tags
-#   indexJS - file handle for index.js, used to write to index.js
-#   controller - file handle for controller.js, used to write to controller.js
 #   plan - name of plan whose terms are being placed
-#   lineManager - line manager object, used to handle line placement and generation
-def placeTermsDivs(planTag, planDict, soup, indexJS, controller, plan, lineManager):
+#   categoryIndex - category index object, used to look up the categories of each course
+#   delegateEvents - flag indicating if the course clicks are handled by listeners on the display
+#   div instead of listeners on every course div
+def placeTermsDivs(planTag, planDict, soup, plan, categoryIndex, delegateEvents=False):
     electiveCounterWrapper = {"ITS": 0, "PROG": 0, "COMP": 0}  # keeps track of number of electives taken in plan
     termcounter = 0  # count of number of terms placed in the plan
 
@@ -186,18 +341,9 @@ def placeTermsDivs(planTag, planDict, soup, indexJS, controller, plan, lineManag
         termHeader = soup.new_tag("h3", attrs={"class":"termheader"})  # title at top of term
         termHeader.append(term)
         termDiv.append(termHeader)
-        placeCourses(termDiv, planDict[term], soup, controller, plan, termcounter, electiveCounterWrapper)
+        placeCourses(termDiv, planDict[term], soup, plan, termcounter, electiveCounterWrapper, categoryIndex, delegateEvents)
         planTag.append(termDiv)
         termcounter += 1
-    
-    # generating a list of all courses taken in this plan
-    courseList = []
-    for courses in planDict.values():
-        courseList += courses
-    # placing lines and click listeners for this plan
-    linegen.placeLines(courseList, indexJS, lineManager, plan)
-    linegen.placeClickListeners(courseList, controller, lineManager, plan)
-    linegen.placeRightClickListeners(courseList, controller, plan)
 
 # Function that places the course div for each individual course taken in
 # one term of a given plan
@@ -205,17 +351,19 @@ def placeTermsDivs(planTag, planDict, soup, indexJS, controller, plan, lineManag
 #   termTag - HTML tag for a given term
 #   termList - list of courses being taken that term
 #   soup - soup object, used to create HTML tags
-#   controller - file handle for controller.js, used to write to controller.js
 #   plan - name of plan whose terms are being placed
 #   termcounter - which term is currently being placed (int)
-def placeCourses(termTag, termList, soup, controller, plan, termcounter, electiveCountWrapper):
+#   electiveCountWrapper - dict that keeps track of the number of electives placed in the plan
+#   categoryIndex - category index object, used to look up the categories of each course
+#   delegateEvents - flag indicating if the course clicks are handled by listeners on the display
+#   div instead of listeners on every course div
+def placeCourses(termTag, termList, soup, plan, termcounter, electiveCountWrapper, categoryIndex, delegateEvents=False):
     courseGroupList = []  # list of courses (course objects) in a course group
     courseGroupTitle = ""  # name of the course group (eg: "Course group 2A")
     courseOrList = []  # used as temp storage for OR courses
     hexcolorlist= ["033dfc", "fc0303", "ef8c2b", "0ccb01", "bd43fa", "e8e123"]  # used to colour course group boxes
     for course in termList:
         courseID = cleaner.cleanString(course.name)+cleaner.cleanString(plan)
-        courseContClass = extractCourseCategories(course)
         orCase = False
         lastOrCase = False
         if (course.calendar_print == "or") or (course.calendar_print == "lastor"):
@@ -233,43 +381,40 @@ def placeCourses(termTag, termList, soup, controller, plan, termcounter, electiv
             courseContDiv = soup.new_tag("div", attrs={"class":"coursecontainer"})
 
         # Prevent tooltip from being off screen
-        courseDisc = pickTooltipSide(termcounter, courseID, soup)
+        courseDisc = pickTooltipSide(termcounter, courseID, cleaner.cleanString(course.name), soup, delegateEvents)
 
         # Constructing course div, check for special cases (electives)
         if course.name == "Complementary Elective":
             # Class allows formatting so words fit in course box
             courseID = courseID+str(electiveCountWrapper["COMP"])
-            courseDiv = createCourseDiv(soup, courseID, "COMP", orCase)
+            courseDiv = createCourseDiv(soup, courseID, getCourseCategoryClass(courseID, categoryIndex), orCase, delegateEvents)
             # id must include which number elective it is (electiveName0, electiveName1, electiveName2, ...)
             courseDisc["id"] = courseDisc["id"][:-4] + str(electiveCountWrapper["COMP"]) + "desc"
             electiveCountWrapper["COMP"] += 1
-            formatCourseDescriptionForElective(soup, course, courseDisc)
 
         elif course.name == "Program/Technical Elective":
             # Class allows formatting so words fit in course box
             courseID = courseID+str(electiveCountWrapper["PROG"])
-            courseDiv = createCourseDiv(soup, courseID, "PROG", orCase)
+            courseDiv = createCourseDiv(soup, courseID, getCourseCategoryClass(courseID, categoryIndex), orCase, delegateEvents)
             # id must include which number elective it is (electiveName0, electiveName1, electiveName2, ...)
             courseDisc["id"] = courseDisc["id"][:-4] + str(electiveCountWrapper["PROG"]) + "desc"
             electiveCountWrapper["PROG"] += 1
-            formatCourseDescriptionForElective(soup, course, courseDisc)
 
         elif course.name == "ITS Elective":
             courseID = courseID+str(electiveCountWrapper["ITS"])
             # Class allows formatting so words fit in course box
-            courseDiv = createCourseDiv(soup, courseID, "ITS", orCase)
+            courseDiv = createCourseDiv(soup, courseID, getCourseCategoryClass(courseID, categoryIndex), orCase, delegateEvents)
             # id must include which number elective it is (electiveName0, electiveName1, electiveName2, ...)
             courseDisc["id"] = courseDisc["id"][:-4] + str(electiveCountWrapper["ITS"]) + "desc"
             electiveCountWrapper["ITS"] += 1
-            formatCourseDescriptionForElective(soup, course, courseDisc)
 
         else:
             # This is a regular course. All information should be available
             courseDiv = createCourseDiv(soup, 
                                         courseID, 
-                                        courseContClass, 
-                                        orCase) 
-            formatCourseDescriptionForRegular(soup, course, courseDisc)
+                                        getCourseCategoryClass(courseID, categoryIndex), 
+                                        orCase, 
+                                        delegateEvents) 
 
         # text appearing in course box (eg: CHEM 103)
         courseHeader = soup.new_tag("h3", attrs={"class":"embed"})
@@ -288,7 +433,6 @@ def placeCourses(termTag, termList, soup, controller, plan, termcounter, electiv
             # If multiple course options, append the courseDiv to a list which we will append
             # to the termTag after all options have been collected
             courseOrList.append(courseDiv)
-            writeFlagsAndVariables(controller, courseID, cleaner.cleanString(plan))
             if termList.index(course) == (len(termList) - 1):
                 # last course in term is an OR course, need to append to termTag immediately
                 termTag, courseOrList, courseGroupList = addOrCourses(courseOrList, course.course_group, courseGroupList, termTag, soup)
@@ -304,13 +448,11 @@ def placeCourses(termTag, termList, soup, controller, plan, termcounter, electiv
             # need to append to courseGroupList, different than check in orCase because
             # this doesn't involve OR
             courseGroupList.append(courseDiv)
-            writeFlagsAndVariables(controller, courseID, cleaner.cleanString(plan))
             continue
 
         if not skipAddCourseFlag:
             courseContDiv.append(courseDiv) 
             termTag.append(courseContDiv)
-            writeFlagsAndVariables(controller, courseID, cleaner.cleanString(plan)) 
 
     if courseGroupTitle != "":
         # Need to add course group title, outside of course group box so
@@ -325,16 +467,14 @@ def placeCourses(termTag, termList, soup, controller, plan, termcounter, electiv
             courseContDiv.append(courseGroupList[i])
         termTag.append(courseContDiv)
 
-# Extracts the categories (main & sub) a course belongs to as a string
+# Finds the categories (main & sub) a course placement belongs to as a class string
 # Parameters:
-#   course - Course object for an individual course
+#   courseID - element ID of the course placement
+#   categoryIndex - category index object, used to look up the categories of each course
 # Returns:
-#   catListString - string of all categories concatenated together (space-separated)
-def extractCourseCategories(course):
-    catListString = cleaner.cleanString(course.main_category)
-    for subcat in course.sub_categories:
-        catListString += " " + cleaner.cleanString(subcat)
-    return catListString
+#   string of all category keys of the placement concatenated together (space-separated)
+def getCourseCategoryClass(courseID, categoryIndex):
+    return " ".join(categoryIndex.getPlacementCategories(courseID))
 
 # Appends all courses in courseOrList to either termTag (if not in a course group) or to 
 # courseGroupList (if in a course group)
@@ -371,20 +511,26 @@ def addOrCourses(courseOrList, courseGroup, courseGroupList, termTag, soup):
 # Parameters:
 #   termcounter - which term is currently being placed (int)
 #   courseID - ID of the course being placed (str)
+#   courseKey - key of the course in the course description store (str)
 #   soup - soup object, used to create HTML tags 
+#   delegateEvents - flag indicating if the course clicks are handled by listeners on the display
+#   div, which ignore clicks within tooltips, instead of listeners on every course div
 # Returns:
 #   courseDisc - course disc HTML tag
-def pickTooltipSide(termcounter, courseID, soup):
+def pickTooltipSide(termcounter, courseID, courseKey, soup, delegateEvents=False):
     if termcounter < 4:
         # Term is on the left of the page, tooltip should be on right
         courseDisc = soup.new_tag("div", attrs={"id":courseID+"desc",
                                                 "class":"tooltiptextright",
-                                                "ng-click":"$event.stopPropagation()"})
+                                                "data-course":courseKey})
     else:
         # Term is on the right of the page, tooltip should be on left
         courseDisc = soup.new_tag("div", attrs={"id":courseID+"desc",
                                                 "class":"tooltiptextleft",
-                                                "ng-click":"$event.stopPropagation()"})
+                                                "data-course":courseKey})
+    if not delegateEvents:
+        # clicking on the tooltip should not click the course
+        courseDisc["ng-click"] = "$event.stopPropagation()"
 
     return courseDisc
 
@@ -394,104 +540,75 @@ def pickTooltipSide(termcounter, courseID, soup):
 #   courseID - ID of the course being placed (str)
 #   category - category of course in question
 #   orBool - boolean flag for OR cases, true if course is an OR case
-def createCourseDiv(soup, courseID, category, orBool):
+#   delegateEvents - flag indicating if the course clicks are handled by listeners on the display
+#   div, which find the course by its data-placement attribute, instead of listeners on the course div
+def createCourseDiv(soup, courseID, category, orBool, delegateEvents=False):
+    if delegateEvents:
+        listenerAttrs = {"data-placement": courseID}
+    else:
+        listenerAttrs = {"ng-click":"courseClickListener('" + courseID + "')",
+                         "ng-right-click":"courseRightClickListener('" + courseID + "')"}
     if orBool:
         # course is an OR case
         return soup.new_tag("div", attrs={"class":"orcourse tooltip " + category,
                                             "id": courseID,
-                                            "ng-click":courseID+"Listener()",
-                                            "ng-right-click":courseID+"RCListener()"})
+                                            **listenerAttrs})
     else:
         # course is a regular (non-OR) case
         return soup.new_tag("div",attrs= {"class":"course tooltip " + category, 
                                                 "id": courseID, 
-                                                "ng-click":courseID+"Listener()",
-                                                "ng-right-click":courseID+"RCListener()"})
+                                                **listenerAttrs})
 
-# Function that writes the flags and variables associated with a specific
-# course in the JS
-# Parameters:
-#   controller - file handle to controller.js
-#   courseID - unique ID for course
-def writeFlagsAndVariables(controller, courseID, plan):
-    controller.write("  var " + 
-                         courseID +
-                         "flag = false;\n")
-    controller.write("  var " + 
-                         courseID +
-                         "rflag = false;\n")
-    controller.write(" var " + courseID + "Time = new Date().getTime();\n")
-    controller.write("this."+plan+"ClickedMap.set(\""+courseID+"\", []);\n")
-
-# Function that constructs the course description tooltip for an elective
+# Function that places the course description store, a compact JSON block holding
+# every distinct course description once. The tooltips only carry the key of their
+# course (data-course) and are filled in from this store when they are first shown.
 # Parameters:
 #   soup - soup object used to create HTML tags
+#   sequenceDict - dict that maps plan name to a dict that represents the plan sequence
+def placeCourseDescriptions(soup, sequenceDict):
+    descriptionDict = {}
+    for plan in sequenceDict:
+        for term in sequenceDict[plan]:
+            for course in sequenceDict[plan][term]:
+                courseKey = cleaner.cleanString(course.name)
+                if courseKey in descriptionDict:
+                    continue
+                if course.name in ["Complementary Elective", "Program/Technical Elective", "ITS Elective"]:
+                    descriptionDict[courseKey] = formatCourseDescriptionForElective(course)
+                else:
+                    descriptionDict[courseKey] = formatCourseDescriptionForRegular(course)
+
+    # "<" is escaped so a description can never close the script tag early
+    descriptionJSON = json.dumps(descriptionDict, separators=(",", ":")).replace("<", "\\u003c")
+    descriptionTag = soup.new_tag("script", attrs={"type":"application/json",
+                                                   "id":"coursedescriptions"})
+    descriptionTag.string = descriptionJSON
+    # must come before the scripts at the end of the body, which read it on load
+    soup.body.find("footer").insert_before(descriptionTag)
+
+# Function that constructs the course description record for an elective
+# Parameters:
 #   course - Course object 
-#   courseDisc - course disc HTML tag
-def formatCourseDescriptionForElective(soup, course, courseDisc):
-    # formatting title in course description
-    courseTitle = soup.new_tag("b", attrs={"class":"descriptiontitle"})
-    courseTitle.append(course.name)    
+# Returns: list of [title, description]
+def formatCourseDescriptionForElective(course):
+    return [course.name, course.course_description]
 
-    courseLine = soup.new_tag("hr", attrs={"class":"descriptionline"})
-
-    courseDescription = soup.new_tag("p", attrs={"class":"fulldescription"})
-    courseDescription.append(course.course_description)
-    
-    courseDisc.append(courseTitle)
-    courseDisc.append(courseLine)
-    courseDisc.append(courseDescription)
-
-# Function that constructs the course description tooltip for a regular course
+# Function that constructs the course description record for a regular course
 # Parameters:
-#   soup - soup object used to create HTML tags
 #   course - course object 
-#   courseDisc - course disc HTML tag
-def formatCourseDescriptionForRegular(soup, course, courseDisc):
-    # formatting title in course description
-    courseTitle = soup.new_tag("b", attrs={"class":"descriptiontitle"})
-    courseTitle.append(course.name + " - " + course.long_title)
-
-    # adding line seperating title and description
-    courseLine = soup.new_tag("hr", attrs={"class":"descriptionline"})
-
-    # adding number of credits
-    courseCredits = soup.new_tag("p", attrs={"class":"descriptioncredits"})
-    courseCredits.append(html.unescape("&#9733 ") + course.engineering_units + " ")
-
-    # adding fee index
-    courseFeeIndex = soup.new_tag("i", attrs={"class":"descriptionfeeindex"})
-    courseFeeIndex.append("(" + "fi " + course.calc_fee_index + ")" + " ")
-
-    # adding term avail 
-    courseTermAvail = soup.new_tag("p", attrs={"class":"descriptionavailability"})
-    courseTermAvail.append("(" + course.duration + ", ")
-
-    # adding alpha hours
-    courseAlphaHours = soup.new_tag("p", attrs={"class":"descriptionalphahours"})
-    courseAlphaHours.append(course.alpha_hours + ")" + " ")
-
-    # adding desc
-    courseDescription = soup.new_tag("p", attrs={"class":"fulldescription"})
-    courseDescription.append(course.course_description)
-
-    # adding accreditation info
-    courseAccreditationHeader = soup.new_tag("b", attrs={"class":"accreditationheader"})
-    courseAccreditationHeader.append("Accreditation Units")
-    courseAccreditationUnits = soup.new_tag("div", attrs={"class":"accreditationunits"})
+# Returns: list of [title, credits, fee index, duration, alpha hours, description,
+#   accreditation units], where accreditation units is a flat list of category, units pairs
+def formatCourseDescriptionForRegular(course):
+    accreditationUnits = []
     for accredCat in course.accredUnits:
         if course.accredUnits[accredCat] != 0:  # only display if units are not zero
-            courseAccreditationUnits.append(accredCat + ": " + str(course.accredUnits[accredCat]) + " Units\n")
-            courseAccreditationUnits.append(soup.new_tag("br"))
-
-    # appending info to disc tag
-    courseDisc.append(courseTitle)
-    courseDisc.append(courseLine)
-    courseDisc.append(courseCredits)
-    courseDisc.append(courseFeeIndex)
-    courseDisc.append(courseTermAvail)
-    courseDisc.append(courseAlphaHours)
-    courseDisc.append(courseDescription)
-    courseDisc.append(soup.new_tag("br"))
-    courseDisc.append(courseAccreditationHeader)
-    courseDisc.append(courseAccreditationUnits)
+            accreditationUnits.append(accredCat)
+            accreditationUnits.append(str(course.accredUnits[accredCat]))
+
+    return [course.name + " - " + course.long_title,
+            course.engineering_units,
+            course.calc_fee_index,
+            course.duration,
+            course.alpha_hours,
+            course.course_description,
+            accreditationUnits]
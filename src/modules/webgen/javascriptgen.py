@@ -15,18 +15,28 @@ from .. import cleaner
 # Parameters:
 #   controller - file handle for controller JS file
 #   sequenceDict - dict that maps plan name to a dict that represents the plan sequence
-def initializeControllerJavaScript(sequenceDict, initialCourseGroupVals, courseGroupDict, courseGroupList, controller):
-    generateInitialBlockController(courseGroupDict, courseGroupList, controller)
+#   categoryIndex - category index object, holds the categories that have courses placed in them
+#   lazyPlans - flag indicating if the plans are loaded lazily from per plan JS chunks
+#   delegateEvents - flag indicating if the course clicks are handled by listeners on the display
+#   div instead of listeners on every course div
+def initializeControllerJavaScript(sequenceDict, initialCourseGroupVals, courseGroupDict, courseGroupList, categoryIndex, controller, lazyPlans=False, delegateEvents=False):
+    generateInitialBlockController(courseGroupDict, courseGroupList, controller, lazyPlans)
     generatePlanBasedBlocksController(sequenceDict, 
                                       initialCourseGroupVals,
                                       courseGroupDict, 
                                       courseGroupList,
+                                      categoryIndex,
                                       controller)
+    if lazyPlans:
+        generateLazyPlanLoader(sequenceDict, controller)
+    if delegateEvents:
+        generateDelegatedCourseListeners(controller)
 
 # Function that generates the initial block of Javascript in controller.js
 # Parameters:
 #   controller - file handle for controller JS file
-def generateInitialBlockController(courseGroupDict, courseGroupList, controller):
+#   lazyPlans - flag indicating if the plans are loaded lazily from per plan JS chunks
+def generateInitialBlockController(courseGroupDict, courseGroupList, controller, lazyPlans=False):
     planList = list(courseGroupDict.keys())
     controller.write("var app = angular.module(\"main\", []);\n")
     controller.write("app.controller(\"main\", function($scope) { \n")
@@ -34,7 +44,19 @@ def generateInitialBlockController(courseGroupDict, courseGroupList, controller)
     controller.write("var that = this;\n")
 
     # Render function, called when switching b/w plans
-    controller.write("""this.render = function(plan) {
+    if lazyPlans:
+        # the plan chunk may still be loading, only enable the plan if it is still selected
+        controller.write("""this.render = function(plan) {
+            this.disable(this.previousPlan);
+            this.previousPlan = plan;
+            this.attachPlan(plan, function () {
+                if (that.previousPlan == plan) {
+                    that.enable(plan);
+                }
+            });
+};\n""")
+    else:
+        controller.write("""this.render = function(plan) {
             this.disable(this.previousPlan);
             this.enable(plan);
             this.previousPlan = plan;
@@ -50,6 +72,7 @@ Array.prototype.forEach.call(radios, function (radio) {
 });\n""")
     generateHighlightElement(controller)
     generateUnHighlightElement(controller)
+    generateCourseClickListeners(controller)
 
 # Function that writes the highlightElement function which highlights
 # an individual course when a category button is pressed.
@@ -81,43 +104,154 @@ def generateUnHighlightElement(controller):
         element.classList.add(category);
     };\n""")
 
+# Function that writes the click and right click listeners shared by every course box,
+# along with registerPlacements which stores the click data of the courses of a plan
+# (see linegen.collectClickData). The listeners look up the course by its ID, its
+# debounce time and clicked/locked state are kept with its click data.
+# Parameters:
+#   controller - file handle to controller.js
+def generateCourseClickListeners(controller):
+    controller.write("""this.placements = new Map();
+this.registerPlacements = function(plan, placementList) {
+    for (let i = 0; i < placementList.length; i++) {
+        var courseID = placementList[i][0];
+        that.placements.set(courseID, {plan: plan,
+                                       category: placementList[i][1],
+                                       lines: placementList[i][2],
+                                       time: new Date().getTime(),
+                                       clicked: false,
+                                       locked: false});
+    }
+};
+$scope.courseClickListener = function (courseID) {
+    var placement = that.placements.get(courseID);
+    var currentTime = new Date().getTime();
+    if (currentTime - placement.time <= 200) {
+        placement.time = currentTime;
+        return;
+    }
+    placement.time = currentTime;
+    var element = document.getElementById(courseID);
+    if (!placement.clicked) {
+        for (let i = 0; i < placement.lines.length; i++) {
+            that.addLine(lineTable.getLine(placement.lines[i]));
+        }
+        that.highlightElement(element, placement.category);
+        that.addToClicked(courseID, placement.category);
+        placement.clicked = true;
+    }
+    else {
+        for (let i = 0; i < placement.lines.length; i++) {
+            that.removeLine(lineTable.getLine(placement.lines[i]));
+        }
+        that.unHighlightElement(element, placement.category);
+        that.removeFromClicked(courseID);
+        placement.clicked = false;
+    }
+};
+$scope.courseRightClickListener = function (courseID) {
+    var placement = that.placements.get(courseID);
+    var element = document.getElementById(courseID + "desc");
+    if (!placement.locked) {
+        if (element.classList.contains("tooltiptextleft")) {
+            element.classList.remove("tooltiptextleft");
+            element.classList.add("tooltiptextleft-locked");
+        } else {
+            element.classList.remove("tooltiptextright");
+            element.classList.add("tooltiptextright-locked");
+        }
+        placement.locked = true;
+    }
+    else {
+        if (element.classList.contains("tooltiptextleft-locked")) {
+            element.classList.remove("tooltiptextleft-locked");
+            element.classList.add("tooltiptextleft");
+        } else {
+            element.classList.remove("tooltiptextright-locked");
+            element.classList.add("tooltiptextright");
+        }
+        placement.locked = false;
+    }
+};\n""")
+
+# Function that generates the click and right click listeners of the display div, used
+# instead of listeners on every course div. A click on a course bubbles up to the display
+# div, which finds the course by its data-placement attribute, so the number of listeners
+# and Angular watchers does not grow with the number of courses. Clicks within a course
+# description are ignored, like the stopPropagation of the tooltips without delegation.
+# Parameters:
+#   controller - file handle to controller.js
+def generateDelegatedCourseListeners(controller):
+    controller.write("""this.displayDiv.addEventListener("click", function(event) {
+    if (event.target.closest("[data-course]") !== null) {
+        return;
+    }
+    var course = event.target.closest("[data-placement]");
+    if (course !== null) {
+        $scope.courseClickListener(course.getAttribute("data-placement"));
+    }
+});
+this.displayDiv.addEventListener("contextmenu", function(event) {
+    var course = event.target.closest("[data-placement]");
+    if (course !== null) {
+        event.preventDefault();
+        $scope.courseRightClickListener(course.getAttribute("data-placement"));
+    }
+});\n""")
+
 # Function that generates the blocks of the controller JS file that are dependent
-# on the number and names of plans provided
+# on the number and names of plans provided. The state of every plan is kept in one
+# object in the planStates map, so the functions below are written once and look up
+# the state of the plan they work on instead of switching between plans.
 # Parameters:
 #   sequenceDict - dict that maps plan name to a dict that represents the plan sequence
+#   categoryIndex - category index object, holds the categories that have courses placed in them
 #   controller - file handle for controller.js file
-def generatePlanBasedBlocksController(sequenceDict, initialCourseGroupVals, courseGroupDict, courseGroupList, controller):
+def generatePlanBasedBlocksController(sequenceDict, initialCourseGroupVals, courseGroupDict, courseGroupList, categoryIndex, controller):
     generatePlanBasedInitalVariables(sequenceDict, initialCourseGroupVals, courseGroupList, controller)
     generateSetDefaults(courseGroupDict, courseGroupList, controller)
     generateSubRadioListener(courseGroupList, controller)
-    generateDisableSwitchStatement(sequenceDict, controller)
-    generateEnableSwitchStatement(sequenceDict, controller)
-    generateAddLineSwitch(sequenceDict, courseGroupList, controller)
-    generateDeleteLineSwitch(sequenceDict, courseGroupList, controller)
-    generateAddToClickSwitch(sequenceDict, courseGroupList, controller)
-    generateDeleteFromClickSwitch(sequenceDict, courseGroupList, controller)
-    generateCategoryLegendJS(sequenceDict, courseGroupList, controller)
+    generateCurrentPlanState(courseGroupList, controller)
+    generateDisable(controller)
+    generateEnable(categoryIndex, controller)
+    generateAddLine(controller)
+    generateRemoveLine(controller)
+    generateAddToClicked(controller)
+    generateRemoveFromClicked(controller)
+    generateCategoryLegendJS(courseGroupList, controller)
 
 # Function that generates the intial variables for the controller
-# based on the plans
+# based on the plans. The number of terms and the maximum number of courses
+# in a term of each plan are written as data, one row per plan.
 # Parameters: 
 #   sequenceDict - dict that maps plan name to a dict that represents the plan sequence
 #   controller - file handle for controller.js file
 def generatePlanBasedInitalVariables(sequenceDict, initialCourseGroupVals, courseGroupList, controller):
+    formattedPlanData = "  [\"{planName}\", {terms}, {maxCourses}],\n"
+    controller.write("var planData = [\n")
     for plan in sequenceDict:
-        controller.write("this." + cleaner.cleanString(plan) + "List = [];\n")  # list of lines displaying on plan
-        controller.write("this." + cleaner.cleanString(plan) + "Clicked = [];\n")
-        controller.write("this." + cleaner.cleanString(plan) + "LegendBtns = [];\n")
-        controller.write("this." + cleaner.cleanString(plan) + "LegendBtnsClicked = [];\n")
-        controller.write("this." + cleaner.cleanString(plan) + "ClickedMap = new Map();\n")
         numterms = len(sequenceDict[plan].keys())
-        controller.write("this." + cleaner.cleanString(plan) + "Terms = " + str(numterms) + ";\n")
-        maxcourses = 0
+        maxcourses = 0  # allows variable page height depending on number of courses
         for term in sequenceDict[plan]:
             termcourses = len(sequenceDict[plan][term])
             if termcourses > maxcourses:
                 maxcourses = termcourses
-        controller.write("this." + cleaner.cleanString(plan) + "MaxCourses = " + str(maxcourses) + ";\n")  # allows variable page height depending on number of courses
+        controller.write(formattedPlanData.format(planName=cleaner.cleanString(plan),
+                                                  terms=numterms,
+                                                  maxCourses=maxcourses))
+    controller.write("];\n")
+
+    # lines: maps lines displaying on plan to their reference count
+    # clicked: maps clicked course IDs to the category they are highlighted with
+    # highlightedCategories: set of categories whose legend button is pressed
+    controller.write("""this.planStates = new Map();
+for (let i = 0; i < planData.length; i++) {
+    this.planStates.set(planData[i][0], {terms: planData[i][1],
+                                         maxCourses: planData[i][2],
+                                         lines: new Map(),
+                                         clicked: new Map(),
+                                         highlightedCategories: new Set()});
+}\n""")
     for courseGroup in initialCourseGroupVals:
         formattedCourseGroupVar = "$scope.field{number} = {{ group{number}: \"{val}\" }};\n"
         controller.write(formattedCourseGroupVar.format(number=courseGroup, 
@@ -125,32 +259,37 @@ def generatePlanBasedInitalVariables(sequenceDict, initialCourseGroupVals, cours
     planString = generatePlanString(courseGroupList)
     controller.write("this.previousPlan = " + planString + "\n")
 
-# Function that writes the setDefaults function based on the plans and course groups
+# Function that writes the setDefaults function based on the plans and course groups.
+# The default option of every course group of each plan is written as data.
 # Parameters:
 #   courseGroupDict - dict that maps plans to a dict that maps course groups to the 
 #   options avaiable in that course group
 #   courseGroupList - list of course groups taken overall in the program
 #   controller - file handle to controller.js
 def generateSetDefaults(courseGroupDict, courseGroupList, controller):
-    controller.write("this.setDefaults = function(plan) { \n")
-    controller.write("  switch(plan) { \n")
-    formattedCaseStatement = "      case \"{case}\": \n"
-    formattedCourseGroup = "            $scope.field{number}.group{number} ="
-    switchEndString = """    default:
-    console.log("shouldn't be here");
-    }
-};\n"""
+    controller.write("this.courseGroups = [" + 
+                     ", ".join("\"" + str(element) + "\"" for element in courseGroupList) + "];\n")
+    controller.write("this.courseGroupDefaults = new Map([\n")
     for mainPlan in courseGroupDict:
-        controller.write(formattedCaseStatement.format(case=cleaner.cleanString(mainPlan)))
+        defaultList = []
         for element in courseGroupList:
-            controller.write(formattedCourseGroup.format(number=element))
             if element not in courseGroupDict[mainPlan]:
-                controller.write("\"\";\n")
+                defaultList.append("\"\"")
             else:
-                controller.write("\""+str(element)+"A\";\n")
-        controller.write("          $scope.$apply();\n")
-        controller.write("          break;\n")
-    controller.write(switchEndString)
+                defaultList.append("\""+str(element)+"A\"")
+        controller.write("  [\"" + cleaner.cleanString(mainPlan) + "\", [" + ", ".join(defaultList) + "]],\n")
+    controller.write("]);\n")
+    controller.write("""this.setDefaults = function(plan) {
+    var defaults = this.courseGroupDefaults.get(plan);
+    if (defaults === undefined) {
+        console.log("shouldn't be here");
+        return;
+    }
+    for (let i = 0; i < this.courseGroups.length; i++) {
+        $scope["field" + this.courseGroups[i]]["group" + this.courseGroups[i]] = defaults[i];
+    }
+    $scope.$apply();
+};\n""")
 
 # Function that generates the listener that listens to course group radio inputs
 # Parameters:
@@ -162,612 +301,284 @@ def generateSubRadioListener(courseGroupList, controller):
     controller.write("that.render(" + planString + ");\n")  # update the page
     controller.write("};\n")
 
-# Function that generates the switch statements and functions which handle
-# disabling the lines of a plan when switched off
+# Function that generates the getPlanState and currentPlanState functions, which look
+# up the state object of a plan and of the currently selected plan
 # Parameters:
-#   sequenceDict - dict that maps plan name to a dict that represents the plan sequence
-#   controller - file handle for controller.js file
-def generateDisableSwitchStatement(sequenceDict, controller):
-    formattedFunctionStatement = """this.{functionName} = function(plan) {{
-    switch (plan) {{ \n"""
-    formattedSwitchStatement = """  case "{planName}": 
-    for (let i = 0; i < this.{planName}List.length; i++) {{
-        this.{planName}List[i][0].{actionName}(true);
-    }}
-    break; \n"""
-    switchEndString = """    default:
-    console.log("shouldn't be here");
+#   courseGroupList - list of course groups taken in this program
+#   controller - file handle to controller.js
+def generateCurrentPlanState(courseGroupList, controller):
+    controller.write("""this.getPlanState = function(plan) {
+    var state = this.planStates.get(plan);
+    if (state === undefined) {
+        console.log("shouldn't be here");
     }
-};\n"""
-    controller.write(formattedFunctionStatement.format(functionName="disable"))
-    for plan in sequenceDict:
-        controller.write(formattedSwitchStatement.format(planName=cleaner.cleanString(plan), 
-                                                         actionName="hide"))
-    controller.write(switchEndString)
+    return state;
+};
+this.currentPlanState = function() {
+    return this.getPlanState(""" + generatePlanString(courseGroupList) + """);
+};\n""")
 
-# Function that generates the switch statements and functions which handle
-# enabling of course boxes, lines between plans, and boxes that were highlighted
-# from the legend.
+# Function that generates the function which handles disabling the lines
+# of a plan when switched off
 # Parameters:
-#   sequenceDict - dict that maps plan name to a dict that represents the plan sequence
 #   controller - file handle for controller.js file
-def generateEnableSwitchStatement(sequenceDict, controller):
-    categoriesDict = sortIntoCategories(sequenceDict)  # sort courses into categories
-    findLegendButtons(categoriesDict, sequenceDict, controller)  # find legend buttons in the document, store them in a list
+def generateDisable(controller):
+    controller.write("""this.disable = function(plan) {
+    var state = this.getPlanState(plan);
+    if (state === undefined) {
+        return;
+    }
+    for (const line of state.lines.keys()) {
+        line.hide(true);
+    }
+};\n""")
 
-    formattedFunctionStatement = """this.{functionName} = function(plan) {{
-  switch(plan) {{\n"""
+# Function that generates the function which handles enabling of course boxes,
+# lines between plans, and boxes that were highlighted from the legend.
+# Parameters:
+#   categoryIndex - category index object, holds the categories that have courses placed in them
+#   controller - file handle for controller.js file
+def generateEnable(categoryIndex, controller):
+    findLegendButtons(categoryIndex, controller)  # find legend buttons in the document, store them in a list
 
-    # layout: for each plan, show/display every course box in that plan,
+    # layout: show/display every course box in the plan,
     # then adjust the webpage width and height, then (for loop #1) restore all courses
     # that were clicked to their clicked state (highlighted with arrows drawn).
-    # For loop #2: Restore all courses that were highlighted with the legend buttons
-    # to their highlighted state and restore legend buttons to their pressed state.
-    formattedSwitchStatement = """    case "{planName}": 
-      for (let i = 0; i < this.{planName}List.length; i++) {{
-          this.{planName}List[i][0].{actionName}(true);
-      }}
-      width = this.{planName}Terms*220 + 20;
-      widthstr = width.toString() + "px";
-      document.getElementById("main").style.width = widthstr;
-      height = this.{planName}MaxCourses*100 + 690;
-      heightstr = height.toString() + "px";
-      document.getElementById("main").style.height = heightstr;
-      for (let i = 0; i < this.{planName}Clicked.length; i++) {{
-          var element = document.getElementById(this.{planName}Clicked[i][0]);
-          this.highlightElement(element, this.{planName}Clicked[i][1]);
-      }}
-      for (let i = 0; i < this.{planName}LegendBtns.length; i++) {{
-          var found = false;
-          for (let j = 0; j < this.{planName}LegendBtnsClicked.length; j++) {{
-              if (this.{planName}LegendBtnsClicked[j] == this.{planName}LegendBtns[i]) {{
-                  found = true;
-              }}
-          }}
-          if (found == false) {{
-            if (this.{planName}LegendBtns[i].classList.contains("legendbutton-pressed")) {{
-              this.{planName}LegendBtns[i].classList.remove("legendbutton-pressed");
-            }}
-              this.{planName}LegendBtns[i].classList.add("legendbutton");
-          }}
-          if (found == true) {{
-            if (this.{planName}LegendBtns[i].classList.contains("legendbutton")) {{
-              this.{planName}LegendBtns[i].classList.remove("legendbutton");
-            }}
-              this.{planName}LegendBtns[i].classList.add("legendbutton-pressed");
-          }}
-      }}
-      break; \n"""
-
-    switchEndString = """    default:
-    console.log("shouldn't be here");
-    }
-};\n"""
-
-    controller.write(formattedFunctionStatement.format(functionName="enable"))
-    for plan in sequenceDict:
-        controller.write(formattedSwitchStatement.format(planName=cleaner.cleanString(plan), 
-                                                         actionName="show"))
-    controller.write(switchEndString)
+    # For loop #2: Restore the highlighted categories of the plan on the display div
+    # and restore legend buttons to their pressed state.
+    controller.write("""this.enable = function(plan) {
+    var state = this.getPlanState(plan);
+    if (state === undefined) {
+        return;
+    }
+    for (const line of state.lines.keys()) {
+        line.show(true);
+    }
+    var width = state.terms*220 + 20;
+    document.getElementById("main").style.width = width.toString() + "px";
+    var height = state.maxCourses*100 + 690;
+    document.getElementById("main").style.height = height.toString() + "px";
+    for (const [elementID, category] of state.clicked) {
+        var element = document.getElementById(elementID);
+        this.highlightElement(element, category);
+    }
+    for (let i = 0; i < this.legendBtns.length; i++) {
+        var pressed = state.highlightedCategories.has(this.legendBtns[i].id);
+        this.displayDiv.classList.toggle("highlight-" + this.legendBtns[i].id, pressed);
+        this.setLegendButtonPressed(this.legendBtns[i], pressed);
+    }
+};\n""")
 
-# Function that generates the switch statement and function addLine
+# Function that generates the addLine function, which shows a line on the current
+# plan or adds a reference to it if it is already shown
 # Parameters:
-#   sequenceDict - dict that maps plan name to a dict that represents the plan sequence
 #   controller - file handle for controller.js file
-def generateAddLineSwitch(sequenceDict, courseGroupList, controller):
-    switchEndString = """    default:
-    console.log("shouldn't be here");
-    }
-};\n"""
-    formattedFunctionStatement = """this.{functionName} = function(line) {{
-switch({planString}) {{ \n"""
-    formattedAddLineSwitchStatement = """ case "{planName}":
-    var index = this.{planName}List.findIndex((element) => element[0] == line);
-    if (index == -1) {{
+def generateAddLine(controller):
+    controller.write("""this.addLine = function(line) {
+    var state = this.currentPlanState();
+    if (state === undefined) {
+        return;
+    }
+    var count = state.lines.get(line);
+    if (count === undefined) {
         line.show(false);
-        this.{planName}List.push([line, 1])
-    }}
-    else {{
-        this.{planName}List[index][1]++;
-    }}
-    break;\n"""
-    controller.write(formattedFunctionStatement.format(functionName="addLine",
-                                                       planString=generatePlanString(courseGroupList)))
-    for plan in sequenceDict:
-        controller.write(formattedAddLineSwitchStatement.format(planName=cleaner.cleanString(plan)))
-    controller.write(switchEndString)
+        state.lines.set(line, 1);
+    }
+    else {
+        state.lines.set(line, count + 1);
+    }
+};\n""")
 
-# Function that generates the switch statement and function removeLine
+# Function that generates the removeLine function, which removes a reference to a
+# line on the current plan and hides it once it has no references left
 # Parameters:
-#   sequenceDict - dict that maps plan name to a dict that represents the plan sequence
 #   controller - file handle for controller.js file
-def generateDeleteLineSwitch(sequenceDict, courseGroupList, controller):
-    switchEndString = """    default:
-    console.log("shouldn't be here");
-    }
-};\n"""
-    formattedFunctionStatement = """this.{functionName} = function(line) {{
-switch({planString}) {{ \n"""
-    formmattedDeleteLineSwitchStatement = """ case "{planName}":
-    var index = this.{planName}List.findIndex((element) => element[0] == line);
-    if (index != -1) {{
-        this.{planName}List[index][1]--
-        if (this.{planName}List[index][1] <= 0) {{
+def generateRemoveLine(controller):
+    controller.write("""this.removeLine = function(line) {
+    var state = this.currentPlanState();
+    if (state === undefined) {
+        return;
+    }
+    var count = state.lines.get(line);
+    if (count !== undefined) {
+        if (count <= 1) {
             line.hide(false);
-            this.{planName}List.splice(index, 1);
-        }}
-    }}
-    break;"""
-    controller.write(formattedFunctionStatement.format(functionName="removeLine",
-                                                      planString=generatePlanString(courseGroupList)))
-
-    for plan in sequenceDict:
-        controller.write(formmattedDeleteLineSwitchStatement.format(planName=cleaner.cleanString(plan)))
-
-    controller.write(switchEndString)
+            state.lines.delete(line);
+        }
+        else {
+            state.lines.set(line, count - 1);
+        }
+    }
+};\n""")
 
-# Function that generates the switch statement associated with the addToClicked method
+# Function that generates the addToClicked function, which records that a course of
+# the current plan was clicked and highlighted with a category
 # Parameters:
-#   sequenceDict - dict that maps plan name to a dict that represents the plan sequence
 #   controller - file handle for controller.js file
-def generateAddToClickSwitch(sequenceDict, courseGroupList, controller):
-    switchEndString = """    default:
-    console.log("shouldn't be here");
-    }
-};\n"""
-    formattedFunctionStatement = """this.{functionName} = function(element, category) {{
-switch({planString}) {{ \n"""
-    formattedAddToClickStatement = """ case "{planName}":
-    var index = this.{planName}Clicked.findIndex((item) => item[0] == element);
-    if (index == -1) {{
-        this.{planName}Clicked.push([element, category, 1]);
-    }}
-    else {{
-        this.{planName}Clicked[index][1] = category;
-        this.{planName}Clicked[index][2]++;
-    }}
-    this.{planName}ClickedMap.get(element).push(category);
-    break;"""
-    controller.write(formattedFunctionStatement.format(functionName="addToClicked",
-                                                       planString=generatePlanString(courseGroupList)))
-    for plan in sequenceDict:
-        controller.write(formattedAddToClickStatement.format(planName=cleaner.cleanString(plan)))
-    
-    controller.write(switchEndString)
+def generateAddToClicked(controller):
+    controller.write("""this.addToClicked = function(element, category) {
+    var state = this.currentPlanState();
+    if (state === undefined) {
+        return;
+    }
+    state.clicked.set(element, category);
+};\n""")
 
-# Function that generates the switch statement associated with the deleteFromClicked method
+# Function that generates the removeFromClicked function, which records that a course
+# of the current plan was unclicked
 # Parameters:
-#   sequenceDict - dict that maps plan name to a dict that represents the plan sequence
 #   controller - file handle for controller.js file
-def generateDeleteFromClickSwitch(sequenceDict, courseGroupList, controller):
-    switchEndString = """    default:
-    console.log("shouldn't be here");
-    }
-};\n"""
-    formattedFunctionStatement = """this.{functionName} = function(element, category) {{
-switch({planString}) {{ \n"""
-    formattedAddToClickStatement = """ case "{planName}":
-    var index = this.{planName}Clicked.findIndex((item) => item[0] == element);
-    if (index != -1) {{
-        var indexMap = this.{planName}ClickedMap.get(element).lastIndexOf(category);
-        if (indexMap != -1) {{
-            this.{planName}ClickedMap.get(element).splice(indexMap, 1);
-        }}
-        this.{planName}Clicked[index][2]--;
-        if (this.{planName}Clicked[index][2] <= 0) {{
-            this.{planName}Clicked.splice(index, 1);
-            return "";
-        }}
-        var maxIndex = this.{planName}ClickedMap.get(element).length - 1
-        return this.{planName}ClickedMap.get(element)[maxIndex];
-    }}
-    return "";
-    break;"""
-    controller.write(formattedFunctionStatement.format(functionName="removeFromClicked",
-                                                       planString=generatePlanString(courseGroupList)))
-    for plan in sequenceDict:
-        controller.write(formattedAddToClickStatement.format(planName=cleaner.cleanString(plan)))
-    
-    controller.write(switchEndString)
+def generateRemoveFromClicked(controller):
+    controller.write("""this.removeFromClicked = function(element) {
+    var state = this.currentPlanState();
+    if (state === undefined) {
+        return;
+    }
+    state.clicked.delete(element);
+};\n""")
 
 # Generates the clickable category legend. Allows a click to highlight all
 # courses in that category.
 # Parameters:
-#   sequenceDict - dict that stores course objects
-#       key - plan name
-#       value - dict with term name as key and list of course objs in that plan & term
+#   courseGroupList - list of course groups taken in this program
 #   controller - file handle for controller.js file
-def generateCategoryLegendJS(sequenceDict, courseGroupList, controller):
-    # sort courses into categories and plans
-    categoriesDict = sortIntoCategories(sequenceDict)
-
-    # generate flags & listeners
-    generateHighlightCategoryFlags(categoriesDict, controller)
-    generateCategoryListeners(categoriesDict, courseGroupList, controller)
-       
-    formattedFunctionStatement = """this.{functionName} = function(categoryName, planName) {{
-switch(categoryName) {{ \n"""
+def generateCategoryLegendJS(courseGroupList, controller):
+    generateCategoryListener(courseGroupList, controller)
+    generateSetLegendButtonPressed(controller)
 
-    controller.write(formattedFunctionStatement.format(functionName="highlightCategory"))
-
-    # switch statement between categories for highlight category
-    generateCategorySwitch(categoriesDict, controller, True)
-
-    controller.write(formattedFunctionStatement.format(functionName="unhighlightCategory"))
-
-     # switch statement between categories for unhighlight category
-    generateCategorySwitch(categoriesDict, controller, False)
-
-# Finds all of the legend buttons in all categories & plans. Writes the js that
-# pushes these button elements to a list storing all buttons in that plan.
-# eg: TraditionalPlanLegendBtns is a list that holds all legend button elements in
-# the Traditional Plan
+# Finds all of the legend buttons. Writes the js that pushes these button elements
+# to the list of legend buttons, which is shared by all plans since every plan shows
+# the same legend. Only categories with courses placed in them get a button.
 # Parameters:
-#   categoriesDict - dict storing course objects
-#       key - category name (eg: MATH)
-#       value - dict with key as plan name, value as course object
-#   sequenceDict - dict that maps plan name to a dict that represents the plan sequence
+#   categoryIndex - category index object, holds the categories that have courses placed in them
 #   controller - file handle for controller.js file
-def findLegendButtons(categoriesDict, sequenceDict, controller):
-    # find the button in the doc
-    formattedbtnStatement = """  var currbtn = document.getElementById("{categoryName}");\n"""
-    # push the button element to a list
-    formattedpushbtnStatement = """  that.{planName}LegendBtns.push(currbtn);\n"""
-
-    for category in categoriesDict:
-        # Note: categories are the same between all plans
-        # Special cases to handle electives
-        if category == "ComplementaryElective":
-            controller.write(formattedbtnStatement.format(categoryName="COMP"))
-        elif category == "ProgramTechnicalElective":
-            controller.write(formattedbtnStatement.format(categoryName="PROG"))
-        elif category == "ITSElective":
-            controller.write(formattedbtnStatement.format(categoryName="ITS"))
-        else:
-            # not an elective
-            controller.write(formattedbtnStatement.format(categoryName=category))
-
-        for plan in sequenceDict:
-            controller.write(formattedpushbtnStatement.format(planName=cleaner.cleanString(plan)))
-    
-# Sorts courses in sequenceDict into their categories.
-# Parameters:
-#   sequenceDict - dict that stores course objects
-#       key - plan name
-#       value - dict with term name as key and list of course objs in that plan & term
-# Returns:
-#   categoriesDict - dict storing course objects
-#       key - category name (eg: MATH)
-#       value - dict with key as plan name, value as course object
-def sortIntoCategories(sequenceDict):
-    categoriesDict = {}  # outer dict
-    for plan in sequenceDict:
-        for term in sequenceDict[plan]:
-            for course in sequenceDict[plan][term]:
-                mainCat = cleaner.cleanString(course.main_category)
-                if mainCat == "":
-                    # course does not have a category, not useful to include
-                    continue
-                subCatList = course.sub_categories
-                cleanplan = cleaner.cleanString(plan)
-                interdict = {}  # inner dict
-                interdict[cleanplan] = [course]
-                if mainCat not in categoriesDict.keys():
-                    # category not seen yet, add new category
-                    categoriesDict[mainCat] = interdict
-                else:
-                    # category is present in dict
-                    if cleanplan not in categoriesDict[mainCat].keys():
-                        # category taken but plan not seen yet
-                        # keep existing categories but add a new plan (add new key to inner dict)
-                        categoriesDict[mainCat].update(interdict)
-                    else:
-                        # category and plan both seen, can just append to corresponding list
-                        categoriesDict[mainCat][cleanplan].append(course)
-                for uncleanSubCat in subCatList:
-                    interdict = {}  # inner dict
-                    interdict[cleanplan] = [course]
-                    subCat = cleaner.cleanString(uncleanSubCat)
-                    if subCat == "":
-                        # course does not have a category, not useful to include
-                        continue
-                    if subCat not in categoriesDict.keys():
-                        # category not seen yet, add new category
-                        categoriesDict[subCat] = interdict
-                    else:
-                        # category is present in dict
-                        if cleanplan not in categoriesDict[subCat].keys():
-                            # category taken but plan not seen yet
-                            # keep existing categories but add a new plan (add new key to inner dict)
-                            categoriesDict[subCat].update(interdict)
-                        else:
-                            # category and plan both seen, can just append to corresponding list
-                            categoriesDict[subCat][cleanplan].append(course)
-    
-    return categoriesDict
-
-# Function that generates the flags used to control the state of the category click buttons
+def findLegendButtons(categoryIndex, controller):
+    # push the button element to the list
+    formattedpushbtnStatement = """this.legendBtns.push(document.getElementById("{categoryName}"));\n"""
+
+    controller.write("this.displayDiv = document.querySelector(\".display\");\n")  # holds the highlight classes
+    controller.write("this.legendBtns = [];\n")
+    for category in categoryIndex.getCategories():
+        controller.write(formattedpushbtnStatement.format(categoryName=category))
+
+# Function that generates the click listener shared by the category legend buttons.
+# Highlighting a category only toggles the class highlight-<category> on the display
+# div, the category CSS (see cssgen.writeCategoryHighlightCSS) colours the courses in it.
+# The pressed categories of each plan are kept in its highlightedCategories set.
 # Parameters:
-#   categoriesDict - dict storing course objects
-#       key - category name (eg: MATH)
-#       value - dict with key as plan name, value as course object
-#   controller - file handle to controller.js
-def generateHighlightCategoryFlags(categoriesDict, controller):
-    formattedCategoriesFlagStatement = """var {categoryName}{planName}flag = false;\n"""
-    for category in categoriesDict:
-        if category == "": 
-            continue
-        for plan in categoriesDict[category]:
-            if category == "ComplementaryElective":
-                controller.write(formattedCategoriesFlagStatement.format(categoryName = "COMP", 
-                                                                     planName = cleaner.cleanString(plan)))
-            elif category == "ProgramTechnicalElective":
-                controller.write(formattedCategoriesFlagStatement.format(categoryName = "PROG", 
-                                                                     planName = cleaner.cleanString(plan)))
-            elif category == "ITSElective":
-                controller.write(formattedCategoriesFlagStatement.format(categoryName = "ITS", 
-                                                                     planName = cleaner.cleanString(plan)))
-            else:
-                controller.write(formattedCategoriesFlagStatement.format(categoryName = cleaner.cleanString(category), 
-                                                                     planName = cleaner.cleanString(plan)))
-
-# Function that generates the click listeners for the category legend buttons
-# Parameters:
-#   categoriesDict - dict storing course objects
-#       key - category name (eg: MATH)
-#       value - dict with key as plan name, value as course object
 #   courseGroupList - list of course groups taken in this program
 #   controller - file handle to controller.js
-def generateCategoryListeners(categoriesDict, courseGroupList, controller):
-    # Get the element for the clicked legend button, check if the button is in the
-    # pressed or unpressed state.
-    # If in the unpressed state: highlight courses in that category, set the
-    # class of the button to "-pressed", & update flags
-    # If in the pressed state: unhighlight courses in that category, remove
-    # "-pressed" from the button class, & update flags
-    formattedCategoriesListener = """$scope.{categoryName}clickListener = function() {{
-    var planName = {planString};
-    var pressedbtn = document.getElementById("{categoryNameId}");
-    var checkFlag = "!{categoryName}" + planName + "flag";
-    var flagBool = eval(checkFlag);
-    if (flagBool) {{
-        that.highlightCategory("{categoryName}", planName);
-        if (pressedbtn.classList.contains("legendbutton")) {{
-            pressedbtn.classList.remove("legendbutton");
-        }}
-        pressedbtn.classList.add("legendbutton-pressed");
-        var addClick = "that." + planName + "LegendBtnsClicked.push(pressedbtn)";
-        eval(addClick);
-        var flagName = "{categoryName}" + planName + "flag";
-        eval(flagName + " = true");
+def generateCategoryListener(courseGroupList, controller):
+    formattedCategoryListener = """$scope.legendClickListener = function(categoryName) {{
+    var state = that.getPlanState({planString});
+    if (state === undefined) {{
+        return;
+    }}
+    var pressed = !state.highlightedCategories.has(categoryName);
+    if (pressed) {{
+        state.highlightedCategories.add(categoryName);
     }}
     else {{
-        that.unhighlightCategory("{categoryName}", planName);
-        if (pressedbtn.classList.contains("legendbutton-pressed")) {{
-            pressedbtn.classList.remove("legendbutton-pressed");
-        }}
-        pressedbtn.classList.add("legendbutton");
-        var findIndex = "var index = that." + planName + "LegendBtnsClicked.findIndex((element) => element[0] == pressedbtn)";
-        eval(findIndex);
-        var removeClick = "that." + planName + "LegendBtnsClicked.splice(index, 1)";
-        eval(removeClick);
-        var flagName = "{categoryName}" + planName + "flag";
-        eval(flagName + " = false");
-    }}\n"""
-    for category in categoriesDict:
-        # special cases to handle electives, category is not the same as ID
-        if category == "ComplementaryElective":
-            controller.write(formattedCategoriesListener.format(categoryName="COMP", 
-                                                                categoryNameId="COMP",
-                                                                planString=generatePlanString(courseGroupList)))
-        elif category == "ProgramTechnicalElective":
-            controller.write(formattedCategoriesListener.format(categoryName="PROG", 
-                                                                categoryNameId="PROG",
-                                                                planString=generatePlanString(courseGroupList)))
-        elif category == "ITSElective":
-            controller.write(formattedCategoriesListener.format(categoryName="ITS", 
-                                                                categoryNameId="ITS",
-                                                                planString=generatePlanString(courseGroupList)))
-        else:
-            # not an elective
-            controller.write(formattedCategoriesListener.format(categoryName=category, 
-                                                                categoryNameId=category,
-                                                                planString=generatePlanString(courseGroupList)))
-        controller.write("}\n")
-
-# Function that generates the switch statement to switch between categories within highlight
-# or unhighlight function
-# Parameters:
-#   - categoriesDict: dict that maps categories to a dict of plans which contain courses within
-#   that category
-#   - controller: file handle to controller.js
-#   - highlight: flag indicating if it is highlighting or unhighlighting 
-#   (True for highlighting)  
-def generateCategorySwitch(categoriesDict, controller, highlight):
-    # outer switch between categories
-    switchEndString = """break;   default:
-    console.log("shouldn't be here");
-    }
-};\n"""
-    formattedCaseCat = """  case "{categoryName}":\n"""
-    for category in categoriesDict:
-        if cleaner.cleanString(category) == "ComplementaryElective":
-            controller.write(formattedCaseCat.format(categoryName="COMP"))
-        if cleaner.cleanString(category) == "ProgramTechnicalElective":
-            controller.write(formattedCaseCat.format(categoryName="PROG"))
-        if cleaner.cleanString(category) == "ITSElective":
-            controller.write(formattedCaseCat.format(categoryName="ITS"))
-        else:
-            controller.write(formattedCaseCat.format(categoryName=cleaner.cleanString(category)))
-        generatePlanSwitch(categoriesDict[category], controller, highlight)
-        controller.write("""       }\n""")
-        controller.write("""      break;\n""")
-    controller.write(switchEndString)
-
-# Function that generates the switch statement to switch between plans within highlight
-# or unhighlight function for a specific category
-# Parameters:
-#   - planDict: dict that maps plans to courses in that category
-#   - controller: file handle to controller.js
-#   - highlight: flag indicating if it is highlighting or unhighlighting 
-#   (True for highlighting)  
-def generatePlanSwitch(planDict, controller, highlight):
-    # inner switch between plans
-    formattedCasePlan  = """      case "{planName}":\n"""
-    controller.write("    switch(planName) {\n")
-    for plan in planDict:
-        controller.write(formattedCasePlan.format(planName=cleaner.cleanString(plan)))
-        generateCourseStatements(planDict[plan], controller, plan, highlight)
-        controller.write("""       break;\n""")
-
-# Function that generates the highlight or unhighlight statements for a specfic categtory
-# and plan
-# Parameters:
-#   - courseList: list of course objects in that category for that plan
-#   - controller: file handle to controller.js
-#   - plan: name of current plan
-#   - highlight: flag indicating if it is highlighting or unhighlighting 
-#   (True for highlighting)      
-def generateCourseStatements(courseList, controller, plan, highlight):
-    for course in courseList:
-        # special cases to handle electives
-        if course.name == "Complementary Elective":
-            if highlight:
-                generateElectiveHighlightStatement("COMP", 
-                                                   "ComplementaryElective", 
-                                                    plan,  
-                                                    controller)
-            else:
-                generateElectiveUnhighlightStatement("COMP", 
-                                                   "ComplementaryElective", 
-                                                    plan,  
-                                                    controller)
-            continue
-        if course.name == "Program/Technical Elective":
-            if highlight:
-                generateElectiveHighlightStatement("PROG", 
-                                                   "ProgramTechnicalElective", 
-                                                    plan,  
-                                                    controller)
-            else:
-                generateElectiveUnhighlightStatement("PROG", 
-                                                   "ProgramTechnicalElective", 
-                                                    plan, 
-                                                    controller)
-            continue
-        if course.name == "ITS Elective":
-            if highlight:
-                generateElectiveHighlightStatement("ITS", 
-                                                   "ITSElective", 
-                                                   plan,  
-                                                   controller)
-            else:
-                generateElectiveUnhighlightStatement("ITS", 
-                                                   "ITSElective", 
-                                                   plan,  
-                                                   controller)
-            continue
-        # not an elective, fill in formatted statement with course attributes
-        if highlight:
-            generateNormalCourseHighlightStatement(course, plan, controller)
-        else:
-            generateNormalCourseUnhighlightStatement(course, plan, controller)
-
-# Generates the statements needed to unhighlight a single elective when pressing
-# the legend buttons
+        state.highlightedCategories.delete(categoryName);
+    }}
+    that.displayDiv.classList.toggle("highlight-" + categoryName, pressed);
+    that.setLegendButtonPressed(document.getElementById(categoryName), pressed);
+}};\n"""
+    controller.write(formattedCategoryListener.format(planString=generatePlanString(courseGroupList)))
+
+# Function that generates the setLegendButtonPressed function, which switches a
+# legend button between its pressed and unpressed style
 # Parameters:
-#   - elective: shortend elective type
-#   - longelective: long elective type
-#   - plan: current plan
-#   - counter: which number the current elective is
-#   - controller: file handle to controller.js
-def generateElectiveHighlightStatement(elective, longelective, plan, controller):
-    formattedElectiveGetUnhighlightedElement = """        var {electiveName}elements = document.getElementsByClassName("{electiveName}");\n"""
-    formattedElectivesHighlight = """        var i = 0;
-        while ({electiveName}elements.length > 0) {{
-          var currelement = document.getElementById({electiveName}elements.item(0).id);
-          if (this.{planName}ClickedMap.get("{longElectiveName}{planName}" + i).length > 0) {{
-                var mapLen = this.{planName}ClickedMap.get("{longElectiveName}{planName}" + i).length - 1
-                var prevCate = this.{planName}ClickedMap.get("{longElectiveName}{planName}" + i)[mapLen];
-                this.unHighlightElement(currelement, prevCate);
-          }}
-          this.highlightElement(currelement, categoryName);
-          this.addToClicked("{longElectiveName}{planName}" + i, categoryName);
-          i = i + 1;
-        }}\n"""
-    controller.write(formattedElectiveGetUnhighlightedElement.format(electiveName=elective))
-    controller.write(formattedElectivesHighlight.format(electiveName=elective, 
-                                                    longElectiveName=longelective, 
-                                                    planName=plan, 
-                                                    categoryName=elective))
-
-# Generates the statements needed to unhighlight a single elective when pressing
-# the legend buttons
+#   controller - file handle to controller.js
+def generateSetLegendButtonPressed(controller):
+    controller.write("""this.setLegendButtonPressed = function(button, pressed) {
+    button.classList.toggle("legendbutton", !pressed);
+    button.classList.toggle("legendbutton-pressed", pressed);
+};\n""")
+
+# Function that generates the loader which attaches the JS chunk of a plan (its lines
+# and click data) the first time the plan is rendered. The chunk of the first plan
+# is already present on load, the others are fetched from their own files. A chunk is
+# fetched once however often its plan is selected while it loads, and a chunk that fails
+# to load is fetched again the next time its plan is selected.
 # Parameters:
-#   - elective: shortend elective type
-#   - longelective: long elective type
-#   - plan: current plan
-#   - counter: which number the current elective is
-#   - controller: file handle to controller.js
-def generateElectiveUnhighlightStatement(elective, longelective, plan, controller):
-    formattedElectiveGetHighlightedElement = """        var {electiveName}elements = document.getElementsByClassName("{electiveName}-highlighted");\n"""
-    formattedElectivesUnhighlight = """        var i = 0;        
-        while ({electiveName}elements.length > 0) {{
-          var currelement = document.getElementById({electiveName}elements.item(0).id);
-          var prevCate = this.removeFromClicked("{longElectiveName}{planName}" + i, "{categoryName}");
-                if (!currelement.classList.contains(categoryName+"-highlighted")) {{
-                    return;
-                }}
-                else {{
-                    this.unHighlightElement(currelement, categoryName);
-                    if (prevCate != "") {{
-                        this.highlightElement(currelement, prevCate);
-                    }}
-                }}      
-          i = i + 1;
-        }}\n"""
-    controller.write(formattedElectiveGetHighlightedElement.format(electiveName=elective))
-    controller.write(formattedElectivesUnhighlight.format(electiveName=elective, 
-                                                        longElectiveName=longelective, 
-                                                        planName=plan, 
-                                                        categoryName=elective))
-
-# Generates the statements needed to highlight a single normal course when pressing
-# the legend buttons
+#   sequenceDict - dict that maps plan name to a dict that represents the plan sequence
+#   controller - file handle for controller.js file
+def generateLazyPlanLoader(sequenceDict, controller):
+    planList = list(sequenceDict.keys())
+    controller.write("this.planChunkPaths = {\n")
+    for plan in planList[1:]:
+        planKey = cleaner.cleanString(plan)
+        controller.write("    \"" + planKey + "\": \"" + getPlanChunkPath(planKey) + "\",\n")
+    controller.write("};\n")
+    controller.write("""this.attachedPlans = new Set();
+this.pendingPlans = new Map();  // maps the plans whose chunk is loading to the callbacks waiting for it
+this.attachChunk = function(plan) {
+    if (!this.attachedPlans.has(plan)) {
+        this.attachedPlans.add(plan);
+        window.planChunks[plan].call(this, $scope, this);
+    }
+};
+this.attachPlan = function(plan, callback) {
+    if (this.attachedPlans.has(plan)) {
+        callback();
+        return;
+    }
+    if (window.planChunks !== undefined && plan in window.planChunks) {
+        this.attachChunk(plan);
+        callback();
+        return;
+    }
+    if (!(plan in this.planChunkPaths)) {
+        console.error("There is no JS chunk for the plan " + plan);
+        return;
+    }
+    if (this.pendingPlans.has(plan)) {
+        this.pendingPlans.get(plan).push(callback);
+        return;
+    }
+    this.pendingPlans.set(plan, [callback]);
+    var script = document.createElement("script");
+    // the chunk is fetched again the next time the plan is selected
+    var fail = function () {
+        that.pendingPlans.delete(plan);
+        script.remove();
+        console.error("The JS chunk of the plan " + plan + " could not be loaded from " + script.src);
+    };
+    script.onload = function () {
+        if (window.planChunks === undefined || !(plan in window.planChunks)) {
+            fail();
+            return;
+        }
+        var callbacks = that.pendingPlans.get(plan);
+        that.pendingPlans.delete(plan);
+        that.attachChunk(plan);
+        for (let i = 0; i < callbacks.length; i++) {
+            callbacks[i]();
+        }
+    };
+    script.onerror = fail;
+    script.src = this.planChunkPaths[plan];
+    document.body.appendChild(script);
+};\n""")
+    controller.write("this.attachPlan(\"" + cleaner.cleanString(planList[0]) + "\", function () {});\n")
+
+# Function that wraps the lines and click data of a plan into a JS chunk which
+# registers itself for the lazy plan loader
 # Parameters:
-#   - course: course object
-#   - plan: current plan
-#   - category: category of course
-#   - controller: file handle to controller.js
-def generateNormalCourseHighlightStatement(course, plan, controller):
-    formattedHighlightStatement = """ var element = document.getElementById("{courseName}{planName}");
-                            if (this.{planName}ClickedMap.get("{courseName}{planName}").length > 0) {{
-                                var mapLen = this.{planName}ClickedMap.get("{courseName}{planName}").length - 1
-                                var prevCate = this.{planName}ClickedMap.get("{courseName}{planName}")[mapLen];
-                                this.unHighlightElement(element, prevCate);
-                            }}
-                            this.highlightElement(element, categoryName);
-                            this.addToClicked("{courseName}{planName}", categoryName);\n"""
-    controller.write(formattedHighlightStatement.format(planName=cleaner.cleanString(plan),
-                                                        courseName=cleaner.cleanString(course.name)))
-
-# Generates the statements needed to unhighlight a single normal course when pressing
-# the legend buttons
+#   planKey - cleaned name of plan
+#   chunkBody - JS written for the plan by htmlgen.placeLazyPlanDivs
+# Returns: the JS chunk (str)
+def generatePlanChunk(planKey, chunkBody):
+    return ("(window.planChunks = window.planChunks || {})[\"" + planKey + "\"] = function ($scope, that) {\n" +
+            chunkBody +
+            "};\n")
+
+# Function that returns the path (relative to index.html) of the JS chunk of a plan
 # Parameters:
-#   - course: course object
-#   - plan: current plan
-#   - controller: file handle to controller.js
-def generateNormalCourseUnhighlightStatement(course, plan, controller):
-    formattedUnhighlightStatement = """     var element = document.getElementById("{courseName}{planName}");
-                            var prevCate = this.removeFromClicked("{courseName}{planName}", categoryName);
-                                if (element.classList.contains(categoryName+"-highlighted")) {{
-                                    this.unHighlightElement(element, categoryName);
-                                    if (prevCate != "") {{
-                                        this.highlightElement(element, prevCate);
-                                    }}
-                                }}\n"""
-    controller.write(formattedUnhighlightStatement.format(courseName=cleaner.cleanString(course.name),
-                                                          planName=cleaner.cleanString(plan)))
+#   planKey - cleaned name of plan
+def getPlanChunkPath(planKey):
+    return "./js/plans/" + planKey + ".js"
 
 # Function that generates the statement representing which plan is currently selected
 # Parameters:
@@ -779,14 +590,14 @@ def generatePlanString(courseGroupList):
         planString += "+"+formattedCourseGroup.format(number=courseGroup)
     return planString
 
-# Function that properly concludes and closes the controller JS
+# Function that properly concludes the controller JS
 # Parameters:
 #   controller - file handle for controller JS
 def closeControllerJavaScript(controller):
     controller.write("});\n")
     writeRightClickDirective(controller)
     writeRadioChangeDirective(controller)
-    controller.close()
+    writeCourseDescriptionLoader(controller)
 
 # Function that appends the custom Angular directive used to handle right click
 # events to the end of the controller JS file
@@ -823,4 +634,59 @@ def writeRadioChangeDirective(controller):
     };
     });"""
     controller.write(radioChangeDirective)
-    
\ No newline at end of file
+
+# Function that appends the code which fills in course description tooltips from the
+# course description store the first time they are shown (hovered over)
+# Parameters:
+#   controller - file handle for controller JS
+def writeCourseDescriptionLoader(controller):
+    # Store layout (see htmlgen.placeCourseDescriptions):
+    #   electives - [title, description]
+    #   regular courses - [title, credits, fee index, duration, alpha hours, description,
+    #   [accreditation category, units, ...]]
+    descriptionLoader = """
+var courseDescriptions = JSON.parse(document.getElementById("coursedescriptions").textContent);
+function appendDescriptionTag(parent, tagName, className, text) {
+    var tag = document.createElement(tagName);
+    tag.className = className;
+    tag.textContent = text;
+    parent.appendChild(tag);
+    return tag;
+}
+function fillCourseDescription(courseDisc) {
+    var record = courseDescriptions[courseDisc.getAttribute("data-course")];
+    if (record === undefined) {
+        return;
+    }
+    appendDescriptionTag(courseDisc, "b", "descriptiontitle", record[0]);
+    appendDescriptionTag(courseDisc, "hr", "descriptionline", "");
+    if (record.length == 2) {
+        // elective
+        appendDescriptionTag(courseDisc, "p", "fulldescription", record[1]);
+        return;
+    }
+    appendDescriptionTag(courseDisc, "p", "descriptioncredits", "\\u2605 " + record[1] + " ");
+    appendDescriptionTag(courseDisc, "i", "descriptionfeeindex", "(fi " + record[2] + ") ");
+    appendDescriptionTag(courseDisc, "p", "descriptionavailability", "(" + record[3] + ", ");
+    appendDescriptionTag(courseDisc, "p", "descriptionalphahours", record[4] + ") ");
+    appendDescriptionTag(courseDisc, "p", "fulldescription", record[5]);
+    courseDisc.appendChild(document.createElement("br"));
+    appendDescriptionTag(courseDisc, "b", "accreditationheader", "Accreditation Units");
+    var units = appendDescriptionTag(courseDisc, "div", "accreditationunits", "");
+    for (let i = 0; i < record[6].length; i += 2) {
+        units.appendChild(document.createTextNode(record[6][i] + ": " + record[6][i + 1] + " Units\\n"));
+        units.appendChild(document.createElement("br"));
+    }
+}
+document.addEventListener("mouseover", function (event) {
+    var courseDiv = event.target.closest(".tooltip");
+    if (courseDiv == null) {
+        return;
+    }
+    var courseDisc = courseDiv.querySelector("[data-course]");
+    if (courseDisc != null && !courseDisc.hasChildNodes()) {
+        fillCourseDescription(courseDisc);
+    }
+});
+"""
+    controller.write(descriptionLoader)
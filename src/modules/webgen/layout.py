@@ -0,0 +1,123 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the functions needed to compute the layout of the plan
+# diagrams at generation time. Every box in a plan has a fixed size (see the
+# term and course rules of styles.css), so the position of each course box within
+# its plan div follows from the generated markup alone, and the geometry of
+# the lines between course boxes can be computed without a browser.
+
+# Dependencies: none
+
+# sizes (px) of the plan diagram, these must match the term and course rules of styles.css
+termMarginLeft = 64  # .term margin-left
+termWidth = 156  # .term width
+termHeaderMarginTop = 20  # .termheader margin-top
+termHeaderHeight = 27  # .termheader height
+termHeaderMarginBottom = 30  # .termheader margin-bottom
+courseWidth = 154  # .course width + borders
+courseHeight = 54  # .course height + borders
+electiveCourseHeight = 84  # .COMP and .PROG height + borders
+containerMarginBottom = 50  # .coursecontainer and .coursegroupcontainer margin-bottom
+orContainerMarginBottom = 35  # .orcoursecontainer margin-bottom
+orCourseMargin = 10  # .orcourse margin-top and margin-bottom
+orTextHeight = 24  # .ortext height + borders
+groupTitleHeight = 20  # .coursegrouptitle height
+groupPadding = 1  # .coursegroupcontainer padding
+groupOffset = -16  # .coursegroupcontainer is moved up by bottom: 16px
+groupCourseMarginBottom = 49  # .coursegroupcontainer .course margin-bottom
+
+# Function that computes the position of every course box of a plan
+# Parameters:
+#   planTag - HTML tag holding the term divs of the plan (placed by htmlgen.placeTermsDivs)
+# Returns: dict that maps the element ID of each course box to its box [left, top, width, height]
+# relative to the plan div
+def computePlanLayout(planTag):
+    planLayout = {}
+    termLeft = 0
+    for termTag in planTag.find_all("div", class_="term", recursive=False):
+        termLeft += termMarginLeft
+        courseLeft = termLeft + (termWidth - courseWidth)/2  # boxes are centered in the term
+        top = termHeaderMarginTop + termHeaderHeight + termHeaderMarginBottom
+        for childTag in termTag.find_all(recursive=False):
+            childClass = childTag.get("class", [])
+            if "coursecontainer" in childClass:
+                for courseTag in childTag.find_all("div", recursive=False):
+                    top = placeCourseBox(courseTag, courseLeft, top, 0, planLayout)
+                top += containerMarginBottom
+            elif "orcoursecontainer" in childClass:
+                top = placeOrCourseBoxes(childTag, courseLeft, top, 0, planLayout)
+            elif "coursegrouptitle" in childClass:
+                top += groupTitleHeight
+            elif "coursegroupcontainer" in childClass:
+                top += groupPadding
+                for groupChildTag in childTag.find_all(recursive=False):
+                    if "orcoursecontainer" in groupChildTag.get("class", []):
+                        top = placeOrCourseBoxes(groupChildTag, courseLeft, top, groupOffset, planLayout)
+                    else:
+                        top = placeCourseBox(groupChildTag, courseLeft, top, groupOffset, planLayout)
+                        if "lastcourseingroup" not in groupChildTag.get("class", []):
+                            top += groupCourseMarginBottom
+                top += groupPadding + containerMarginBottom
+        termLeft += termWidth
+    return planLayout
+
+# Function that places the course boxes of an OR container, separated by the word OR
+# Parameters:
+#   orContainerTag - HTML tag of the orcoursecontainer
+#   left - left of the course boxes
+#   top - top of the container
+#   offset - vertical offset of the container from its position in the flow
+#   planLayout - dict that maps element IDs of course boxes to their box, updated in place
+# Returns: top of the element following the container
+def placeOrCourseBoxes(orContainerTag, left, top, offset, planLayout):
+    for childTag in orContainerTag.find_all(recursive=False):
+        if "ortext" in childTag.get("class", []):
+            top += orTextHeight
+        else:
+            top += orCourseMargin
+            top = placeCourseBox(childTag, left, top, offset, planLayout)
+            top += orCourseMargin
+    if "lastcourseingroup" not in orContainerTag.get("class", []):
+        top += orContainerMarginBottom
+    return top
+
+# Function that places a single course box
+# Parameters:
+#   courseTag - HTML tag of the course box
+#   left - left of the course box
+#   top - top of the course box
+#   offset - vertical offset of the course box from its position in the flow
+#   planLayout - dict that maps element IDs of course boxes to their box, updated in place
+# Returns: bottom of the course box in the flow
+def placeCourseBox(courseTag, left, top, offset, planLayout):
+    courseClass = courseTag.get("class", [])
+    height = electiveCourseHeight if ("COMP" in courseClass or "PROG" in courseClass) else courseHeight
+    planLayout[courseTag["id"]] = [left, top + offset, courseWidth, height]
+    return top + height
+
+# Function that computes the anchors of a line between two course boxes: the middle of
+# the side of the start box facing the end box and the middle of the facing side of the
+# end box. Boxes in different terms are joined side to side, boxes in the same term top
+# to bottom. Matches getLineAnchors in line.js, which is used for lines whose anchors
+# were not precomputed.
+# Parameters:
+#   startBox - box [left, top, width, height] of the start course
+#   endBox - box [left, top, width, height] of the end course
+# Returns: list of anchors [x1, y1, x2, y2]
+def getLineAnchors(startBox, endBox):
+    startLeft, startTop, startWidth, startHeight = startBox
+    endLeft, endTop, endWidth, endHeight = endBox
+    if endLeft >= startLeft + startWidth:
+        # end box in a later term
+        return [startLeft + startWidth, startTop + startHeight/2, endLeft, endTop + endHeight/2]
+    if endLeft + endWidth <= startLeft:
+        # end box in an earlier term
+        return [startLeft, startTop + startHeight/2, endLeft + endWidth, endTop + endHeight/2]
+    if endTop >= startTop:
+        # end box below in the same term
+        return [startLeft + startWidth/2, startTop + startHeight, endLeft + endWidth/2, endTop]
+    # end box above in the same term
+    return [startLeft + startWidth/2, startTop, endLeft + endWidth/2, endTop + endHeight]
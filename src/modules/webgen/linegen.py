@@ -6,11 +6,15 @@
 # File that contains all the functions and classes used to aid in
 # generating the lines in the diagram
 
-# Dependencies: cleaner
+# Dependencies: cleaner, layout, categoryindex
 
 from .. import cleaner
+from . import layout
+from . import categoryindex
 
-# Class that defines an object used to manage line generation in the project
+# Class that defines an object used to manage line generation in the project. Every plan
+# is rendered with its own line manager, so its line numbers are local to the plan (starting
+# at 0) and are offset by the lines of the plans before it when the plan is written.
 class LineManager:
     def __init__(self) -> None:
         # Dict that maps the lines to the courses that 'own' them
@@ -18,7 +22,7 @@ class LineManager:
         # Value: List of int, represent the number id of lines "owned" by the course
         self.courseLineDict = {}
 
-        # Count of lines generated in the webpage
+        # Count of lines generated in the plan
         self.lineCount = 0
     
     # Adds a line to a course's "owned" list
@@ -54,13 +58,15 @@ class LineManager:
     def setLineCount(self, count = int):
         self.lineCount = count
 
-# Function that places the lines for a specfic plan sequnece onto the diagram
+# Function that collects the lines for a specfic plan sequnece
 # Parameters:
 #   courseList - list of course objects of course taken in that plan
-#   indexJS - file handle for index.js
-#   lineManager - line manager object for aiding in generation
+#   lineManager - line manager object of the plan for aiding in generation
 #   plan - name of plan 
-def placeLines(courseList, indexJS, lineManager, plan):
+# Returns: list of [start, end, coreq] for every line of the plan, in line ID order
+def collectLines(courseList, lineManager, plan):
+    lineList = []  # list of [start, end, coreq] for every line of the plan
+    cleanedCourseList = cleaner.cleanCourseList(courseList)  # cleaned once, not for every requisite
     for course in courseList:
         courseID = cleaner.cleanString(course.name)+cleaner.cleanString(plan)
         for prereq in course.prereqs:
@@ -68,246 +74,159 @@ def placeLines(courseList, indexJS, lineManager, plan):
             if len(prereq.split()) > 1:
                 newPreReqString = prereq.replace(" or ", " ")
                 for option in newPreReqString.split():
-                    if cleaner.cleanString(option) in cleaner.cleanCourseList(courseList):
+                    if cleaner.cleanString(option) in cleanedCourseList:
                         optionID = cleaner.cleanString(option)+cleaner.cleanString(plan)
-                        addPrereqLine(optionID, courseID, lineManager, indexJS)
+                        addPrereqLine(optionID, courseID, lineManager, lineList)
             else:
-                if cleaner.cleanString(prereq) in cleaner.cleanCourseList(courseList):
+                if cleaner.cleanString(prereq) in cleanedCourseList:
                     prereqID = cleaner.cleanString(prereq)+cleaner.cleanString(plan)
-                    addPrereqLine(prereqID, courseID, lineManager, indexJS)
+                    addPrereqLine(prereqID, courseID, lineManager, lineList)
         for coreq in course.coreqs:
              # OR CASE, cases where coreq can be one of a set of courses
             if len(coreq.split()) > 1:
                 newCoReqString = coreq.replace(" or ", " ")
                 for option in newCoReqString.split():
-                    if cleaner.cleanString(option) in cleaner.cleanCourseList(courseList):
+                    if cleaner.cleanString(option) in cleanedCourseList:
                         optionID = cleaner.cleanString(option)+cleaner.cleanString(plan)
-                        addCoreqLine(optionID, courseID, lineManager, indexJS)
+                        addCoreqLine(optionID, courseID, lineManager, lineList)
             else:
-                if cleaner.cleanString(coreq) in cleaner.cleanCourseList(courseList):
+                if cleaner.cleanString(coreq) in cleanedCourseList:
                     coreqID = cleaner.cleanString(coreq)+cleaner.cleanString(plan)
-                    addCoreqLine(coreqID, courseID, lineManager, indexJS)
+                    addCoreqLine(coreqID, courseID, lineManager, lineList)
+    return lineList
 
-
-# Function that places click listeners for each course in the specified plan
+# Function that writes the lines of a plan to index.js as a packed table. The element
+# IDs are listed once and every line is three numbers: the index of its start ID, the
+# index of its end ID and a coreq flag. The Line objects are only created by the
+# line table in line.js when a line is first used.
 # Parameters:
-#   courseList - list of course objects of course taken in that plan
-#   controller - file handle for controller.js
-#   lineManager - line manager object for aiding in generation
-#   plan - name of plan 
-def placeClickListeners(courseList, controller, lineManager, plan):
-    formattedListener = "$scope.{courseName}Listener = function () {{\n"
-    formattedTimeIf = """if (currentTime - {courseName}Time <= 200) {{ 
-        {courseName}Time = currentTime;
-        return;
-    }}\n"""
-    formattedElementGetter = "  var {courseName}element = document.getElementById(\"{courseName}\");\n"
-    formattedContains = "     if (that.{planName}ClickedMap.get(\"{courseName}\").length > 0) {{ \n"
-    formatttedWithinContains= """          for (let i = 0; i < that.{planName}ClickedMap.get("{courseName}").length; i++) {{ 
-        var cate = that.{planName}ClickedMap.get("{courseName}")[i];
-        if ({courseName}element.classList.contains(cate + "-highlighted")) {{
-            trueCounter++;
-            that.unHighlightElement({courseName}element, cate);
-        }}
-    }}
-    if (trueCounter > 0) {{
-        return;
-    }}"""
-    formattedClickIf = " if (!{courseName}flag) {{\n"
-    formattedStatement = "      that.{action}Line(getLine{num}());\n"
-    formattedHighlightStatement = "     that.{action}Element({courseName}element, {category});\n"
-    formattedRemoveClickedStatement = "     var category = that.removeFromClicked(\"{courseName}\", \"{category}\");\n"
-    formattedAddClickedStatement = "     that.addToClicked(\"{courseName}\", \"{category}\");\n"
-
-    compcounter = 0
-    progcounter = 0
-    itscounter = 0
-
-    for course in courseList:
-        courseID = cleaner.cleanString(course.name)+cleaner.cleanString(plan) 
-        cleanedPlan = cleaner.cleanString(plan)
-        courseContClass = course.main_category.replace(" ", "")
-
-        # program and tech elective
-        if (courseContClass == "Program/TechnicalElective"):
-                courseContClass = "PROG"
-                courseID += str(progcounter)
-                progcounter += 1
-        # comp elective
-        elif (courseContClass == "ComplementaryElective"):
-                courseContClass = "COMP"
-                courseID += str(compcounter)
-                compcounter += 1
-        # its elective
-        elif (courseContClass == "ITSElective"):
-                courseContClass = "ITS"
-                courseID += str(itscounter)
-                itscounter += 1
-        # for course with no category, use default colour
-        elif (courseContClass == ""):
-                courseContClass = "course"
-
-        controller.write(formattedListener.format(courseName=courseID))
-        controller.write("var currentTime = new Date().getTime();\n")
-        controller.write(formattedTimeIf.format(courseName=courseID))
-        controller.write(courseID +"Time = currentTime;\n")
-        controller.write(formattedElementGetter.format(courseName=courseID))
-
-        controller.write(formattedClickIf.format(courseName=courseID,
-                                                planName=cleanedPlan))
-        
-        # TO DO: re do this section
-        controller.write(formattedContains.format(courseName=courseID, planName=cleanedPlan))
-        controller.write(" var trueCounter = 0;\n")
-        controller.write(formatttedWithinContains.format(courseName=courseID, planName=cleanedPlan))
-        controller.write("}\n")
-
-        # if course owns lines, add addLine statements
-        if courseID in lineManager.getCourseLineDict():
-            for line in lineManager.getCourseLineDict()[courseID]:
-                controller.write(formattedStatement.format(action="add", num=line))
-
-  
-
-            
-        controller.write(formattedHighlightStatement.format(action="highlight",
-                                                            category="\""+courseContClass+"\"",
-                                                            courseName=courseID))
-        controller.write(formattedAddClickedStatement.format(courseName=courseID, 
-                                                                    category=courseContClass))
-            
-     
-        controller.write("      " +courseID+"flag=true\n")
-        controller.write("  }\n else {\n")
-
-        # if course owns lines, add removeLine statements
-        if courseID in lineManager.getCourseLineDict():
-            for line in lineManager.getCourseLineDict()[courseID]:
-                controller.write(formattedStatement.format(action="remove", num=line))
-
-        # for course with no category, use default colour
-        if (courseContClass == ""):
-            courseContClass = "course"
+#   lineList - list of [start, end, coreq] for every line of the plan, in line ID order
+#   firstLine - number ID of the first line in lineList
+#   indexJS - file handle for index.js
+def writeLineTable(lineList, firstLine, indexJS):
+    elementIDs = []
+    elementIndexDict = {}  # maps an element ID to its index in elementIDs
+    packedLines = []
+    for start, end, coreq in lineList:
+        for elementID in [start, end]:
+            if elementID not in elementIndexDict:
+                elementIndexDict[elementID] = len(elementIDs)
+                elementIDs.append(elementID)
+            packedLines.append(str(elementIndexDict[elementID]))
+        packedLines.append("1" if coreq else "0")
+
+    indexJS.write("lineTable.addLines(" + str(firstLine) + ", [" + 
+                  ",".join("\"" + elementID + "\"" for elementID in elementIDs) + 
+                  "], [" + ",".join(packedLines) + "]);\n")
+
+# Function that computes the anchors of every line of a plan from the layout of the plan,
+# four numbers per line (x1, y1, x2, y2). A line whose ends are not in the layout gets -1
+# for every anchor, the webpage then measures its ends instead.
+# Parameters:
+#   lineList - list of [start, end, coreq] for every line of the plan, in line ID order
+#   planLayout - dict that maps element IDs of course boxes to their box (see layout.computePlanLayout)
+# Returns: list of the packed anchors (str) of every line, in line ID order
+def computeLineAnchors(lineList, planLayout):
+    packedAnchors = []
+    for start, end, coreq in lineList:
+        if start in planLayout and end in planLayout:
+            anchors = layout.getLineAnchors(planLayout[start], planLayout[end])
+            packedAnchors += ["{:g}".format(anchor) for anchor in anchors]
+        else:
+            packedAnchors += ["-1", "-1", "-1", "-1"]
+    return packedAnchors
+
+# Function that writes the precomputed anchors of the lines of a plan to index.js
+# Parameters:
+#   packedAnchors - list of the packed anchors of every line of the plan (see computeLineAnchors)
+#   firstLine - number ID of the first line of the plan
+#   plan - name of plan
+#   indexJS - file handle for index.js
+def writeLineAnchors(packedAnchors, firstLine, plan, indexJS):
+    indexJS.write("lineTable.addLineAnchors(" + str(firstLine) + ", \"" + cleaner.cleanString(plan) + "\", [" + 
+                  ",".join(packedAnchors) + "]);\n")
 
-        controller.write(formattedHighlightStatement.format(action="unHighlight",
-                                                            category="\""+courseContClass+"\"",
-                                                            courseName=courseID))
-    
-    
-        controller.write(formattedRemoveClickedStatement.format(courseName=courseID,
-                                                                category=courseContClass))
-        controller.write("  if (category != \"\") { \n")
-        controller.write(formattedHighlightStatement.format(action="highlight",
-                                                            category="category",
-                                                            courseName=courseID))
-        controller.write("}\n")
-        controller.write("      " +courseID+"flag=false\n")
-        controller.write("  }\n};\n")
+# Function that makes the webpage draw its lines with the batched renderer of line.js,
+# which draws every visible line into one overlay SVG instead of one LeaderLine per line.
+# Must be written to index.js before any lines are placed.
+# Parameters:
+#   indexJS - file handle for index.js
+def writeBatchedLineRenderer(indexJS):
+    indexJS.write("lineTable.setRenderer(new BatchedLineRenderer());\n")
 
-# Function that places right click listeners for each course in the specified plan
+# Function that collects the click data of each course in the specified plan. Every course
+# placement gets one entry [course ID, category, lines owned], which the generic click and
+# right click listeners (see javascriptgen.generateCourseClickListeners) work from. The
+# category is the first category class of the course div, both are taken from the category index.
 # Parameters:
 #   courseList - list of course objects of course taken in that plan
-#   controller - file handle for controller.js
+#   lineManager - line manager object of the plan for aiding in generation
 #   plan - name of plan 
-def placeRightClickListeners(courseList, controller, plan):
-    formattedListener = "$scope.{courseName}RCListener = function () {{\n"
-    formattedElementGetter = "  var element = document.getElementById(\"{courseName}desc\");\n"
-    formattedClickIf = " if (!{courseName}rflag) {{\n"
-    whenNotClicked = """       if (element.classList.contains("tooltiptextleft")) {
-        element.classList.remove("tooltiptextleft");
-        element.classList.add("tooltiptextleft-locked");
-    } else {
-        element.classList.remove("tooltiptextright");
-        element.classList.add("tooltiptextright-locked");
-    }\n"""
-    whenClicked = """       if (element.classList.contains("tooltiptextleft-locked")) {
-        element.classList.remove("tooltiptextleft-locked");
-        element.classList.add("tooltiptextleft");
-    } else {
-        element.classList.remove("tooltiptextright-locked");
-        element.classList.add("tooltiptextright");
-    }\n"""
+#   categoryIndex - category index object, used to look up the categories of each course
+# Returns: list of [course ID, category, list of plan-local number IDs of the lines owned] for every placement
+def collectClickData(courseList, lineManager, plan, categoryIndex):
+    placementList = []
 
-    compcounter = 0
-    progcounter = 0
-    itscounter = 0
+    # number of electives placed in plan, used to number the elective IDs
+    electiveCountDict = {"COMP": 0, "PROG": 0, "ITS": 0}
 
     for course in courseList:
         courseID = cleaner.cleanString(course.name)+cleaner.cleanString(plan) 
-        courseContClass = course.main_category.replace(" ", "")
+        if course.name in categoryindex.electiveKeyDict:
+            electiveKey = categoryindex.electiveKeyDict[course.name]
+            courseID += str(electiveCountDict[electiveKey])
+            electiveCountDict[electiveKey] += 1
 
-        # program and tech elective
-        if (courseContClass == "Program/TechnicalElective"):
-                courseContClass = "PROG"
-                courseID += str(progcounter)
-                progcounter += 1
-        # comp elective
-        elif (courseContClass == "ComplementaryElective"):
-                courseContClass = "COMP"
-                courseID += str(compcounter)
-                compcounter += 1
-        # its elective
-        elif (courseContClass == "ITSElective"):
-                courseContClass = "ITS"
-                courseID += str(itscounter)
-                itscounter += 1
         # for course with no category, use default colour
-        elif (courseContClass == ""):
-                courseContClass = "course"
-
-        controller.write(formattedListener.format(courseName=courseID))
-        controller.write(formattedElementGetter.format(courseName=courseID))
-        controller.write(formattedClickIf.format(courseName=courseID))
+        categoryKeys = categoryIndex.getPlacementCategories(courseID)
+        courseContClass = categoryKeys[0] if categoryKeys else "course"
 
-        controller.write(whenNotClicked)
-        controller.write("      " +courseID+"rflag=true\n")
-        controller.write("  }\n else {\n")
+        # number IDs of the lines owned by the course
+        placementList.append([courseID, courseContClass, lineManager.getCourseLineDict().get(courseID, [])])
+    return placementList
 
-        controller.write(whenClicked)
-        controller.write("      " +courseID+"rflag=false\n")
-        controller.write("  }\n};\n")
+# Function that writes the click data of the placements of a plan to controller.js
+# Parameters:
+#   placementList - click data of the placements of the plan (see collectClickData)
+#   firstLine - number ID of the first line of the plan, added to the plan-local line numbers
+#   plan - name of plan 
+#   controller - file handle for controller.js
+def writeClickData(placementList, firstLine, plan, controller):
+    formattedEntry = "  [\"{courseName}\", \"{category}\", [{lines}]],\n"
 
+    controller.write("that.registerPlacements(\"" + cleaner.cleanString(plan) + "\", [\n")
+    for courseID, category, lines in placementList:
+        controller.write(formattedEntry.format(courseName=courseID,
+                                               category=category,
+                                               lines=",".join([str(firstLine + line) for line in lines])))
+    controller.write("]);\n")
 
-# Function that creates a prerequesite line object in index.js
+# Function that adds a prerequesite line to the lines of a plan
 # Parameters:
 #   start - element ID of starting course
 #   end - element ID of ending course
 #   lineManager - line manager object for aiding in generation
-#   indexJS - file handle for index.js
-def addPrereqLine(start, end, lineManager, indexJS):
-    # get line count, this is the ID of the new line
-    count = lineManager.getLineCount()
+#   lineList - list of [start, end, coreq] for every line of the plan
+def addPrereqLine(start, end, lineManager, lineList):
+    addLine(start, end, False, lineManager, lineList)
 
-    # ensure that both start and end have entries in courseLineDict
-    lineManager.intializeCourse(start)
-    lineManager.intializeCourse(end)
-
-    indexJS.write("var line" + 
-                     str(count) + 
-                     " = new Line(" +
-                    "\"" + start +  "\"" + 
-                     ", " +
-                    "\"" + end +  "\"" + 
-                     ", false);\n")
-    
-    # add a getter for the line
-    addGetter(count, indexJS)
-
-    # add lines to "owned" list of start and end
-    lineManager.addLinetoCourse(start, count)
-    lineManager.addLinetoCourse(end, count)
-
-    # increment line count in line manager
-    lineManager.setLineCount(count+1)
-    
+# Function that adds a corequesite line to the lines of a plan
+# Parameters:
+#   start - element ID of starting course
+#   end - element ID of ending course
+#   lineManager - line manager object for aiding in generation
+#   lineList - list of [start, end, coreq] for every line of the plan
+def addCoreqLine(start, end, lineManager, lineList):
+    addLine(start, end, True, lineManager, lineList)
 
-# Function that creates a corequesite line object in index.js
+# Function that adds a line to the lines of a plan
 # Parameters:
 #   start - element ID of starting course
 #   end - element ID of ending course
+#   coreq - boolean that indicates whether line is a prereq or coreq
 #   lineManager - line manager object for aiding in generation
-#   indexJS - file handle for index.js
-def addCoreqLine(start, end, lineManager, indexJS):
+#   lineList - list of [start, end, coreq] for every line of the plan
+def addLine(start, end, coreq, lineManager, lineList):
     # get line count, this is the ID of the new line
     count = lineManager.getLineCount()
 
@@ -315,16 +234,7 @@ def addCoreqLine(start, end, lineManager, indexJS):
     lineManager.intializeCourse(start)
     lineManager.intializeCourse(end)
 
-    indexJS.write("var line" + 
-                     str(count) + 
-                    " = new Line(" +
-                    "\"" + start +  "\"" + 
-                     ", " +
-                    "\"" + end +  "\"" + 
-                     ", true);\n")
-
-    # add a getter for the line
-    addGetter(count, indexJS)
+    lineList.append([start, end, coreq])
 
     # add lines to "owned" list of start and end
     lineManager.addLinetoCourse(start, count)
@@ -332,14 +242,3 @@ def addCoreqLine(start, end, lineManager, indexJS):
 
     # increment line count in line manager
     lineManager.setLineCount(count+1)
-
-# Function that adds a getter function for a line
-# so that contoller.js can retrieve the line object
-# Parameters
-#   num - number ID of line in question
-#   indexJS - file handle for index.js
-def addGetter(num, indexJS):
-    formattedFunction = """function getLine{number}() {{
-        return line{number}
-    }};\n"""
-    indexJS.write(formattedFunction.format(number=num))
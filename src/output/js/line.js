@@ -1,19 +1,48 @@
 /**
  * Line object used to represent line objects generated in the program visualizer
- *  diagram. Wraps a LeaderLine instance.
+ *  diagram. Wraps a LeaderLine instance, which is created the first time the line
+ *  is shown and then kept: hiding a line only hides its LeaderLine, showing it again
+ *  repositions and reshows it instead of building a new one.
  * Fields:
  *  - start: string form of element ID that is start of line
  *  - end: string form of element ID that is end of line
  *  - coreq: booleam that indicates whether line is a prereq or coreq
  *  - line: LeaderLine instance that represents the line in question. This is null
- *          when the plan loaded is not the plan the line is in
+ *          until the line is first shown
+ *  - startElement: cached element the line starts at, null until the line is first shown
+ *  - endElement: cached element the line ends at, null until the line is first shown
+ *  - renderer: batched renderer that draws the line instead of a LeaderLine, null
+ *              when every line is its own LeaderLine
+ *  - plan: key of the plan the line is in, null if its anchors were not precomputed
+ *  - anchors: array [x1, y1, x2, y2] of the ends of the line relative to its plan div,
+ *             precomputed by the generator, null if its endpoints must be measured
  */
 class Line {
-    constructor(start, end, coreq) {
+    constructor(start, end, coreq, renderer = null, plan = null, anchors = null) {
         this.start = start;
         this.end = end;
         this.coreq = coreq;
         this.line = null;
+        this.startElement = null;
+        this.endElement = null;
+        this.renderer = renderer;
+        this.plan = plan;
+        this.anchors = anchors;
+    }
+    /**
+     * Look up the endpoint elements again if they are not cached yet or are no
+     * longer in the document (the course boxes of a plan are recreated every
+     * time the plan is switched to)
+     * @return boolean that indicates whether the endpoint elements changed
+     */
+    updateEndpoints() {
+        if (this.startElement !== null && this.startElement.isConnected &&
+            this.endElement !== null && this.endElement.isConnected) {
+            return false;
+        }
+        this.startElement = document.getElementById(this.start);
+        this.endElement = document.getElementById(this.end);
+        return true;
     }
     /**
      * Show the line
@@ -21,41 +50,377 @@ class Line {
      * is because of switching plans or clicking 
      */
     show(switching) {
-        // switching plans case, create a new LeaderLine
-        if (switching) {
-            this.line = new LeaderLine(document.getElementById(this.start),
-                                       document.getElementById(this.end),
-                                       {dash:this.coreq, 
+        if (this.renderer !== null) {
+            this.renderer.show(this);
+            return;
+        }
+        // first time shown, create the LeaderLine as hidden and show it below
+        if (this.line === null) {
+            this.updateEndpoints();
+            this.line = new LeaderLine(this.startElement,
+                                       this.endElement,
+                                       {hide:true, 
+                                        dash:this.coreq,
                                         color: (this.coreq ? 'blue':'orange')});
         }
-        // spawning case due to click, create a new LeaderLine as hidden and call show 
+        // endpoints were recreated, move the existing LeaderLine onto them
+        else if (this.updateEndpoints()) {
+            this.line.setOptions({start:this.startElement, end:this.endElement});
+        }
+        // same endpoints, the layout may have changed since the line was hidden
         else {
-            this.line = new LeaderLine(document.getElementById(this.start), 
-            document.getElementById(this.end),
-            {hide:true, 
-             dash:this.coreq,
-             color: (this.coreq ? 'blue':'orange')});
-            this.line.show();
+            this.line.position();
         }
+        // switching plans case appears at once, spawning case due to click fades in
+        this.line.show(switching ? 'none' : 'fade');
     }
       /**
-     * Hide the line
+     * Hide the line, the LeaderLine is kept so that it can be shown again
      * @param switching boolean that indicates whether this hide call
      * is because of switching plans or clicking 
      */
     hide(switching) {
-        // switching plans case, destroy LeaderLine
-        if (switching) {
-            this.line.remove();
+        if (this.renderer !== null) {
+            this.renderer.hide(this);
+            return;
         }
-        // disappering case due to click, hide and then destory Leaderline
-        else {
-            this.line.hide();
-            var that = this;
-            // timeout is needed to preserve fade out animation
-            setTimeout(function() {
-                that.line.remove();
-            }, 200);
+        if (this.line === null) {
+            return;
+        }
+        // switching plans case disappears at once, disappearing case due to click fades out
+        this.line.hide(switching ? 'none' : 'fade');
+    }
+}
+/**
+ * Renderer that draws every visible line as a path of an overlay SVG, an
+ * alternative to one LeaderLine (and one SVG) per line. Showing or hiding a line
+ * only schedules a redraw, which updates every path within a single animation frame.
+ * A line whose anchors were precomputed by the generator is drawn into the overlay of
+ * its plan, which sits inside the plan div, so drawing it reads nothing from the
+ * layout. Any other line is drawn into an overlay over the whole page, its endpoints
+ * are all measured before any path is touched.
+ * Fields:
+ *  - svg: overlay SVG over the whole page, null until first needed
+ *  - overlays: map from plan key to the overlay SVG of the plan
+ *  - visible: set of the Line objects being shown
+ *  - paths: map from Line object to its path element, kept when the line is hidden
+ *  - frame: id of the scheduled animation frame, null when no redraw is scheduled
+ */
+class BatchedLineRenderer {
+    constructor() {
+        this.svg = null;
+        this.overlays = new Map();
+        this.visible = new Set();
+        this.paths = new Map();
+        this.frame = null;
+        var that = this;
+        window.addEventListener("resize", function() {
+            that.schedule();
+        });
+    }
+    /**
+     * Show a line on the next redraw
+     * @param line Line object
+     */
+    show(line) {
+        this.visible.add(line);
+        this.schedule();
+    }
+    /**
+     * Hide a line on the next redraw
+     * @param line Line object
+     */
+    hide(line) {
+        this.visible.delete(line);
+        this.schedule();
+    }
+    /**
+     * Schedule a redraw for the next animation frame, unless one is scheduled already
+     */
+    schedule() {
+        if (this.frame !== null) {
+            return;
+        }
+        var that = this;
+        this.frame = requestAnimationFrame(function() {
+            that.frame = null;
+            that.draw();
+        });
+    }
+    /**
+     * Create an overlay SVG, along with the arrow heads of prerequisite (orange)
+     * and corequisite (blue) lines
+     * @return overlay SVG element
+     */
+    createOverlay() {
+        var svgNS = "http://www.w3.org/2000/svg";
+        var svg = document.createElementNS(svgNS, "svg");
+        svg.setAttribute("class", "lineoverlay");
+        svg.setAttribute("width", "1");
+        svg.setAttribute("height", "1");
+        svg.style.cssText = "position:absolute; left:0; top:0; overflow:visible; pointer-events:none;";
+        var defs = document.createElementNS(svgNS, "defs");
+        var colours = {prereq: "orange", coreq: "blue"};
+        for (const name in colours) {
+            var marker = document.createElementNS(svgNS, "marker");
+            marker.setAttribute("id", "lineoverlay-arrow-" + name);
+            marker.setAttribute("viewBox", "0 0 10 10");
+            marker.setAttribute("refX", "8");
+            marker.setAttribute("refY", "5");
+            marker.setAttribute("markerWidth", "4");
+            marker.setAttribute("markerHeight", "4");
+            marker.setAttribute("orient", "auto");
+            var arrow = document.createElementNS(svgNS, "path");
+            arrow.setAttribute("d", "M0,0 L10,5 L0,10 z");
+            arrow.setAttribute("fill", colours[name]);
+            marker.appendChild(arrow);
+            defs.appendChild(marker);
+        }
+        svg.appendChild(defs);
+        return svg;
+    }
+    /**
+     * Get the overlay of a plan, moving it into the plan div if the plan div was
+     * recreated since the last redraw
+     * @param plan plan key, the ID of the plan div
+     * @return overlay SVG element, null if the plan div is not in the document (yet)
+     */
+    getPlanOverlay(plan) {
+        // plan keys may start with a digit, which is not a valid selector unless escaped
+        var container = document.querySelector(".display #" + CSS.escape(plan));
+        if (container === null) {
+            return null;
+        }
+        var overlay = this.overlays.get(plan);
+        if (overlay === undefined) {
+            overlay = this.createOverlay();
+            this.overlays.set(plan, overlay);
+        }
+        if (overlay.parentNode !== container) {
+            container.appendChild(overlay);
+        }
+        return overlay;
+    }
+    /**
+     * Get the path element of a line, creating it on first use
+     * @param line Line object
+     */
+    getPath(line) {
+        var path = this.paths.get(line);
+        if (path === undefined) {
+            path = document.createElementNS("http://www.w3.org/2000/svg", "path");
+            path.setAttribute("fill", "none");
+            path.setAttribute("stroke", line.coreq ? "blue" : "orange");
+            path.setAttribute("stroke-width", "4");
+            if (line.coreq) {
+                path.setAttribute("stroke-dasharray", "8,4");
+            }
+            path.setAttribute("marker-end", "url(#lineoverlay-arrow-" + (line.coreq ? "coreq" : "prereq") + ")");
+            if (line.anchors !== null) {
+                path.setAttribute("d", getCurvePath(line.anchors));
+            }
+            this.paths.set(line, path);
+        }
+        return path;
+    }
+    /**
+     * Redraw the overlays. Lines with precomputed anchors need no layout reads, the
+     * endpoints of any other line are all measured before any path is touched, so
+     * the page layout is computed at most once per redraw.
+     */
+    draw() {
+        // reads
+        var measured = [];
+        for (const line of this.visible) {
+            if (line.anchors !== null) {
+                continue;
+            }
+            line.updateEndpoints();
+            if (line.startElement === null || line.endElement === null) {
+                continue;
+            }
+            measured.push([line,
+                           line.startElement.getBoundingClientRect(),
+                           line.endElement.getBoundingClientRect()]);
+        }
+        var scrollX = measured.length > 0 ? window.pageXOffset : 0;
+        var scrollY = measured.length > 0 ? window.pageYOffset : 0;
+        // writes
+        for (const [line, path] of this.paths) {
+            if (!this.visible.has(line) && path.parentNode !== null) {
+                path.parentNode.removeChild(path);
+            }
+        }
+        var planOverlays = new Map();  // overlays of the plans drawn in this redraw
+        var waiting = false;  // true if a plan div is not in the document yet
+        for (const line of this.visible) {
+            if (line.anchors === null) {
+                continue;
+            }
+            if (!planOverlays.has(line.plan)) {
+                planOverlays.set(line.plan, this.getPlanOverlay(line.plan));
+            }
+            var overlay = planOverlays.get(line.plan);
+            if (overlay === null) {
+                waiting = true;
+                continue;
+            }
+            var planPath = this.getPath(line);
+            if (planPath.parentNode !== overlay) {
+                overlay.appendChild(planPath);
+            }
+        }
+        if (measured.length > 0 && this.svg === null) {
+            this.svg = this.createOverlay();
+            document.body.appendChild(this.svg);
+        }
+        for (let i = 0; i < measured.length; i++) {
+            var linePath = this.getPath(measured[i][0]);
+            linePath.setAttribute("d", getCurvePath(getLineAnchors(measured[i][1], measured[i][2], scrollX, scrollY)));
+            if (linePath.parentNode !== this.svg) {
+                this.svg.appendChild(linePath);
+            }
+        }
+        // a lazily loaded plan div may only be added once its fragment arrives
+        if (waiting) {
+            this.schedule();
+        }
+    }
+}
+/**
+ * Get the anchors of a line between two course boxes: the middle of the side of
+ * the start box facing the end box and the middle of the facing side of the end
+ * box. Boxes in different terms are joined side to side, boxes in the same term
+ * top to bottom. Matches layout.getLineAnchors of the generator.
+ * @param start bounding rectangle of the start box
+ * @param end bounding rectangle of the end box
+ * @param scrollX horizontal scroll of the page
+ * @param scrollY vertical scroll of the page
+ * @return array of anchors [x1, y1, x2, y2]
+ */
+function getLineAnchors(start, end, scrollX, scrollY) {
+    var anchors;
+    if (end.left >= start.right) {
+        // end box in a later term
+        anchors = [start.right, start.top + start.height/2, end.left, end.top + end.height/2];
+    }
+    else if (end.right <= start.left) {
+        // end box in an earlier term
+        anchors = [start.left, start.top + start.height/2, end.right, end.top + end.height/2];
+    }
+    else if (end.top >= start.top) {
+        // end box below in the same term
+        anchors = [start.left + start.width/2, start.bottom, end.left + end.width/2, end.top];
+    }
+    else {
+        // end box above in the same term
+        anchors = [start.left + start.width/2, start.top, end.left + end.width/2, end.bottom];
+    }
+    return [anchors[0] + scrollX, anchors[1] + scrollY, anchors[2] + scrollX, anchors[3] + scrollY];
+}
+/**
+ * Get the SVG path of a line: a curve leaving and entering its anchors horizontally
+ * when they are in different terms and vertically when they are in the same term
+ * @param anchors array of anchors [x1, y1, x2, y2]
+ * @return path data (string)
+ */
+function getCurvePath(anchors) {
+    var x1 = anchors[0], y1 = anchors[1], x2 = anchors[2], y2 = anchors[3];
+    var dx = 0, dy = 0;
+    if (x1 === x2) {
+        dy = (y2 - y1)/2;
+    }
+    else {
+        dx = (x2 - x1)/2;
+    }
+    return "M" + x1 + "," + y1 +
+           " C" + (x1 + dx) + "," + (y1 + dy) +
+           " " + (x2 - dx) + "," + (y2 - dy) +
+           " " + x2 + "," + y2;
+}
+/**
+ * Table of all the lines in the program visualizer diagram. The lines are
+ * registered in packed form by index.js (or the JS chunk of a plan), the Line
+ * object of a line is only created the first time it is used.
+ * Fields:
+ *  - elementIDs: array of element ID strings, the start and end of every line
+ *  - packedLines: array with three numbers per line: index of the start ID in
+ *                 elementIDs, index of the end ID in elementIDs and the coreq flag (0 or 1)
+ *  - lines: array of the Line objects created so far, indexed by line number
+ *  - renderer: batched renderer given to the lines, null when every line is its own LeaderLine
+ *  - plans: array of the plan key of every line with precomputed anchors, indexed by line number
+ *  - anchors: array with four numbers per line, the precomputed anchors x1, y1, x2 and y2
+ */
+class LineTable {
+    constructor() {
+        this.elementIDs = [];
+        this.packedLines = [];
+        this.lines = [];
+        this.renderer = null;
+        this.plans = [];
+        this.anchors = [];
+    }
+    /**
+     * Draw the lines with a batched renderer instead of one LeaderLine per line,
+     * must be called before any line is used
+     * @param renderer batched renderer, eg: a BatchedLineRenderer
+     */
+    setRenderer(renderer) {
+        this.renderer = renderer;
+    }
+    /**
+     * Register the packed lines of a plan
+     * @param firstLine number of the first line being registered
+     * @param elementIDs array of element IDs the packed lines index into
+     * @param packedLines array with three numbers per line: start ID index,
+     * end ID index and coreq flag
+     */
+    addLines(firstLine, elementIDs, packedLines) {
+        var offset = this.elementIDs.length;
+        for (let i = 0; i < elementIDs.length; i++) {
+            this.elementIDs.push(elementIDs[i]);
+        }
+        for (let i = 0; i < packedLines.length; i += 3) {
+            var position = 3*firstLine + i;
+            this.packedLines[position] = packedLines[i] + offset;
+            this.packedLines[position + 1] = packedLines[i + 1] + offset;
+            this.packedLines[position + 2] = packedLines[i + 2];
+        }
+    }
+    /**
+     * Register the precomputed anchors of the lines of a plan
+     * @param firstLine number of the first line being registered
+     * @param plan key of the plan, the ID of the plan div
+     * @param packedAnchors array with four numbers per line: x1, y1, x2 and y2
+     * relative to the plan div, all -1 for a line whose endpoints must be measured
+     */
+    addLineAnchors(firstLine, plan, packedAnchors) {
+        for (let i = 0; i < packedAnchors.length; i += 4) {
+            var number = firstLine + i/4;
+            if (packedAnchors[i] >= 0) {
+                this.plans[number] = plan;
+            }
+            for (let j = 0; j < 4; j++) {
+                this.anchors[4*number + j] = packedAnchors[i + j];
+            }
+        }
+    }
+    /**
+     * Get the Line object of a line, creating it on first use
+     * @param number number of the line
+     */
+    getLine(number) {
+        if (this.lines[number] === undefined) {
+            var position = 3*number;
+            this.lines[number] = new Line(this.elementIDs[this.packedLines[position]],
+                                          this.elementIDs[this.packedLines[position + 1]],
+                                          this.packedLines[position + 2] == 1,
+                                          this.renderer,
+                                          this.plans[number] === undefined ? null : this.plans[number],
+                                          this.plans[number] === undefined ? null : this.anchors.slice(4*number, 4*number + 4));
         }
+        return this.lines[number];
     }
-}
\ No newline at end of file
+}
+
+var lineTable = new LineTable();
@@ -0,0 +1,72 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the unit tests of the JS minifier (see modules/postprocessing/minifier.py),
+# which check that strings, template literals, comments and regular expression literals are
+# recognised as tokens and kept intact. Run `python -m unittest discover tests` from the
+# /src/ directory.
+
+# Dependencies: os, sys, unittest, minifier
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from modules.postprocessing import minifier
+
+# Class that defines the tests of minifier.minifyJS
+class MinifyJSTest(unittest.TestCase):
+    def testWhitespaceBetweenWordsIsKept(self):
+        self.assertEqual(minifier.minifyJS("var  a = 1 ;\n  return a"), "var a=1;return a")
+
+    def testNewlinesNeededBySemicolonInsertionAreKept(self):
+        self.assertEqual(minifier.minifyJS("a = 1\n\n  b = 2"), "a=1\nb=2")
+
+    def testOperatorsDoNotMerge(self):
+        self.assertEqual(minifier.minifyJS("a + +b; c - -d"), "a+ +b;c- -d")
+
+    def testStringsAreKept(self):
+        self.assertEqual(minifier.minifyJS("x = \"a  // b\" + 'c /* d */ \\' e';"),
+                         "x=\"a  // b\"+'c /* d */ \\' e';")
+
+    def testTemplateLiteralsAreKept(self):
+        self.assertEqual(minifier.minifyJS("x = `a  ${ b }\n  c`;"), "x=`a  ${ b }\n  c`;")
+
+    def testNestedTemplateLiteralsAreKept(self):
+        source = "x = `a ${ `b ${ \"}\" } c` } d` ;"
+        self.assertEqual(minifier.minifyJS(source), "x=`a ${ `b ${ \"}\" } c` } d`;")
+
+    def testLineCommentsAreRemoved(self):
+        self.assertEqual(minifier.minifyJS("a = 1; // comment\nb = 2;"), "a=1;b=2;")
+
+    def testBlockCommentsAreRemoved(self):
+        self.assertEqual(minifier.minifyJS("var/* comment */a = /* multi\nline */ 1;"), "var a=1;")
+
+    def testDivisionIsNotARegex(self):
+        self.assertEqual(minifier.minifyJS("a = b / c / d;"), "a=b/c/d;")
+        self.assertEqual(minifier.minifyJS("a = (b) / 2 / (c);"), "a=(b)/2/(c);")
+
+    def testDivisionAfterPostfixOperatorIsNotARegex(self):
+        self.assertEqual(minifier.minifyJS("x = i++ / 2; y = 3 / 4;"), "x=i++/2;y=3/4;")
+        self.assertEqual(minifier.minifyJS("x = i-- / 2 // comment\ny = 3 / 4"), "x=i--/2\ny=3/4")
+        self.assertEqual(minifier.minifyJS("a = b + ++c; d = e - --f;"), "a=b+ ++c;d=e- --f;")
+
+    def testRegexAfterOperatorIsKept(self):
+        self.assertEqual(minifier.minifyJS("a = / b\\/ [/ ]c/g;"), "a=/ b\\/ [/ ]c/g;")
+
+    def testRegexAfterKeywordIsKept(self):
+        for keyword in ["return", "typeof", "case", "in", "of", "delete", "void", "throw", "new", "else"]:
+            source = keyword + " / a b/.x"
+            self.assertEqual(minifier.minifyJS(source), keyword + "/ a b/.x", keyword)
+
+    def testRegexHoldingCommentMarkersIsKept(self):
+        self.assertEqual(minifier.minifyJS("return /a\\/\\/ b/ ;"), "return/a\\/\\/ b/;")
+
+    def testKeywordPropertyIsNotARegex(self):
+        self.assertEqual(minifier.minifyJS("a = b.in / 2 / c;"), "a=b.in/2/c;")
+
+if __name__ == "__main__":
+    unittest.main()
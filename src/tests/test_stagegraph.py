@@ -0,0 +1,93 @@
+# Author: Jason Kim
+# Collaborators: Zachary Schmidt, Moaz Abdelmonem
+# Oversight: Dr. David Nobes
+# University of Alberta, Summer 2022, Curriculum Development Co-op Term
+
+# This file contains the unit tests of the on-disk cache of the stage graph (see
+# modules/pipeline/stagegraph.py), which check that stages are reused from the cache and
+# that the cache keeps only the most recently used entries of every stage. Run
+# `python -m unittest discover tests` from the /src/ directory.
+
+# Dependencies: os, shutil, sys, tempfile, unittest, stagegraph
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from modules.pipeline import stagegraph
+
+# Class that defines the tests of the stage cache of stagegraph.StageGraph
+class StageCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cacheDirectory = tempfile.mkdtemp()
+        self.runValues = []  # values the stage was run with, in order
+
+    def tearDown(self):
+        shutil.rmtree(self.cacheDirectory)
+
+    # Stage function that records the values it is run with
+    def double(self, value):
+        self.runValues.append(value)
+        return value * 2
+
+    # Runs a graph of one stage on a value and returns the output of the stage
+    def runGraph(self, value, cacheLimit = 2):
+        graph = stagegraph.StageGraph(self.cacheDirectory, lambda message: None, cacheLimit=cacheLimit)
+        graph.addValueInput("value", value)
+        graph.addStage("double", self.double, ["value"])
+        return graph.getOutput("double")
+
+    # Returns the number of cache entries of the stage
+    def countEntries(self):
+        directory = os.path.join(self.cacheDirectory, "double")
+        return len([entry for entry in os.listdir(directory) if entry.endswith(".pickle")])
+
+    def testUnchangedInputIsReused(self):
+        self.assertEqual(self.runGraph(1), 2)
+        self.assertEqual(self.runGraph(1), 2)
+        self.assertEqual(self.runValues, [1])
+
+    def testEntriesBeyondLimitArePruned(self):
+        for value in range(5):
+            self.runGraph(value)
+        self.assertEqual(self.countEntries(), 2)
+        # the two latest entries are kept, the oldest ones are run again
+        self.runGraph(4)
+        self.runGraph(3)
+        self.runGraph(0)
+        self.assertEqual(self.runValues, [0, 1, 2, 3, 4, 0])
+
+    def testReusedEntriesAreKept(self):
+        self.runGraph(1)
+        self.runGraph(2)
+        self.runGraph(1)  # reused, so entry 2 is now the least recently used
+        self.runGraph(3)
+        self.runGraph(1)
+        self.runGraph(2)
+        self.assertEqual(self.runValues, [1, 2, 3, 2])
+        self.assertEqual(self.countEntries(), 2)
+
+    def testPrunedEntryIsRunAgain(self):
+        self.runGraph(1)
+        graph = stagegraph.StageGraph(self.cacheDirectory, lambda message: None, cacheLimit=2)
+        graph.addValueInput("value", 1)
+        graph.addStage("double", self.double, ["value"])
+        graph.getHash("double")  # found in the cache, the output is not read yet
+        shutil.rmtree(os.path.join(self.cacheDirectory, "double"))  # pruned by another process
+        self.assertEqual(graph.getOutput("double"), 2)
+        self.assertEqual(self.runValues, [1, 1])
+
+    def testStagesArePrunedSeparately(self):
+        graph = stagegraph.StageGraph(self.cacheDirectory, lambda message: None, cacheLimit=1)
+        graph.addValueInput("value", 1)
+        graph.addStage("Mechanical Engineering: double", self.double, ["value"])
+        graph.addStage("Civil Engineering: double", self.double, ["value"])
+        graph.getOutput("Mechanical Engineering: double")
+        graph.getOutput("Civil Engineering: double")
+        self.assertEqual(len(os.listdir(self.cacheDirectory)), 2)
+
+if __name__ == "__main__":
+    unittest.main()